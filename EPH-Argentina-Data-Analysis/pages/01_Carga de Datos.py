@@ -1,5 +1,5 @@
 import streamlit as st
-from src.utils.streamlit import actualizar, validar_y_cargar, eliminar_archivos, cargar_df,cargar_df_hogares
+from src.utils.streamlit import actualizar, validar_y_cargar, eliminar_archivos, cargar_df,cargar_df_hogares, cargar_demografia, cargar_transiciones
 from src.utils.constants import DATA_SOURCE_DIR
 import datetime
 import streamlit.components.v1 as components
@@ -114,6 +114,8 @@ if 'date_range' in st.session_state:
                 f"El sistema contiene información desde el **{fecha_inicio[1]}/{fecha_inicio[0]}** hasta el **{fecha_fin[1]}/{fecha_fin[0]}** (trimestre/año).")
             st.session_state.df_ind = cargar_df()
             st.session_state.df_hogares = cargar_df_hogares()
+            st.session_state.df_piramide, st.session_state.df_edades = cargar_demografia()
+            st.session_state.df_transiciones = cargar_transiciones()
         else:
             st.warning(
                 "No fue posible determinar las fechas porque los archivos cargados no contienen información temporal válida", icon="⚠️")
@@ -1,8 +1,8 @@
 import streamlit as st
 import altair as alt
-import pandas as pd
-from src.utils.constants import AGLOMERADOS_NOMBRES
-from src.utils.streamlit import get_nombre_aglomerado, get_nro_aglomerado, suma_activa, suma_dependiente, get_media_ponderada, get_mediana_ponderada
+from src.utils.aglomerados import nombre_aglomerado
+from src.utils.streamlit import get_codigos_aglomerado
+from src.procesamientos.demografia import AGLOMERADO_TOTAL
 
 st.set_page_config(page_title='Características Demográficas',
                    page_icon=':busts_in_silhouette:',
@@ -10,9 +10,12 @@ st.set_page_config(page_title='Características Demográficas',
 
 st.header('Características Demográficas', divider=True)
 
-if 'df_ind' in st.session_state and not st.session_state.df_ind.empty:
+if 'df_edades' in st.session_state and not st.session_state.df_edades.empty:
 
-    df_ind = pd.DataFrame(st.session_state.df_ind)
+    # Tablas materializadas en la actualización de datos: acá sólo se seleccionan filas
+    df_piramide = st.session_state.df_piramide
+    df_edades = st.session_state.df_edades
+    es_total = df_edades['AGLOMERADO'] == AGLOMERADO_TOTAL
 
     # --------------------- Configuración del Sidebar ---------------------------------------------
     secciones = ['Distribución por sexo y edad', 'Edad media por aglomerado',
@@ -25,33 +28,26 @@ if 'df_ind' in st.session_state and not st.session_state.df_ind.empty:
         if tab == secciones[0]:
             st.markdown("### Filtros")
             anio_opcion = st.selectbox(
-                "Año:", df_ind['ANO4'].unique())
+                "Año:", df_edades['ANO4'].unique())
             if anio_opcion is not None:
                 trim_opcion = st.selectbox(
-                    "Trimestre:", df_ind[df_ind['ANO4'] == anio_opcion]['TRIMESTRE'].unique())
+                    "Trimestre:", df_edades[df_edades['ANO4'] == anio_opcion]['TRIMESTRE'].unique())
         elif tab == secciones[2]:
             aglomerado_opcion = st.selectbox(
-                'Aglomerado:', get_nombre_aglomerado(df_ind['AGLOMERADO']))
+                'Aglomerado:', get_codigos_aglomerado(df_edades.loc[~es_total, 'AGLOMERADO']), format_func=nombre_aglomerado)
 
     # ------------------------------ CONTENIDO CENTRAL ---------------------------------------------
     # -------------------------------- Punto 1.3.1 -------------------------------------------------
     if tab == secciones[0]:
-        df_filtrado = df_ind.loc[(df_ind['ANO4'] == anio_opcion) & (
-            df_ind['TRIMESTRE'] == trim_opcion) & (df_ind['CH06'] > 0), ['CH06', 'CH04_str']].dropna()
-        df_filtrado = df_filtrado.rename(
-            columns={'CH06': 'EDAD', 'CH04_str': 'SEXO_STR'})
-        df_filtrado["GRUPO_EDAD"] = df_filtrado["EDAD"] // 10 * 10
-        df_filtrado["GRUPO_EDAD_STR"] = df_filtrado["GRUPO_EDAD"].astype(
-            str) + "-" + (df_filtrado["GRUPO_EDAD"] + 9).astype(str)
-        df_filtrado = df_filtrado.groupby(
-            ['GRUPO_EDAD', 'GRUPO_EDAD_STR', 'SEXO_STR']).size().reset_index(name='CANTIDAD')
+        df_filtrado = df_piramide.loc[(df_piramide['ANO4'] == anio_opcion) & (
+            df_piramide['TRIMESTRE'] == trim_opcion) & (df_piramide['AGLOMERADO'] == AGLOMERADO_TOTAL)]
         etiquetas_ejex = df_filtrado['GRUPO_EDAD_STR'].unique().tolist()
 
         # Parametros Gráfico
         chart = alt.Chart(df_filtrado).mark_bar().encode(
             x=alt.X('GRUPO_EDAD_STR:N', title="RANGO DE EDAD", scale=alt.Scale(
                 domain=etiquetas_ejex), axis=alt.Axis(labelAngle=0)),
-            y=alt.Y('CANTIDAD:Q', title='# de PERSONAS',
+            y=alt.Y('POBLACION:Q', title='# de PERSONAS',
                     axis=alt.Axis(titleAnchor='end')),
             color=alt.Color('SEXO_STR:N', title=''),
             xOffset='SEXO_STR:N'
@@ -66,26 +62,21 @@ if 'df_ind' in st.session_state and not st.session_state.df_ind.empty:
     if tab == secciones[1]:
 
         # Detección del ultimo año y trimestre cargado
-        periodo_ind = df_ind[['ANO4', 'TRIMESTRE']].drop_duplicates(
-        ).sort_values(['ANO4', 'TRIMESTRE']).values.tolist()
-        ultimo_anio = periodo_ind[-1][0]
-        ultimo_trimestre = periodo_ind[-1][1]
+        ultimo_anio, ultimo_trimestre = max(
+            df_edades[['ANO4', 'TRIMESTRE']].itertuples(index=False, name=None))
         st.markdown('### Edad media por Aglomerado')
         st.markdown(
             f'_Datos correspondientes al **Año: {ultimo_anio} - Trimestre: {ultimo_trimestre}**_')
 
-        # Filtrado del dataframe
-        columnas = ['CH06', 'AGLOMERADO', 'PONDERA']
-        df_filtrado = df_ind.loc[(df_ind['ANO4'] == ultimo_anio) & (
-            df_ind['TRIMESTRE'] == ultimo_trimestre) & (df_ind['CH06'] > 0), columnas].dropna()
-        df_filtrado['MEDIA_TOTAL'] = round((
-            df_filtrado['CH06'] * df_filtrado['PONDERA']).sum() / df_filtrado['PONDERA'].sum(), 2)
-        df_filtrado = df_filtrado.groupby(['AGLOMERADO', 'MEDIA_TOTAL'], group_keys=False).apply(
-            get_media_ponderada, include_groups=False).reset_index(name='EDAD_MEDIA')
-        df_filtrado['NOMBRE_AGLOMERADO'] = df_filtrado['AGLOMERADO'].map(
-            AGLOMERADOS_NOMBRES)
-        df_filtrado['DESVIACION'] = df_filtrado['EDAD_MEDIA'] - \
-            df_filtrado['MEDIA_TOTAL']
+        # Selección de filas del último período
+        del_periodo = (df_edades['ANO4'] == ultimo_anio) & (
+            df_edades['TRIMESTRE'] == ultimo_trimestre)
+        media_total = df_edades.loc[del_periodo & es_total, 'EDAD_MEDIA'].iloc[0]
+        df_filtrado = df_edades.loc[del_periodo & ~es_total, ['AGLOMERADO', 'EDAD_MEDIA']]
+        df_filtrado = df_filtrado.assign(
+            NOMBRE_AGLOMERADO=nombre_aglomerado(df_filtrado['AGLOMERADO']),
+            MEDIA_TOTAL=media_total,
+            DESVIACION=df_filtrado['EDAD_MEDIA'] - media_total)
         df_filtrado = df_filtrado.loc[:, ['NOMBRE_AGLOMERADO', 'EDAD_MEDIA', 'MEDIA_TOTAL', 'DESVIACION']].sort_values(
             by='DESVIACION', ascending=False)
 
@@ -121,17 +112,9 @@ if 'df_ind' in st.session_state and not st.session_state.df_ind.empty:
 
     # --------------------------- Punto 1.3.3 ------------------------------------------------------
     if tab == secciones[2]:
-        columnas = ['CH06', 'AGLOMERADO', 'ANO4', 'TRIMESTRE', 'PONDERA']
-        df_filtrado = df_ind.loc[((df_ind['AGLOMERADO'] == get_nro_aglomerado(aglomerado_opcion)) & (
-            df_ind['CH06'] > 0), columnas)].dropna()
-        df_filtrado['ANIO-TRIM'] = df_filtrado['ANO4'].astype(
-            str)+"-"+df_filtrado['TRIMESTRE'].astype(str)
-        df_filtrado = df_filtrado.groupby('ANIO-TRIM', group_keys=False).apply(lambda g: pd.Series({
-            'DEPENDIENTE': suma_dependiente(g),
-            'ACTIVA': suma_activa(g)
-        }), include_groups=False).reset_index()
-        df_filtrado['DEPENDENCIA_DEMOGRAFICA'] = round(
-            (df_filtrado['DEPENDIENTE'] / df_filtrado['ACTIVA']) * 100, 2)
+        df_filtrado = df_edades.loc[df_edades['AGLOMERADO'] == aglomerado_opcion,
+                                    ['PERIODO', 'DEPENDIENTE', 'ACTIVA', 'DEPENDENCIA_DEMOGRAFICA']]
+        df_filtrado = df_filtrado.rename(columns={'PERIODO': 'ANIO-TRIM'})
         min = df_filtrado['DEPENDENCIA_DEMOGRAFICA'].min()
         max = df_filtrado['DEPENDENCIA_DEMOGRAFICA'].max()
 
@@ -157,7 +140,7 @@ if 'df_ind' in st.session_state and not st.session_state.df_ind.empty:
 
         st.markdown('### Dependencia demográfica')
         st.markdown(
-            f'_Datos para todos los años y trimestres de **{aglomerado_opcion}**_')
+            f'_Datos para todos los años y trimestres de **{nombre_aglomerado(aglomerado_opcion)}**_')
         st.altair_chart(chart + text, use_container_width=True)
         st.caption('La **dependencia demográfica** se define como el cociente de la cantidad de población de 0 a 14 años y mayores de 65 (se asumen jubilados) respecto a la población en edad activa (15 a 64 años) multiplicado por 100.')
         st.markdown('### Detalles')
@@ -165,18 +148,8 @@ if 'df_ind' in st.session_state and not st.session_state.df_ind.empty:
 
     # ------------------------ Punto 1.3.4 -------------------------------------------------------
     if tab == secciones[3]:
-        columnas = ['CH06', 'ANO4', 'TRIMESTRE', 'PONDERA']
-        df_filtrado = df_ind.loc[(df_ind['CH06'] > 0), columnas].dropna()
-        media_ponderada = df_filtrado.groupby(['ANO4', 'TRIMESTRE'], group_keys=False).apply(
-            get_media_ponderada, include_groups=False).reset_index(name='MEDIA PONDERADA')
-        mediana_ponderada = df_filtrado.groupby(['ANO4', 'TRIMESTRE'], group_keys=False).apply(
-            get_mediana_ponderada, include_groups=False).reset_index(name='MEDIANA PONDERADA')
-        merge = media_ponderada.merge(
-            mediana_ponderada, on=['ANO4', 'TRIMESTRE']).rename(columns={'ANO4': 'AÑO'})
-        merge['AÑO-TRIM'] = merge['AÑO'].astype(
-            str)+"-"+merge['TRIMESTRE'].astype(str)
-        merge = merge.loc[:, ['AÑO-TRIM',
-                              'MEDIA PONDERADA', 'MEDIANA PONDERADA']]
+        merge = df_edades.loc[es_total, ['PERIODO', 'EDAD_MEDIA', 'EDAD_MEDIANA']].rename(columns={
+            'PERIODO': 'AÑO-TRIM', 'EDAD_MEDIA': 'MEDIA PONDERADA', 'EDAD_MEDIANA': 'MEDIANA PONDERADA'})
 
         merge_melted = merge.melt(id_vars='AÑO-TRIM',
                                   value_vars=['MEDIA PONDERADA',
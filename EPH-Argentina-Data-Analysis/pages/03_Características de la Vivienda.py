@@ -1,8 +1,8 @@
 import streamlit as st  
 import pandas as pd
 import matplotlib.pyplot as plt
-from src.utils.constants import AGLOMERADOS_NOMBRES
-from src.utils.streamlit import  get_nombre_aglomerado, get_nro_aglomerado
+from src.utils.aglomerados import nombre_aglomerado
+from src.utils.streamlit import get_codigos_aglomerado
 import plotly.express as px
 import altair as alt
 
@@ -113,7 +113,7 @@ def material_piso_por_aglomerado_detallado(df_hogares, anio=None):
     resultado = conteo.loc[idx_max].copy()
 
     # Agrego nombre legible del aglomerado
-    resultado["nombre_aglomerado"] = resultado["AGLOMERADO"].map(AGLOMERADOS_NOMBRES)
+    resultado["nombre_aglomerado"] = nombre_aglomerado(resultado["AGLOMERADO"])
 
     resultado["Total_viviendas"] = resultado["AGLOMERADO"].map(total_por_aglomerado)
     resultado["Porcentaje"] = (resultado["Cantidad"] / resultado["Total_viviendas"] * 100).round(2)
@@ -135,7 +135,7 @@ def material_piso_por_aglomerado_detallado(df_hogares, anio=None):
 #-----------------------------------------------------------------------------------------------------------
 
 # Item 1.4.4
-def calcular_proporcion_bano_por_aglomerado(df_hogar, AGLOMERADOS_NOMBRES, anio=None):
+def calcular_proporcion_bano_por_aglomerado(df_hogar, anio=None):
     """
     Calcula la proporción de viviendas con baño por aglomerado para un año dado o para todos los años.
 
@@ -148,10 +148,6 @@ def calcular_proporcion_bano_por_aglomerado(df_hogar, AGLOMERADOS_NOMBRES, anio=
     df_hogar : pandas.DataFrame
         DataFrame que contiene los datos de hogares provenientes de la EPH, con al menos las columnas
         'CODUSU', 'NRO_HOGAR', 'ANO4', 'AGLOMERADO' y 'IV9'.
-    
-    AGLOMERADOS_NOMBRES : dict
-        Diccionario que mapea los códigos de aglomerado (int) a sus nombres (str).
-        Si se provee, se agrega una columna con los nombres de aglomerados al resultado.
 
     anio : int, optional
         Año específico para filtrar los datos (por la columna 'ANO4').
@@ -165,7 +161,7 @@ def calcular_proporcion_bano_por_aglomerado(df_hogar, AGLOMERADOS_NOMBRES, anio=
         - 'total_viviendas': cantidad total de viviendas relevadas en ese aglomerado
         - 'viviendas_con_bano': cantidad de viviendas con baño (IV9 == 1)
         - 'proporcion': proporción de viviendas con baño (cantidad por aglomerado con baño/cantidad total de viviendas del aglomerado)
-        - 'nombre_aglomerado': nombre del aglomerado (si se proporciona el diccionario de nombres)
+        - 'nombre_aglomerado': nombre del aglomerado
     """
     
     if anio is not None:
@@ -182,8 +178,7 @@ def calcular_proporcion_bano_por_aglomerado(df_hogar, AGLOMERADOS_NOMBRES, anio=
     resumen['proporcion'] = resumen['viviendas_con_bano'] / resumen['total_viviendas']
     resumen = resumen.reset_index()
     
-    if AGLOMERADOS_NOMBRES:
-        resumen['nombre_aglomerado'] = resumen['AGLOMERADO'].map(AGLOMERADOS_NOMBRES)
+    resumen['nombre_aglomerado'] = nombre_aglomerado(resumen['AGLOMERADO'])
 
     return resumen
 
@@ -303,9 +298,8 @@ def evolucion_regimen_tenencia(df, anio, aglomerado_seleccionado, tipos_tenencia
         return
 
     # Mostrar tabla
-    nombre_aglomerado = AGLOMERADOS_NOMBRES.get(aglomerado_opcion, aglomerado_opcion)
     #st.markdown(f"#### Evolución del régimen de tenencia - Año {anio}, Aglomerado {aglomerado_seleccionado}")
-    st.markdown(f"#### Evolución del régimen de tenencia - Año {anio}, {nombre_aglomerado}")
+    st.markdown(f"#### Evolución del régimen de tenencia - Año {anio}, {nombre_aglomerado(aglomerado_seleccionado, aglomerado_seleccionado)}")
 
     # Gráfico
     chart = alt.Chart(resumen).mark_bar().encode(
@@ -378,7 +372,7 @@ def calcular_viviendas_en_villa_por_aglomerado(df, anio=None):
 
 # ----------------------------------------------------------------------------------------------------
 # Item 1.4.7 Condición de habitabilidad
-def calcular_porcentaje_habitabilidad_larga(df, AGLOMERADOS_NOMBRES, anio=None):
+def calcular_porcentaje_habitabilidad_larga(df, anio=None):
     """
     Calcula el porcentaje ponderado de viviendas por condición de habitabilidad en cada aglomerado.
     Devuelve un DataFrame listo para visualización.
@@ -386,8 +380,6 @@ def calcular_porcentaje_habitabilidad_larga(df, AGLOMERADOS_NOMBRES, anio=None):
     Parámetros:
     -----------
     df : pd.DataFrame
-    AGLOMERADOS_NOMBRES : dict
-        Mapea códigos de aglomerado a nombres legibles
     anio : int o None
         Año a filtrar (opcional)
 
@@ -413,7 +405,7 @@ def calcular_porcentaje_habitabilidad_larga(df, AGLOMERADOS_NOMBRES, anio=None):
     resultado = pd.merge(conteo, total, on="AGLOMERADO", how="left")
     resultado["Porcentaje"] = (resultado["Cantidad"] / resultado["Total"] * 100).round(2)
 
-    resultado["Aglomerado"] = resultado["AGLOMERADO"].map(AGLOMERADOS_NOMBRES)
+    resultado["Aglomerado"] = nombre_aglomerado(resultado["AGLOMERADO"])
     resultado["Condición de habitabilidad"] = resultado["CONDICION_DE_HABITABILIDAD"]
 
     return resultado[["Aglomerado", "Condición de habitabilidad", "Porcentaje"]]
@@ -573,7 +565,7 @@ if 'df_hogares' in st.session_state and not st.session_state.df_hogares.empty:
     # Item 1.4.4 Baño dentro del hogar 
     
     elif seleccion == "Baño dentro del hogar":
-        resultado = calcular_proporcion_bano_por_aglomerado(df, AGLOMERADOS_NOMBRES, anio_opcion)
+        resultado = calcular_proporcion_bano_por_aglomerado(df, anio_opcion)
 
         if resultado.empty:
             mensaje_anio = f"el año {anio_opcion}" if anio_opcion is not None else "los datos seleccionados"
@@ -624,12 +616,10 @@ if 'df_hogares' in st.session_state and not st.session_state.df_hogares.empty:
     # Item 1.4.5 Evolución del régimen de tenencia 
     
     elif seleccion == "Evolución del régimen de tenencia":
-        # Mostrar nombres legibles de aglomerados
-        opciones_aglomerados = get_nombre_aglomerado(df["AGLOMERADO"])
-        aglomerado_nombre = st.selectbox("Seleccione un aglomerado", options=opciones_aglomerados)
-
-        # Obtener el código numérico correspondiente
-        aglomerado_opcion = get_nro_aglomerado(aglomerado_nombre)
+        # Las opciones son los códigos; se muestran los nombres legibles de aglomerados
+        opciones_aglomerados = get_codigos_aglomerado(df["AGLOMERADO"])
+        aglomerado_opcion = st.selectbox("Seleccione un aglomerado", options=opciones_aglomerados,
+                                         format_func=nombre_aglomerado)
         
         # Diccionario de tipos de tenencia
         tipos_disponibles = {
@@ -664,7 +654,7 @@ if 'df_hogares' in st.session_state and not st.session_state.df_hogares.empty:
             st.warning(f"⚠️ No hay datos disponibles para {mensaje_anio}.")
         else:
              
-            resultado["nombre_aglomerado"] = resultado["AGLOMERADO"].map(AGLOMERADOS_NOMBRES)
+            resultado["nombre_aglomerado"] = nombre_aglomerado(resultado["AGLOMERADO"])
 
             # Título dinámico según el año
             titulo_anio = f"Año {anio_opcion}" if anio_opcion is not None else "Todos los años"
@@ -697,7 +687,7 @@ if 'df_hogares' in st.session_state and not st.session_state.df_hogares.empty:
     
     # Item 1.4.7 Condición de habitabilidad
     elif seleccion == "Condición de habitabilidad":
-        resultado = calcular_porcentaje_habitabilidad_larga(df, AGLOMERADOS_NOMBRES, anio_opcion)
+        resultado = calcular_porcentaje_habitabilidad_larga(df, anio_opcion)
 
         if resultado.empty:
             st.warning("⚠️ No hay datos disponibles.")
@@ -2,23 +2,29 @@
 # Librerías 
 #-----------------------------------------------------------------------------------------------------------------------------
 #Constantes
-from src.utils.constants import AGLOMERADOS_NOMBRES,COORDENADAS_AGLOMERADOS
+from src.utils.aglomerados import nombre_aglomerado, coordenadas_aglomerado
+from src.utils.streamlit import version_datos, get_codigos_aglomerado, calcular_transiciones
+from src.utils.constants import ESTADOS_ACTIVIDAD
+from src.procesamientos.demografia import AGLOMERADO_TOTAL
+from src.procesamientos.panel import matriz_transicion
+from src.utils.varianza import estimar
 
 #Manejo de datos
 import pandas as pd
+import numpy as np
 
 #Graficos
 
 import plotly.express as px
 
-#Visualizacion Streamlit 
+#Visualizacion Streamlit
 import streamlit as st
+import streamlit.components.v1 as components
 import altair as alt
 
 
 #Mapas
 import folium
-from streamlit_folium import st_folium
 #-----------------------------------------------------------------------------------------------------------------------------
 # FUNCIONES
 #-----------------------------------------------------------------------------------------------------------------------------
@@ -28,8 +34,8 @@ def mapear_nombres_aglomerados(df) :
     """
     Asigna los nombres correspondientes a los códigos de aglomerados en el DataFrame.
 
-    Utiliza un diccionario (AGLOMERADOS_NOMBRES) para mapear los valores de la columna
-    'AGLOMERADO' a una nueva columna 'AGLOMERADO_NOMBRE'.
+    Utiliza la dimensión de aglomerados (indexada por código) para mapear los valores de la columna
+    'AGLOMERADO' a una nueva columna 'AGLOMERADO_NOMBRE'. Se usa sólo al momento de mostrar.
 
     Parámetros:
         df (pd.DataFrame): DataFrame que contiene una columna 'AGLOMERADO' con códigos numéricos.
@@ -38,7 +44,7 @@ def mapear_nombres_aglomerados(df) :
         pd.DataFrame: El mismo DataFrame con una nueva columna 'AGLOMERADO_NOMBRE' que contiene
                       los nombres descriptivos de los aglomerados.
     """  
-    df['AGLOMERADO_NOMBRE'] = df['AGLOMERADO'].map(AGLOMERADOS_NOMBRES)
+    df['AGLOMERADO_NOMBRE'] = nombre_aglomerado(df['AGLOMERADO'])
     return df
 
 def calcular_tasa_emp_desemp(df, condicion=None, agrupacion=['ANO4', 'TRIMESTRE']):
@@ -361,6 +367,154 @@ def graficar_empleo_por_sector(df, titulo="Distribución del Empleo por Sector e
     # Devuelve la figura lista para mostrarse en Streamlit o en cualquier interfaz Plotly
     return fig
 
+@st.cache_data(show_spinner=False)
+def calcular_intervalos_desempleo(version, aglomerados_sel, _df_activos):
+    """
+    Tasa de desempleo con error estándar e intervalo de confianza del 95% (bootstrap por hogares),
+    por período para el total y para cada aglomerado seleccionado.
+
+    Se cachea por versión de los datos y aglomerados seleccionados: el DataFrame no se hashea.
+
+    Parámetros:
+        version: identificador de la versión de los datos procesados.
+        aglomerados_sel (tuple): códigos de los aglomerados seleccionados.
+        _df_activos (pd.DataFrame): población activa con 'CODUSU', 'NRO_HOGAR', 'CONDICION_LABORAL' y 'PONDERA'.
+
+    Retorna:
+        pd.DataFrame: 'AGLOMERADO_NOMBRE', 'Fecha' y las columnas de estimar.
+    """
+    desocupado = _df_activos['CONDICION_LABORAL'] == 'Desocupado'
+    total = estimar(_df_activos, desocupado, agrupacion=['ANO4', 'TRIMESTRE'])
+    total['AGLOMERADO_NOMBRE'] = 'Total aglomerados seleccionados'
+    por_aglomerado = mapear_nombres_aglomerados(estimar(_df_activos, desocupado, agrupacion=['ANO4', 'TRIMESTRE', 'AGLOMERADO']))
+
+    intervalos = agregar_columna_fecha(pd.concat([total, por_aglomerado.drop(columns='AGLOMERADO')], ignore_index=True))
+    return intervalos[['AGLOMERADO_NOMBRE', 'Fecha', 'ESTIMACION', 'ERROR_ESTANDAR', 'LI', 'LS', 'CV']]
+
+@st.cache_data(show_spinner=False)
+def transiciones_por_salto(version, salto):
+    """
+    Transiciones entre trimestres separados por `salto`, calculadas a partir del índice del panel
+    guardado en la actualización. Se cachea por versión de los datos.
+    """
+    return calcular_transiciones(salto)
+
+#Mapa
+@st.cache_data(show_spinner=False)
+def calcular_variacion_tasas(version, _df_empleo):
+    """
+    Calcula, para cada aglomerado, la variación de las tasas de empleo y desempleo entre el primer
+    y el último período disponible, junto con sus coordenadas.
+
+    Se cachea por versión de los datos: el DataFrame no se hashea (parámetro con '_').
+
+    Parámetros:
+        version: identificador de la versión de los datos procesados.
+        _df_empleo (pd.DataFrame): DataFrame de empleo con 'AGLOMERADO'.
+
+    Retorna:
+        pd.DataFrame: una fila por aglomerado con tasas inicial/final, variaciones, período y 'lat'/'lon'.
+    """
+    # Aplico función de tasa de empleo y desempleo
+    df_emp_des = calcular_tasa_emp_desemp(_df_empleo, condicion=None, agrupacion=['AGLOMERADO', 'ANO4', 'TRIMESTRE'])
+
+    # Ordeno y obtengo primeros y últimos registros por aglomerado
+    df_sorted = df_emp_des.sort_values(by=['AGLOMERADO', 'ANO4', 'TRIMESTRE'])
+    min_date = df_sorted.drop_duplicates(subset='AGLOMERADO', keep='first')
+    max_date = df_sorted.drop_duplicates(subset='AGLOMERADO', keep='last')
+
+    # Merge entre el primer y último registro de cada aglomerado
+    df_emp_des = pd.merge(min_date, max_date, on='AGLOMERADO', suffixes=('_MIN', '_MAX'))
+
+    # Cálculo de variaciones
+    df_emp_des['var_tasa_Empleo'] = df_emp_des['Tasa de Empleo_MAX'] - df_emp_des['Tasa de Empleo_MIN']
+    df_emp_des['var_tasa_Desempleo'] = df_emp_des['Tasa de Desempleo_MAX'] - df_emp_des['Tasa de Desempleo_MIN']
+
+    # Coordenadas y nombre desde la dimensión de aglomerados (indexada por código)
+    df_emp_des['lat'], df_emp_des['lon'] = coordenadas_aglomerado(df_emp_des['AGLOMERADO'])
+    df_emp_des = mapear_nombres_aglomerados(df_emp_des)
+
+    # Sólo los aglomerados con coordenadas conocidas
+    return df_emp_des.dropna(subset=['lat', 'lon'])
+
+def construir_geojson_variacion(df, opcion):
+    """
+    Arma un FeatureCollection GeoJSON con un punto por aglomerado. Color, radio y popup se
+    calculan con operaciones vectorizadas sobre las columnas.
+
+    Parámetros:
+        df (pd.DataFrame): resultado de calcular_variacion_tasas.
+        opcion (str): "Tasa de Empleo" o "Tasa de Desempleo".
+
+    Retorna:
+        dict: FeatureCollection con las propiedades 'color', 'radio' y 'popup' por punto.
+    """
+    es_empleo = opcion == "Tasa de Empleo"
+    sufijo = 'Empleo' if es_empleo else 'Desempleo'
+    titulo = "📊 Variación Empleo" if es_empleo else "📉 Variación Desempleo"
+
+    variacion = df[f'var_tasa_{sufijo}']
+
+    # Subir es bueno para el empleo y malo para el desempleo
+    color = pd.Series(np.where((variacion > 0) == es_empleo, 'green', 'red'), index=df.index)
+
+    # Escalar tamaño del círculo
+    radio = (variacion.abs() * 2).clip(lower=4, upper=15)
+
+    inicio = df['ANO4_MIN'].astype(str) + ' T' + df['TRIMESTRE_MIN'].astype(str)
+    fin = df['ANO4_MAX'].astype(str) + ' T' + df['TRIMESTRE_MAX'].astype(str)
+    formato = '{:.2f}%'.format
+
+    # Formato del popup
+    popup = ('<div style="font-family: Arial; font-size: 13px;">'
+             '<strong>📍 ' + df['AGLOMERADO_NOMBRE'] + '</strong><br>'
+             f'<strong>{titulo}</strong><br>'
+             'Periodo: <em>' + inicio + ' → ' + fin + '</em><br>'
+             'Tasa inicial: ' + df[f'Tasa de {sufijo}_MIN'].map(formato) + '<br>'
+             'Tasa final: ' + df[f'Tasa de {sufijo}_MAX'].map(formato) + '<br>'
+             'Variación: <span style="color:' + color + '; font-weight:bold;">' + variacion.map(formato) + '</span>'
+             '</div>')
+
+    propiedades = pd.DataFrame({'color': color, 'radio': radio, 'popup': popup}).to_dict('records')
+
+    return {
+        'type': 'FeatureCollection',
+        'features': [
+            {'type': 'Feature', 'geometry': {'type': 'Point', 'coordinates': [lon, lat]}, 'properties': prop}
+            for lon, lat, prop in zip(df['lon'].tolist(), df['lat'].tolist(), propiedades)
+        ]
+    }
+
+@st.cache_data(show_spinner=False)
+def mapa_variacion_html(opcion, version, _df_variacion):
+    """
+    Genera el HTML del mapa de variación para la tasa elegida. Se cachea por (opción, versión de los
+    datos), así alternar entre Empleo y Desempleo no vuelve a serializar el mapa.
+
+    Parámetros:
+        opcion (str): "Tasa de Empleo" o "Tasa de Desempleo".
+        version: identificador de la versión de los datos procesados.
+        _df_variacion (pd.DataFrame): resultado de calcular_variacion_tasas.
+
+    Retorna:
+        str: documento HTML del mapa.
+    """
+    mapa = folium.Map(location=[-34.5, -58], zoom_start=5)
+
+    # Un único GeoJson con todos los puntos en lugar de un CircleMarker por fila
+    folium.GeoJson(
+        construir_geojson_variacion(_df_variacion, opcion),
+        marker=folium.CircleMarker(fill=True, fill_opacity=0.7),
+        style_function=lambda feature: {
+            'color': feature['properties']['color'],
+            'fillColor': feature['properties']['color'],
+            'radius': feature['properties']['radio'],
+        },
+        popup=folium.GeoJsonPopup(fields=['popup'], labels=False, max_width=250),
+    ).add_to(mapa)
+
+    return mapa.get_root().render()
+
 #-----------------------------------------------------------------------------------------------------------------------------
 # STREAMLIT APP: ACTIVIDAD Y EMPLEO
 #-----------------------------------------------------------------------------------------------------------------------------
@@ -378,10 +532,9 @@ if 'df_ind' in st.session_state and not st.session_state.df_ind.empty:
     # ARMADO DATASET
     #-----------------------------------------------------------------------------------------------------------------------------
     # Filtro el Dataset con las variables que voy a utilizar
-    df_empleo = st.session_state.df_ind[['AGLOMERADO', 'ANO4', 'TRIMESTRE', 'NIVEL_ED_str', 'CONDICION_LABORAL', 'PONDERA', 'PP04A']].copy()
+    df_empleo = st.session_state.df_ind[['CODUSU', 'NRO_HOGAR', 'AGLOMERADO', 'ANO4', 'TRIMESTRE', 'NIVEL_ED_str', 'CONDICION_LABORAL', 'PONDERA', 'PP04A']].copy()
 
-    df_empleo = mapear_nombres_aglomerados(df_empleo)
-    aglomerados = listar(df_empleo, 'AGLOMERADO_NOMBRE')
+    aglomerados = get_codigos_aglomerado(df_empleo['AGLOMERADO'])
                                    
     # Listados
     anio_trim = df_empleo.groupby('ANO4')['TRIMESTRE'].unique().apply(list).to_dict() #Listado año_trimestre
@@ -391,7 +544,11 @@ if 'df_ind' in st.session_state and not st.session_state.df_ind.empty:
     #-----------------------------------------------------------------------------------------------------------------------------
 
     st.sidebar.markdown("### Secciones")
-    secciones_emp = ['🎓 Educación y Desempleo', '📈 Evolución Laboral', '🏢 Sectores de Empleo', '🗺️ Mapa de variación empleabilidad']
+    secciones_emp = ['🎓 Educación y Desempleo', '📈 Evolución Laboral', '🏢 Sectores de Empleo', '🗺️ Mapa de variación empleabilidad', '🔄 Transiciones Laborales']
+
+    # Transiciones materializadas al actualizar (vacías si los datos se procesaron antes de existir el panel)
+    df_transiciones = st.session_state.get('df_transiciones', pd.DataFrame())
+    salto_panel = 1
     tab = st.sidebar.radio("Seleccionar sección:", secciones_emp)
 
     with st.sidebar:
@@ -402,10 +559,25 @@ if 'df_ind' in st.session_state and not st.session_state.df_ind.empty:
                 trimestre = st.selectbox("Trimestre:", sorted(df_empleo[df_empleo['ANO4'] == anio]['TRIMESTRE'].unique()))
         
         if tab == secciones_emp[1]:
-            seleccionados = st.multiselect("🗺️ Seleccioná uno o más aglomerados",options=aglomerados,default=aglomerados,key="desempleo_aglomerados")
+            seleccionados = st.multiselect("🗺️ Seleccioná uno o más aglomerados",options=aglomerados,default=aglomerados,key="desempleo_aglomerados",format_func=nombre_aglomerado)
             if not seleccionados:
                 seleccionados = aglomerados
 
+        if tab == secciones_emp[4] and not df_transiciones.empty:
+            st.markdown("### Filtros")
+            horizontes = {"Trimestre siguiente": 1, "Mismo trimestre del año siguiente": 4}
+            salto_panel = horizontes[st.radio("Comparar con:", list(horizontes), key="panel_horizonte")]
+            if salto_panel != 1:
+                # Las transiciones interanuales no se materializan: se vinculan con el índice guardado
+                df_transiciones = transiciones_por_salto(version_datos(), salto_panel)
+
+        if tab == secciones_emp[4] and not df_transiciones.empty:
+            periodos_panel = df_transiciones[['ANO4', 'TRIMESTRE']].drop_duplicates().sort_values(['ANO4', 'TRIMESTRE'])
+            anio_panel = st.selectbox("Año:", periodos_panel['ANO4'].unique(), key="panel_anio")
+            trimestre_panel = st.selectbox("Trimestre de origen:", periodos_panel.loc[periodos_panel['ANO4'] == anio_panel, 'TRIMESTRE'], key="panel_trimestre")
+            aglomerado_panel = st.selectbox("🗺️ Aglomerado:", [AGLOMERADO_TOTAL] + get_codigos_aglomerado(df_transiciones.loc[df_transiciones['AGLOMERADO'] != AGLOMERADO_TOTAL, 'AGLOMERADO']),
+                                            format_func=lambda codigo: "Total aglomerados" if codigo == AGLOMERADO_TOTAL else nombre_aglomerado(codigo), key="panel_aglomerado")
+
     #-----------------------------------------------------------------------------------------------------------------------------
     # Sección 1: Educación y Desempleo
     #-----------------------------------------------------------------------------------------------------------------------------
@@ -500,7 +672,7 @@ if 'df_ind' in st.session_state and not st.session_state.df_ind.empty:
         # ========================================================================================
 
         # Filtrar por aglomerados seleccionados
-        df_aglomerados = df_empleo[df_empleo['AGLOMERADO_NOMBRE'].isin(seleccionados)]
+        df_aglomerados = df_empleo[df_empleo['AGLOMERADO'].isin(seleccionados)]
 
         # Mantener solo población económicamente activa
         condiciones_activas = ['Ocupado autónomo', 'Ocupado dependiente', 'Desocupado']
@@ -508,17 +680,17 @@ if 'df_ind' in st.session_state and not st.session_state.df_ind.empty:
 
         # Calcular tasa de DESOCUPACIÓN (total y por aglomerado)
         df_desemp_total = agregar_columna_fecha(calcular_tasa_emp_desemp(df_activos, condicion='Desocupado'))
-        df_desemp_aglomerado = agregar_columna_fecha(
+        df_desemp_aglomerado = mapear_nombres_aglomerados(agregar_columna_fecha(
             calcular_tasa_emp_desemp(df_activos, condicion='Desocupado',
-                                    agrupacion=['ANO4', 'TRIMESTRE', 'AGLOMERADO_NOMBRE'])
-        )
+                                    agrupacion=['ANO4', 'TRIMESTRE', 'AGLOMERADO'])
+        ))
 
         # Calcular tasa de EMPLEO (total y por aglomerado)
         df_ocupados_total = agregar_columna_fecha(calcular_tasa_emp_desemp(df_activos, condicion='Ocupado'))
-        df_ocupados_aglomerado = agregar_columna_fecha(
+        df_ocupados_aglomerado = mapear_nombres_aglomerados(agregar_columna_fecha(
             calcular_tasa_emp_desemp(df_activos, condicion='Ocupado',
-                                    agrupacion=['ANO4', 'TRIMESTRE', 'AGLOMERADO_NOMBRE'])
-        )
+                                    agrupacion=['ANO4', 'TRIMESTRE', 'AGLOMERADO'])
+        ))
         # ========================================================================================
         # VISUALIZACIÓN CON STREAMLIT
         # ========================================================================================
@@ -545,6 +717,17 @@ if 'df_ind' in st.session_state and not st.session_state.df_ind.empty:
             graficar_tasa(df_desemp_aglomerado, 'Fecha', 'Tasa de Desempleo',
                         'Tasa de Desempleo por Aglomerado', color='AGLOMERADO_NOMBRE')
 
+        # Precisión de las tasas: se calcula sólo al abrir el detalle
+        with st.expander("📏 Precisión de la tasa de desempleo (intervalos de confianza del 95%)"):
+            st.caption("Estimados con 200 réplicas bootstrap de los ponderadores, sorteando hogares dentro de cada aglomerado. "
+                       "Un coeficiente de variación (CV) mayor a 15% indica una estimación poco precisa.")
+            if st.toggle("Calcular intervalos", key="intervalos_desempleo"):
+                df_intervalos = calcular_intervalos_desempleo(version_datos(), tuple(sorted(seleccionados)), df_activos)
+                st.dataframe(df_intervalos.rename(columns={
+                    'AGLOMERADO_NOMBRE': 'Aglomerado', 'ESTIMACION': 'Tasa de Desempleo', 'ERROR_ESTANDAR': 'Error estándar',
+                    'LI': 'Límite inferior', 'LS': 'Límite superior', 'CV': 'CV (%)'
+                }).style.format(precision=2), use_container_width=True, hide_index=True)
+
         st.markdown("---")
 
         # ---------- EMPLEO ----------
@@ -589,13 +772,16 @@ if 'df_ind' in st.session_state and not st.session_state.df_ind.empty:
         df_ocupado = df_empleo[df_empleo['CONDICION_LABORAL'].str.contains('Ocupado', na=False)]
 
         #Armo mi tabla Estatal,Privado, Otro Tipo
-        tabla = df_ocupado.groupby(['AGLOMERADO_NOMBRE', 'Tipo_empleo'])['PONDERA'].sum().unstack(fill_value=0)
+        tabla = df_ocupado.groupby(['AGLOMERADO', 'Tipo_empleo'])['PONDERA'].sum().unstack(fill_value=0)
         tabla['Total_ocupados'] = tabla.sum(axis=1)
         tabla['% Estatal'] = round((tabla['Estatal'] / tabla['Total_ocupados']) * 100, 2)
         tabla['% Privado'] = round((tabla['Privado'] / tabla['Total_ocupados']) * 100, 2)
         tabla['% Otro tipo'] = round((tabla['Otro tipo'] / tabla['Total_ocupados']) * 100, 2)
         df_ocupados_aglomerado = tabla[['Total_ocupados', '% Estatal', '% Privado', '% Otro tipo']].reset_index()
 
+        # Nombres sólo para mostrar
+        df_ocupados_aglomerado.insert(0, 'AGLOMERADO_NOMBRE', nombre_aglomerado(df_ocupados_aglomerado.pop('AGLOMERADO')))
+
 
         # ========================================================================================
         # PRESENTACION STREAMLIT
@@ -620,40 +806,9 @@ if 'df_ind' in st.session_state and not st.session_state.df_ind.empty:
     # 5. Mapa comparativo - PROCESAMIENTO
     # ----------------------------------------
     if tab == secciones_emp[3]:
-        # Aplico función de tasa de empleo y desempleo
-        df_emp_des = calcular_tasa_emp_desemp(df_empleo, condicion=None, agrupacion=['AGLOMERADO_NOMBRE', 'ANO4', 'TRIMESTRE'])
-
-        # Ordeno y obtengo primeros y últimos registros por aglomerado
-        df_sorted = df_emp_des.sort_values(by=['AGLOMERADO_NOMBRE', 'ANO4', 'TRIMESTRE'])
-        min_date = df_sorted.drop_duplicates(subset='AGLOMERADO_NOMBRE', keep='first')
-        max_date = df_sorted.drop_duplicates(subset='AGLOMERADO_NOMBRE', keep='last')
-
-        # Merge entre el primer y último registro de cada aglomerado
-        df_emp_des = pd.merge(min_date, max_date, on='AGLOMERADO_NOMBRE', suffixes=('_MIN', '_MAX'))
-
-        # Cálculo de variaciones
-        df_emp_des['var_tasa_Empleo'] = df_emp_des['Tasa de Empleo_MAX'] - df_emp_des['Tasa de Empleo_MIN']
-        df_emp_des['var_tasa_Desempleo'] = df_emp_des['Tasa de Desempleo_MAX'] - df_emp_des['Tasa de Desempleo_MIN']
-
-          # Agrego columnas de fecha para el popup
-        df_emp_des['anio_ini'] = df_emp_des['ANO4_MIN']
-        df_emp_des['trim_ini'] = df_emp_des['TRIMESTRE_MIN']
-        df_emp_des['anio_fin'] = df_emp_des['ANO4_MAX']
-        df_emp_des['trim_fin'] = df_emp_des['TRIMESTRE_MAX']
-
-        # Selección de columnas
-        df_emp_des = df_emp_des[[
-            'AGLOMERADO_NOMBRE', 'Tasa de Empleo_MIN', 'Tasa de Empleo_MAX', 'var_tasa_Empleo',
-            'Tasa de Desempleo_MIN', 'Tasa de Desempleo_MAX', 'var_tasa_Desempleo',
-            'anio_ini', 'trim_ini', 'anio_fin', 'trim_fin'
-        ]]
-
-        # Lectura y limpieza del archivo de coordenadas
-        df_coord = pd.read_json(COORDENADAS_AGLOMERADOS).T
-        df_coord['nombre'] = df_coord['nombre'].str.replace('–', '-', regex=False)
-
-        # Merge con coordenadas
-        df_emp_des = pd.merge(df_emp_des, df_coord, left_on='AGLOMERADO_NOMBRE', right_on='nombre', how='inner').drop(columns='nombre')
+        # Variaciones por aglomerado, cacheadas por versión de los datos
+        version = version_datos()
+        df_emp_des = calcular_variacion_tasas(version, df_empleo)
 
         # ----------------------------------------
         # 5. Mapa comparativo - STREAMLIT
@@ -666,52 +821,53 @@ if 'df_ind' in st.session_state and not st.session_state.df_ind.empty:
 
         st.markdown(f"**🗺️ Mapa de variación de {opcion.lower()} entre los extremos temporales disponibles**")
 
-        mapa = folium.Map(location=[-34.5, -58], zoom_start=5)
-
-        # Recorro el df y agrego los puntos
-        for _, row in df_emp_des.iterrows():
-            lat, lon = row['coordenadas']
-            inicio = f"{row['anio_ini']} T{row['trim_ini']}"
-            fin = f"{row['anio_fin']} T{row['trim_fin']}"
+        # Mostrar el mapa ya renderizado (cacheado por opción y versión)
+        components.html(mapa_variacion_html(opcion, version, df_emp_des), width=700, height=500)
+        st.markdown("---")
+        st.caption("📊 Fuente: Encuesta Permanente de Hogares (EPH) - INDEC")
 
-            if opcion == "Tasa de Empleo":
-                variacion = row['var_tasa_Empleo']
-                tasa_ini = row['Tasa de Empleo_MIN']
-                tasa_fin = row['Tasa de Empleo_MAX']
-                color = "green" if variacion > 0 else "red"
-                titulo = "📊 Variación Empleo"
+    # ========================================================================================================================================================================================================================
+    # Sección 6: Transiciones laborales entre trimestres consecutivos (panel rotativo)
+    # ========================================================================================================================================================================================================================
+    if tab == secciones_emp[4]:
+        st.header("🔄 Transiciones Laborales entre Trimestres")
+
+        if df_transiciones.empty and salto_panel != 1:
+            st.warning("No hay transiciones interanuales: los datos no tienen personas encuestadas en el mismo trimestre de dos años "
+                       "consecutivos, o hay que volver a actualizarlos en la página de Carga de Datos.", icon="⚠️")
+        elif df_transiciones.empty:
+            st.warning("No hay transiciones calculadas. Volvé a actualizar los datos en la página de Carga de Datos.", icon="⚠️")
+        else:
+            # ========================================================================================
+            # PROCESAMIENTO DE LA INFORMACIÓN
+            # ========================================================================================
+
+            # Matriz ya calculada: sólo se elige el período y el aglomerado
+            matriz = matriz_transicion(df_transiciones, anio_panel, trimestre_panel, aglomerado_panel)
+            matriz = matriz.rename(index=ESTADOS_ACTIVIDAD, columns=ESTADOS_ACTIVIDAD)
+            personas = matriz_transicion(df_transiciones, anio_panel, trimestre_panel, aglomerado_panel, valor='CANTIDAD').to_numpy().sum()
+
+            if salto_panel == 4:
+                siguiente = (anio_panel + 1, trimestre_panel)
             else:
-                variacion = row['var_tasa_Desempleo']
-                tasa_ini = row['Tasa de Desempleo_MIN']
-                tasa_fin = row['Tasa de Desempleo_MAX']
-                color = "red" if variacion > 0 else "green"
-                titulo = "📉 Variación Desempleo"
-
-            # Escalar tamaño del círculo
-            radio = max(4, min(15, abs(variacion) * 2))
-
-            # Formato del popup
-            popup_html = f"""
-            <div style="font-family: Arial; font-size: 13px;">
-                <strong>📍 {row['AGLOMERADO_NOMBRE']}</strong><br>
-                <strong>{titulo}</strong><br>
-                Periodo: <em>{inicio} → {fin}</em><br>
-                Tasa inicial: {tasa_ini:.2f}%<br>
-                Tasa final: {tasa_fin:.2f}%<br>
-                Variación: <span style="color:{color}; font-weight:bold;">{variacion:.2f}%</span>
-            </div>
-            """
-            folium.CircleMarker(
-                location=[lat, lon],
-                radius=radio,
-                color=color,
-                fill=True,
-                fill_opacity=0.7,
-                popup=folium.Popup(popup_html, max_width=250)
-            ).add_to(mapa)
-
-        # Mostrar el mapa fuera del bucle
-        st_folium(mapa, width=700, height=500)
+                siguiente = (anio_panel + 1, 1) if trimestre_panel == 4 else (anio_panel, trimestre_panel + 1)
+
+            # ========================================================================================
+            # PRESENTACION STREAMLIT
+            # ========================================================================================
+            st.info(f"Porcentaje ponderado de personas en cada condición de actividad en el **trimestre {trimestre_panel} de {anio_panel}** "
+                    f"según su condición en el **trimestre {siguiente[1]} de {siguiente[0]}**. Se consideran las personas que la EPH "
+                    f"vuelve a encuestar en el trimestre {siguiente[1]} de {siguiente[0]} (panel rotativo).")
+
+            st.metric(label="🔢 Personas encuestadas en ambos trimestres", value=f"{personas:,.0f}")
+
+            fig = px.imshow(matriz, text_auto='.1f', color_continuous_scale='Blues', aspect='auto',
+                            labels=dict(x=f"Condición en t+{salto_panel}", y="Condición en t", color="%"))
+            st.plotly_chart(fig, use_container_width=True)
+
+            with st.expander("📋 Tabla detalle: matriz de transición (%)"):
+                st.dataframe(matriz.style.format("{:.2f}%"), use_container_width=True)
+
         st.markdown("---")
         st.caption("📊 Fuente: Encuesta Permanente de Hogares (EPH) - INDEC")
 else:
@@ -4,6 +4,7 @@ import pandas as pd
 from src.utils.streamlit import *
 from src.utils.constants import *
 from src.consultas.consultas import generar_ranking_hogares_universitarios
+from src.utils.varianza import estimar
 import io
 
 #----------------------------------------titulo----------------------
@@ -329,6 +330,25 @@ def alfabetismo_porcentaje(df_ind):
 
     return agrupado
 
+@st.cache_data(show_spinner=False)
+def calcular_intervalos_alfabetismo(version, anios, _df_ind):
+    """
+    % de alfabetizados en personas de 6 años o más con error estándar e intervalo de confianza
+    del 95% (bootstrap por hogares), por año y trimestre.
+
+    Se cachea por versión de los datos y años seleccionados: el DataFrame no se hashea.
+
+    Parámetros:
+        version: identificador de la versión de los datos procesados.
+        anios (tuple): años a estimar.
+        _df_ind (pd.DataFrame): individuos con 'CODUSU', 'NRO_HOGAR', 'AGLOMERADO', 'CH06', 'CH09' y 'PONDERA'.
+
+    Retorna:
+        pd.DataFrame: 'ANO4', 'TRIMESTRE' y las columnas de estimar.
+    """
+    df_filtrado = _df_ind[(_df_ind['CH06'].astype(int) >= 6) & _df_ind['CH09'].isin([1, 2]) & _df_ind['ANO4'].isin(anios)]
+    return estimar(df_filtrado, df_filtrado['CH09'] == 1, agrupacion=['ANO4', 'TRIMESTRE'])
+
 def punto_educacion_4(df_ind):
     """
     Muestra el porcentaje de alfabetización en personas mayores a 6 años por año y trimestre.
@@ -428,6 +448,17 @@ def punto_educacion_4(df_ind):
         st.markdown("📋 **Tabla de alfabetización por año**")
         st.dataframe(df_alf[['Año', 'Alfabetos', 'No Alfabetos']], hide_index=True)
 
+    # Precisión del porcentaje: se calcula sólo al abrir el detalle
+    with st.expander("📏 Precisión del porcentaje de alfabetización (intervalos de confianza del 95%)"):
+        st.caption("Estimados con 200 réplicas bootstrap de los ponderadores, sorteando hogares dentro de cada aglomerado. "
+                   "Un coeficiente de variación (CV) mayor a 15% indica una estimación poco precisa.")
+        if st.toggle("Calcular intervalos", key="intervalos_alfabetismo"):
+            df_intervalos = calcular_intervalos_alfabetismo(version_datos(), tuple(sorted(seleccion)), df_ind)
+            st.dataframe(df_intervalos.rename(columns={
+                'ANO4': 'Año', 'TRIMESTRE': 'Trimestre', 'ESTIMACION': '% Alfabetos', 'ERROR_ESTANDAR': 'Error estándar',
+                'LI': 'Límite inferior', 'LS': 'Límite superior', 'CV': 'CV (%)'
+            }).style.format(precision=2), use_container_width=True, hide_index=True)
+
 # ------------------------ESTRUCTURA DE LA PAGINA---------------------------------------------------
 
 if 'df_ind' in st.session_state and not st.session_state.df_ind.empty:
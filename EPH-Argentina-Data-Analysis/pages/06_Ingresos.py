@@ -2,45 +2,12 @@ import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
 
-from src.utils.constants import  TRIMESTRES, RUTA_ARCHIVO_CANASTA
+from src.utils.constants import RUTA_ARCHIVO_CANASTA
+from src.utils.canasta import calculo_promedio_lineas_trimestre
+from src.utils.varianza import estimar
 
 # Funciones Auxiliares
 
-def calculo_promedio_lineas_trimestre(trimestre_ingresado, anio_ingresado, ruta):
-    
-    """
-    Calcula los promedios trimestrales de las líneas de indigencia y pobreza.
-
-    Parámetros:
-        trimestre_ingresado (int): Número de trimestre (1 al 4).
-        anio_ingresado (int): Año deseado.
-        ruta (Path): Ruta al archivo CSV.
-
-    Retorna:
-        dict: Diccionario con los valores promedio de 'linea_pobreza' y 'linea_indigencia'.
-    """
-    try:
-        df_canasta_basica = pd.read_csv(ruta)
-    except Exception as e:
-        raise FileNotFoundError(f"No se pudo leer el archivo en {ruta}: {e}")
-
-    meses_trimestre = TRIMESTRES[trimestre_ingresado]
-    
-    df_canasta_basica['indice_tiempo'] = pd.to_datetime(df_canasta_basica.indice_tiempo)
-    df_filtrado = df_canasta_basica[(df_canasta_basica.indice_tiempo.dt.year == anio_ingresado) & (df_canasta_basica.indice_tiempo.dt.month.isin(meses_trimestre))]
-    
-    if df_filtrado.empty:
-        raise ValueError(f"No hay datos para el trimestre {trimestre_ingresado} del año {anio_ingresado}.")
-
-    prom_indigencia = round(df_filtrado['linea_indigencia'].mean(), 2)
-    prom_pobreza = round(df_filtrado['linea_pobreza'].mean(), 2)
- 
-    return {
-        'linea_pobreza': float(prom_pobreza),
-        'linea_indigencia': float(prom_indigencia)
-    }
-
-
 def extraer_anios_trimestres_hogares(df):
     """
         Filtra el dataframe procesado de hogares buscando los (anios, trimestres) disponibles
@@ -66,7 +33,8 @@ def cantidad_porcentaje_pobreza_indigencia(df_hogares, anio, trimestre, promedio
             Promedio_lineas_actual: promedio de la linea de pobreza e indigencia en ese trimestre
             incluir_ceros: booleano para determinar si se filtran o no los ceros
         Retorna:
-            Dataframe con los valores cantidad y porcentaje de pobreza e indigencia en el periodo seleccionado
+            Dataframe con los valores cantidad y porcentaje de pobreza e indigencia en el periodo seleccionado,
+            y el intervalo de confianza del 95% de cada porcentaje (LI, LS) estimado con réplicas bootstrap
     """
     filtro_fecha_cantidad_personas = ((df_hogares['ANO4'] == anio) & 
                                       (df_hogares['TRIMESTRE'] == trimestre) & 
@@ -99,6 +67,12 @@ def cantidad_porcentaje_pobreza_indigencia(df_hogares, anio, trimestre, promedio
     hogares_indigencia = df_filtrado[filtro_indigencia]['PONDERA'].sum()
     hogares_no_pobres = df_filtrado[filtro_no_pobres]['PONDERA'].sum()
 
+    # Intervalos de confianza de cada porcentaje (bootstrap por hogares dentro de cada aglomerado)
+    intervalos = {}
+    for categoria, filtro in (('no_pobres', filtro_no_pobres), ('pobreza', filtro_pobreza), ('indigencia', filtro_indigencia)):
+        estimacion = estimar(df_filtrado, filtro, agrupacion=['ANO4', 'TRIMESTRE'])
+        intervalos[categoria] = (estimacion['LI'].iloc[0], estimacion['LS'].iloc[0]) if not estimacion.empty else (0, 0)
+
     # Porcentajes
     porcentaje_pobreza = (hogares_pobreza / hogares_totales) * 100 if hogares_totales else 0
     porcentaje_indigencia = (hogares_indigencia / hogares_totales) * 100 if hogares_totales else 0
@@ -108,15 +82,18 @@ def cantidad_porcentaje_pobreza_indigencia(df_hogares, anio, trimestre, promedio
     df_resultado = pd.DataFrame([
         {'Categoria': 'Por encima de la línea de pobreza',
          'Cantidad': int(round(hogares_no_pobres)),   
-         'Porcentaje': round(porcentaje_no_pobres, 2)},
+         'Porcentaje': round(porcentaje_no_pobres, 2),
+         'LI': round(intervalos['no_pobres'][0], 2), 'LS': round(intervalos['no_pobres'][1], 2)},
         
         {'Categoria': 'Pobreza',          
          'Cantidad': int(round(hogares_pobreza)),     
-         'Porcentaje': round(porcentaje_pobreza, 2)},
+         'Porcentaje': round(porcentaje_pobreza, 2),
+         'LI': round(intervalos['pobreza'][0], 2), 'LS': round(intervalos['pobreza'][1], 2)},
         
         {'Categoria': 'Indigencia',       
          'Cantidad': int(round(hogares_indigencia)),  
-         'Porcentaje': round(porcentaje_indigencia, 2)}
+         'Porcentaje': round(porcentaje_indigencia, 2),
+         'LI': round(intervalos['indigencia'][0], 2), 'LS': round(intervalos['indigencia'][1], 2)}
     ])
     
     return df_resultado
@@ -181,7 +158,9 @@ if 'df_hogares' in st.session_state and not st.session_state.df_hogares.empty:
         # Muestra de la tabla generada
         st.markdown("### 🏠 Distribución de hogares")
         for _, row in df_hogares_pobres_indigentes.iterrows():
-            st.markdown(f"- **{row['Categoria']}**: {int(row['Cantidad']):,} hogares ({row['Porcentaje']:.2f}%)")
+            st.markdown(f"- **{row['Categoria']}**: {int(row['Cantidad']):,} hogares ({row['Porcentaje']:.2f}%, "
+                        f"IC 95%: {row['LI']:.2f}% – {row['LS']:.2f}%)")
+        st.caption("Intervalos estimados con 200 réplicas bootstrap de los ponderadores, sorteando hogares dentro de cada aglomerado.")
 
         # Selector de tipo de gráfico
         # Título con buen tamaño
@@ -1,5 +1,10 @@
-from src.utils.constants import AGLOMERADOS_NOMBRES, REGIONES_NOMBRES, NIVELES_EDUCATIVOS
+from src.utils.constants import REGIONES_NOMBRES, NIVELES_EDUCATIVOS
+from src.utils.aglomerados import nombre_aglomerado, codigo_aglomerado, TAMANIO
 from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
 
 # -----------------------------------------------------------------------------------
 # FUNCIONES PUNTO 1 (ANÁLISIS) - INDIVIDUOS
@@ -320,7 +325,7 @@ def calcular_porcentajes(resultados):
             porcentaje = ((propietarias / total) * 100)
         else:
             porcentaje = "0.0%"
-        nombre = AGLOMERADOS_NOMBRES.get(aglomerado, "Nombre no disponible")
+        nombre = nombre_aglomerado(aglomerado, "Nombre no disponible")
         lista.append((aglomerado, nombre, porcentaje))
 
     lista_ordenada = sorted(lista, key=lambda x: x[2], reverse=True)
@@ -475,7 +480,7 @@ def imprimir_info_porcentual_educacionsuperior_aglomerado(resultado):
 
     # Imprimo los resultados ordenados por porcentaje de mayor a menor
     for aglo, porcentaje in sorted(resultado.items(), key=lambda x: x[1], reverse=True):
-        nombre_aglo = AGLOMERADOS_NOMBRES.get(int(aglo), "Desconocido")
+        nombre_aglo = nombre_aglomerado(int(aglo), "Desconocido")
         aglo_texto = f"{aglo} - {nombre_aglo}"
         print(f"{aglo_texto:<40}{porcentaje:>15.2f}%")
 
@@ -608,7 +613,7 @@ def imprimo_tabla_nivel_educativo(conteo):
     for aglo, anios_trimestres in conteo.items():
         # Encabezado por aglomerado
         print(f"{'='*350}")
-        nombre_aglo = AGLOMERADOS_NOMBRES.get(int(aglo), "Desconocido")
+        nombre_aglo = nombre_aglomerado(int(aglo), "Desconocido")
         print(f"{'Aglomerado ':<15}{aglo} - {nombre_aglo}")
         print(f"{'*'*350}")
 
@@ -639,13 +644,11 @@ def tabla_nivel_educativo(data, aglomerado):
 
     """
 
-    # Convertimos el aglomerado una sola vez
-    aglomerado_normalizado = aglomerado.strip().lower()
-    if aglomerado.isdigit():
+    # Convertimos el aglomerado una sola vez (búsqueda directa en la dimensión de aglomerados)
+    if aglomerado.strip().isdigit():
         clave_aglo = int(aglomerado)
     else:
-        clave_aglo = next((cod for cod, nombre in AGLOMERADOS_NOMBRES.items(
-        ) if nombre.lower() == aglomerado_normalizado), None)
+        clave_aglo = codigo_aglomerado(aglomerado)
         if clave_aglo is None:
             raise ValueError(
                 f"No se encontró un aglomerado con el nombre '{aglomerado}'.")
@@ -684,6 +687,109 @@ def tabla_nivel_educativo(data, aglomerado):
     else:
         imprimo_tabla_nivel_educativo(conteo)
 
+
+def cubo_nivel_educativo(data):
+    """
+    Versión en lote de tabla_nivel_educativo: en un único recorrido de los datos acumula
+    la cantidad ponderada de personas mayores de 18 por nivel educativo para todos los
+    aglomerados y todos los períodos.
+
+    Parámetros:
+    data: Lista de registros EPH (diccionarios).
+
+    Retorna:
+        tuple: (cubo, periodos)
+            cubo: np.ndarray de forma (aglomerados, períodos, 7). La primera posición es el
+                  código de aglomerado y la última el nivel educativo (1 a 7) menos uno.
+            periodos: lista ordenada de tuplas (año, trimestre), una por posición del segundo eje.
+    """
+    aglos, posiciones, niveles, ponderas = [], [], [], []
+    periodos = {}
+
+    for row in data:
+        try:
+            # Primero los campos del filtro, para no convertir el resto en filas descartadas
+            edad = int(row["CH06"])
+            nivel_ed = int(row["NIVEL_ED"])
+            if edad < 18 or not 1 <= nivel_ed <= 7:
+                continue
+            aglo = int(row["AGLOMERADO"])
+            periodo = (int(row["ANO4"]), int(row["TRIMESTRE"]))
+            pondera = int(row["PONDERA"])
+        except (ValueError, KeyError):
+            continue
+
+        if not 0 <= aglo < TAMANIO:
+            continue
+
+        aglos.append(aglo)
+        posiciones.append(periodos.setdefault(periodo, len(periodos)))
+        niveles.append(nivel_ed - 1)
+        ponderas.append(pondera)
+
+    cubo = np.zeros((TAMANIO, len(periodos), len(NIVELES_EDUCATIVOS)), dtype=np.int64)
+    np.add.at(cubo, (np.array(aglos, dtype=np.intp), np.array(posiciones, dtype=np.intp),
+                     np.array(niveles, dtype=np.intp)), np.array(ponderas, dtype=np.int64))
+
+    # Los períodos se ordenan cronológicamente, reordenando el eje del cubo
+    orden = sorted(periodos)
+    cubo = cubo[:, [periodos[periodo] for periodo in orden], :]
+
+    return cubo, orden
+
+
+def tabla_cubo_nivel_educativo(cubo, periodos):
+    """
+    Convierte el cubo de cubo_nivel_educativo en una tabla con una fila por aglomerado y
+    período con datos, y una columna por nivel educativo.
+
+    Parámetros:
+    cubo: np.ndarray de forma (aglomerados, períodos, 7).
+    periodos: lista de tuplas (año, trimestre) del segundo eje del cubo.
+
+    Retorna:
+        pd.DataFrame: AGLOMERADO, NOMBRE_AGLOMERADO, ANO4, TRIMESTRE y los 7 niveles educativos.
+    """
+    # Celdas (aglomerado, período) con al menos una persona
+    aglos, posiciones = np.nonzero(cubo.sum(axis=2))
+    periodos = np.array(periodos, dtype=np.int64).reshape(-1, 2)
+
+    tabla = pd.DataFrame({
+        'AGLOMERADO': aglos,
+        'NOMBRE_AGLOMERADO': nombre_aglomerado(aglos, "Desconocido"),
+        'ANO4': periodos[posiciones, 0],
+        'TRIMESTRE': periodos[posiciones, 1]
+    })
+    niveles = pd.DataFrame(cubo[aglos, posiciones, :],
+                           columns=[NIVELES_EDUCATIVOS[nivel] for nivel in range(1, 8)])
+
+    return pd.concat([tabla, niveles], axis=1)
+
+
+def exportar_nivel_educativo(data, ruta):
+    """
+    Genera en un único recorrido la tabla de nivel educativo de todos los aglomerados y
+    la guarda en CSV (separado por ';') o Parquet, según la extensión del archivo.
+
+    Parámetros:
+    data: Lista de registros EPH (diccionarios).
+    ruta: Ruta del archivo de salida (.csv o .parquet).
+
+    Retorna:
+        pd.DataFrame: la tabla exportada.
+    """
+    ruta = Path(ruta)
+    tabla = tabla_cubo_nivel_educativo(*cubo_nivel_educativo(data))
+
+    if ruta.suffix.lower() == '.parquet':
+        tabla.to_parquet(ruta, index=False)
+    elif ruta.suffix.lower() in ('.csv', '.txt'):
+        tabla.to_csv(ruta, sep=';', index=False)
+    else:
+        raise ValueError(f"Formato no soportado: '{ruta.suffix}'. Use .csv o .parquet.")
+
+    return tabla
+
 # -----------------------------------------------------------------------------------
 # FUNCIONES PUNTO 10 (ANÁLISIS) - INDIVIDUOS
 # -----------------------------------------------------------------------------------
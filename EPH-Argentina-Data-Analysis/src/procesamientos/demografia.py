@@ -0,0 +1,114 @@
+# -------------------------------------------------------------------------------
+# TABLAS DEMOGRÁFICAS MATERIALIZADAS
+# -------------------------------------------------------------------------------
+# Se calculan una sola vez al actualizar los datos, para cada (año, trimestre, aglomerado).
+# Las filas con AGLOMERADO = 0 contienen el total de todos los aglomerados del período.
+
+import pandas as pd
+
+AGLOMERADO_TOTAL = 0
+
+COLUMNAS_DEMOGRAFIA = ['ANO4', 'TRIMESTRE', 'AGLOMERADO', 'CH06', 'CH04_str', 'PONDERA']
+
+CLAVES = ['ANO4', 'TRIMESTRE', 'AGLOMERADO']
+
+
+def agregar_por_edad(df_ind):
+    """
+    Agrupa los individuos por período, aglomerado, edad y sexo. Es la base de todas las tablas
+    demográficas (tiene a lo sumo una fila por edad y sexo en cada grupo), e incluye las filas
+    del total por período con AGLOMERADO = 0.
+
+    Se consideran sólo las personas con edad mayor a 0.
+
+    Parámetros:
+        df_ind (pd.DataFrame): individuos con las columnas de COLUMNAS_DEMOGRAFIA.
+
+    Retorna:
+        pd.DataFrame: CLAVES + ['CH06', 'CH04_str', 'CANTIDAD', 'PONDERA'].
+    """
+    df = df_ind.loc[df_ind['CH06'] > 0, COLUMNAS_DEMOGRAFIA].dropna()
+
+    base = df.groupby(CLAVES + ['CH06', 'CH04_str']).agg(
+        CANTIDAD=('PONDERA', 'size'),
+        PONDERA=('PONDERA', 'sum')
+    ).reset_index()
+
+    total = base.groupby(['ANO4', 'TRIMESTRE', 'CH06', 'CH04_str'])[['CANTIDAD', 'PONDERA']].sum().reset_index()
+    total['AGLOMERADO'] = AGLOMERADO_TOTAL
+
+    return pd.concat([base, total[base.columns]], ignore_index=True)
+
+
+def tabla_piramide(base):
+    """
+    Pirámide de edades por sexo en grupos de 10 años, ponderada.
+
+    Retorna:
+        pd.DataFrame: CLAVES + ['GRUPO_EDAD', 'GRUPO_EDAD_STR', 'SEXO_STR', 'CANTIDAD', 'POBLACION'].
+    """
+    piramide = base.assign(GRUPO_EDAD=base['CH06'] // 10 * 10).groupby(
+        CLAVES + ['GRUPO_EDAD', 'CH04_str']).agg(
+        CANTIDAD=('CANTIDAD', 'sum'),
+        POBLACION=('PONDERA', 'sum')
+    ).reset_index().rename(columns={'CH04_str': 'SEXO_STR'})
+
+    # La etiqueta se arma sobre la tabla ya agrupada
+    piramide.insert(piramide.columns.get_loc('GRUPO_EDAD') + 1, 'GRUPO_EDAD_STR',
+                    piramide['GRUPO_EDAD'].astype(int).astype(str) + '-' + (piramide['GRUPO_EDAD'] + 9).astype(int).astype(str))
+
+    return piramide.sort_values(CLAVES + ['GRUPO_EDAD', 'SEXO_STR'], ignore_index=True)
+
+
+def tabla_edades(base):
+    """
+    Edad media y mediana ponderadas, y población dependiente y activa.
+
+    - Dependiente: de 0 a 14 años y de 65 años o más.
+    - Activa: de 15 a 64 años.
+
+    Retorna:
+        pd.DataFrame: CLAVES + ['PERIODO', 'POBLACION', 'EDAD_MEDIA', 'EDAD_MEDIANA',
+        'DEPENDIENTE', 'ACTIVA', 'DEPENDENCIA_DEMOGRAFICA'].
+    """
+    por_edad = base.groupby(CLAVES + ['CH06'])['PONDERA'].sum().reset_index().sort_values(CLAVES + ['CH06'])
+    edad = por_edad['CH06']
+    pondera = por_edad['PONDERA']
+
+    sumas = por_edad.assign(
+        EDAD_PONDERADA=edad * pondera,
+        DEPENDIENTE=pondera.where((edad <= 14) | (edad >= 65), 0),
+        ACTIVA=pondera.where(edad.between(15, 64), 0)
+    ).groupby(CLAVES)[['PONDERA', 'EDAD_PONDERADA', 'DEPENDIENTE', 'ACTIVA']].sum()
+
+    # Mediana ponderada: primera edad en la que el acumulado alcanza la mitad del total
+    acumulado = pondera.groupby([por_edad[c] for c in CLAVES]).cumsum()
+    total = pondera.groupby([por_edad[c] for c in CLAVES]).transform('sum')
+    mediana = por_edad.loc[acumulado >= total / 2].groupby(CLAVES)['CH06'].first()
+
+    edades = pd.DataFrame({
+        'POBLACION': sumas['PONDERA'],
+        'EDAD_MEDIA': (sumas['EDAD_PONDERADA'] / sumas['PONDERA']).round(2),
+        'EDAD_MEDIANA': mediana,
+        'DEPENDIENTE': sumas['DEPENDIENTE'],
+        'ACTIVA': sumas['ACTIVA'],
+        'DEPENDENCIA_DEMOGRAFICA': (sumas['DEPENDIENTE'] / sumas['ACTIVA'] * 100).round(2)
+    }).reset_index()
+
+    edades.insert(len(CLAVES), 'PERIODO', edades['ANO4'].astype(str) + '-' + edades['TRIMESTRE'].astype(str))
+
+    return edades
+
+
+def materializar_demografia(df_ind):
+    """
+    Genera las tablas demográficas materializadas a partir de los individuos procesados.
+
+    Parámetros:
+        df_ind (pd.DataFrame): individuos con las columnas de COLUMNAS_DEMOGRAFIA.
+
+    Retorna:
+        tuple: (piramide, edades) según tabla_piramide y tabla_edades.
+    """
+    base = agregar_por_edad(df_ind)
+    return tabla_piramide(base), tabla_edades(base)
@@ -0,0 +1,172 @@
+# -------------------------------------------------------------------------------
+# PANEL ROTATIVO: VINCULACIÓN DE PERSONAS ENTRE TRIMESTRES
+# -------------------------------------------------------------------------------
+# La EPH sigue a cada vivienda con el esquema 2-2-2: dos trimestres en la muestra, dos
+# afuera y otros dos adentro. Una persona se identifica por (CODUSU, NRO_HOGAR, COMPONENTE).
+#
+# Al actualizar los datos se arma un índice con un hash de esa clave, ordenado por persona y
+# período, que apunta a la fila de cada observación en individuos_procesados. Con el índice
+# ordenado, la observación siguiente de una persona está en las filas de abajo, así que
+# vincular trimestres es comparar arreglos desplazados (sin buscar cada persona en la tabla).
+#
+# Las matrices de transición de ESTADO (t -> t+1) se materializan por (año, trimestre de
+# origen, aglomerado). Las filas con AGLOMERADO = 0 contienen el total del período.
+
+import numpy as np
+import pandas as pd
+
+from src.procesamientos.demografia import AGLOMERADO_TOTAL, CLAVES
+
+CLAVES_PERSONA = ['CODUSU', 'NRO_HOGAR', 'COMPONENTE']
+
+COLUMNAS_PANEL = CLAVES_PERSONA + ['ANO4', 'TRIMESTRE', 'AGLOMERADO', 'ESTADO', 'CH04', 'CH06', 'PONDERA']
+
+# ESTADO = 0: entrevista individual no realizada
+ESTADO_NO_RESPUESTA = 0
+
+
+def indice_panel(df_ind):
+    """
+    Arma el índice del panel: una fila por persona y período, ordenada por CLAVE y PERIODO.
+
+    - CLAVE: hash (uint64) de (CODUSU, NRO_HOGAR, COMPONENTE).
+    - PERIODO: número correlativo del trimestre (ANO4 * 4 + TRIMESTRE - 1).
+    - FILA: posición de la observación en df_ind.
+
+    Si una persona aparece dos veces en el mismo trimestre, se conserva la primera.
+
+    Parámetros:
+        df_ind (pd.DataFrame): individuos con las columnas de CLAVES_PERSONA, 'ANO4' y 'TRIMESTRE'.
+
+    Retorna:
+        pd.DataFrame: ['CLAVE', 'PERIODO', 'FILA'].
+    """
+    clave = pd.util.hash_pandas_object(df_ind[CLAVES_PERSONA], index=False).to_numpy()
+    periodo = (df_ind['ANO4'] * 4 + df_ind['TRIMESTRE'] - 1).to_numpy()
+
+    # lexsort ordena por la última clave primero
+    orden = np.lexsort((periodo, clave))
+    indice = pd.DataFrame({'CLAVE': clave[orden], 'PERIODO': periodo[orden], 'FILA': orden})
+
+    return indice.drop_duplicates(['CLAVE', 'PERIODO'], ignore_index=True)
+
+
+def vincular(indice, salto=1):
+    """
+    Pares de filas de la misma persona en el período t y en t + salto (salto=1 para el
+    trimestre siguiente, salto=4 para el mismo trimestre del año siguiente).
+
+    Como el índice está ordenado y una persona no repite período, la observación de t + salto
+    está a lo sumo `salto` filas más abajo: alcanza con comparar el índice con sí mismo
+    desplazado 1, ..., salto filas.
+
+    Parámetros:
+        indice (pd.DataFrame): índice de indice_panel.
+        salto (int): cantidad de trimestres entre las dos observaciones.
+
+    Retorna:
+        pd.DataFrame: ['FILA_ORIGEN', 'FILA_DESTINO'] (filas de df_ind).
+    """
+    clave = indice['CLAVE'].to_numpy()
+    periodo = indice['PERIODO'].to_numpy()
+    fila = indice['FILA'].to_numpy()
+
+    origenes, destinos = [], []
+    for desplazamiento in range(1, salto + 1):
+        coincide = ((clave[desplazamiento:] == clave[:-desplazamiento]) &
+                    (periodo[desplazamiento:] == periodo[:-desplazamiento] + salto))
+        origenes.append(fila[:-desplazamiento][coincide])
+        destinos.append(fila[desplazamiento:][coincide])
+
+    return pd.DataFrame({
+        'FILA_ORIGEN': np.concatenate(origenes).astype(np.int64),
+        'FILA_DESTINO': np.concatenate(destinos).astype(np.int64)
+    })
+
+
+def tabla_transiciones(df_ind, pares):
+    """
+    Matrices de transición de ESTADO entre las observaciones vinculadas, en formato largo.
+
+    Se descartan los pares con entrevista individual no realizada y los que no son la misma
+    persona según sexo y edad (mismo CH04 y entre 1 año menos y 2 más en CH06), que pueden
+    aparecer cuando cambia la composición del hogar. Se pondera con el PONDERA del trimestre
+    de origen.
+
+    Parámetros:
+        df_ind (pd.DataFrame): individuos con las columnas de COLUMNAS_PANEL.
+        pares (pd.DataFrame): pares de vincular.
+
+    Retorna:
+        pd.DataFrame: CLAVES (del trimestre de origen) + ['ESTADO_ORIGEN', 'ESTADO_DESTINO',
+        'CANTIDAD', 'PONDERA', 'PROPORCION'], donde PROPORCION es el porcentaje ponderado de
+        ESTADO_ORIGEN que pasa a ESTADO_DESTINO.
+    """
+    origen = pares['FILA_ORIGEN'].to_numpy()
+    destino = pares['FILA_DESTINO'].to_numpy()
+
+    def columna(nombre, filas):
+        return df_ind[nombre].to_numpy()[filas]
+
+    vinculos = pd.DataFrame({
+        'ANO4': columna('ANO4', origen),
+        'TRIMESTRE': columna('TRIMESTRE', origen),
+        'AGLOMERADO': columna('AGLOMERADO', origen),
+        'ESTADO_ORIGEN': columna('ESTADO', origen),
+        'ESTADO_DESTINO': columna('ESTADO', destino),
+        'PONDERA': columna('PONDERA', origen)
+    })
+
+    diferencia_edad = columna('CH06', destino) - columna('CH06', origen)
+    validos = ((vinculos['ESTADO_ORIGEN'] != ESTADO_NO_RESPUESTA) &
+               (vinculos['ESTADO_DESTINO'] != ESTADO_NO_RESPUESTA) &
+               (columna('CH04', origen) == columna('CH04', destino)) &
+               (diferencia_edad >= -1) & (diferencia_edad <= 2))
+    vinculos = vinculos.loc[validos]
+
+    base = vinculos.groupby(CLAVES + ['ESTADO_ORIGEN', 'ESTADO_DESTINO']).agg(
+        CANTIDAD=('PONDERA', 'size'),
+        PONDERA=('PONDERA', 'sum')
+    ).reset_index()
+
+    total = base.groupby(['ANO4', 'TRIMESTRE', 'ESTADO_ORIGEN', 'ESTADO_DESTINO'])[['CANTIDAD', 'PONDERA']].sum().reset_index()
+    total['AGLOMERADO'] = AGLOMERADO_TOTAL
+
+    transiciones = pd.concat([base, total[base.columns]], ignore_index=True)
+    por_origen = transiciones.groupby(CLAVES + ['ESTADO_ORIGEN'])['PONDERA'].transform('sum')
+    transiciones['PROPORCION'] = (transiciones['PONDERA'] / por_origen * 100).round(2)
+
+    return transiciones.sort_values(CLAVES + ['ESTADO_ORIGEN', 'ESTADO_DESTINO'], ignore_index=True)
+
+
+def matriz_transicion(transiciones, anio, trimestre, aglomerado=AGLOMERADO_TOTAL, valor='PROPORCION'):
+    """
+    Matriz de transición de un período y aglomerado (filas: ESTADO_ORIGEN, columnas: ESTADO_DESTINO).
+
+    Parámetros:
+        transiciones (pd.DataFrame): tabla de tabla_transiciones.
+        anio, trimestre (int): trimestre de origen.
+        aglomerado (int): código del aglomerado, o AGLOMERADO_TOTAL.
+        valor (str): 'PROPORCION', 'PONDERA' o 'CANTIDAD'.
+
+    Retorna:
+        pd.DataFrame: la matriz, con 0 en las transiciones que no ocurrieron.
+    """
+    seleccion = transiciones.loc[(transiciones['ANO4'] == anio) & (transiciones['TRIMESTRE'] == trimestre) &
+                                 (transiciones['AGLOMERADO'] == aglomerado)]
+    return seleccion.pivot(index='ESTADO_ORIGEN', columns='ESTADO_DESTINO', values=valor).fillna(0)
+
+
+def materializar_panel(df_ind):
+    """
+    Genera el índice del panel y las transiciones entre trimestres consecutivos.
+
+    Parámetros:
+        df_ind (pd.DataFrame): individuos con las columnas de COLUMNAS_PANEL, en el orden del
+        archivo de individuos procesados (FILA es la posición en ese archivo).
+
+    Retorna:
+        tuple: (indice, transiciones) según indice_panel y tabla_transiciones.
+    """
+    indice = indice_panel(df_ind)
+    return indice, tabla_transiciones(df_ind, vincular(indice, salto=1))
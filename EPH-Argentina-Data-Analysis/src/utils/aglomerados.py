@@ -0,0 +1,106 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from src.utils.constants import AGLOMERADOS_NOMBRES, AGLOMERADOS_REGIONES, REGIONES_NOMBRES, COORDENADAS_AGLOMERADOS
+
+# -------------------------------------------------------------------------------
+# DIMENSIÓN AGLOMERADOS
+# -------------------------------------------------------------------------------
+# Tabla única de aglomerados indexada por el código entero AGLOMERADO. Cada atributo es un
+# array de NumPy donde la posición es el código, así que buscar un atributo (o el de toda una
+# columna de códigos) es indexar el array directamente.
+
+CODIGOS = np.array(sorted(AGLOMERADOS_NOMBRES), dtype=np.int16)
+TAMANIO = int(CODIGOS.max()) + 1
+
+NOMBRES = np.full(TAMANIO, None, dtype=object)
+NOMBRES[CODIGOS] = [AGLOMERADOS_NOMBRES[codigo] for codigo in CODIGOS]
+
+REGIONES = np.zeros(TAMANIO, dtype=np.int16)
+REGIONES[list(AGLOMERADOS_REGIONES)] = list(AGLOMERADOS_REGIONES.values())
+
+LATITUDES = np.full(TAMANIO, np.nan)
+LONGITUDES = np.full(TAMANIO, np.nan)
+
+
+def _cargar_coordenadas(ruta=COORDENADAS_AGLOMERADOS):
+    """
+    Carga las coordenadas del archivo JSON (claves como texto con ceros a la izquierda) en los
+    arrays LATITUDES y LONGITUDES, usando el código entero como posición.
+    """
+    try:
+        with open(ruta, encoding='utf-8') as archivo:
+            coordenadas = json.load(archivo)
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        print(f"❌ Error: no se pudieron leer las coordenadas de {ruta}: {e}")
+        return
+
+    for clave, datos in coordenadas.items():
+        codigo = int(clave)
+        if codigo < TAMANIO:
+            LATITUDES[codigo], LONGITUDES[codigo] = datos['coordenadas']
+
+
+_cargar_coordenadas()
+
+# Índice inverso nombre -> código (sin distinguir mayúsculas)
+_CODIGO_POR_NOMBRE = {nombre.lower(): codigo for codigo, nombre in AGLOMERADOS_NOMBRES.items()}
+
+
+def _indexar(array, codigos, default):
+    """
+    Indexa un array de la dimensión con un código o una colección de códigos.
+    Los códigos desconocidos devuelven el valor por defecto.
+    """
+    if isinstance(codigos, pd.Series):
+        return pd.Series(_indexar(array, codigos.to_numpy(), default), index=codigos.index, name=codigos.name)
+
+    codigos = np.asarray(codigos, dtype=float)
+    validos = (codigos >= 0) & (codigos < TAMANIO)
+    posiciones = np.where(validos, codigos, 0).astype(np.intp)
+    resultado = np.where(validos, array[posiciones], default)
+    if resultado.ndim == 0:
+        return resultado.item()
+    return resultado
+
+
+def nombre_aglomerado(codigos, default=None):
+    """
+    Devuelve el nombre del aglomerado para un código, o los nombres para un array/serie de códigos.
+    """
+    nombres = _indexar(NOMBRES, codigos, None)
+    if isinstance(nombres, pd.Series):
+        return nombres.where(nombres.notna(), default)
+    if np.ndim(nombres) == 0:
+        return default if nombres is None else nombres
+    return np.where(pd.isna(nombres), default, nombres)
+
+
+def region_aglomerado(codigos):
+    """
+    Devuelve el código de región de un aglomerado (o de un array/serie de códigos). 0 si no existe.
+    """
+    return _indexar(REGIONES, codigos, 0)
+
+
+def nombre_region(codigo_region):
+    """
+    Devuelve el nombre de una región a partir de su código.
+    """
+    return REGIONES_NOMBRES.get(int(codigo_region))
+
+
+def coordenadas_aglomerado(codigos):
+    """
+    Devuelve las coordenadas (latitudes, longitudes) de uno o más aglomerados. NaN si no existen.
+    """
+    return _indexar(LATITUDES, codigos, np.nan), _indexar(LONGITUDES, codigos, np.nan)
+
+
+def codigo_aglomerado(nombre):
+    """
+    Devuelve el código del aglomerado a partir de su nombre (sin distinguir mayúsculas), o None si no existe.
+    """
+    return _CODIGO_POR_NOMBRE.get(str(nombre).strip().lower())
@@ -0,0 +1,111 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from src.utils.constants import RUTA_ARCHIVO_CANASTA, TRIMESTRES
+
+# -------------------------------------------------------------------------------
+# CANASTA BÁSICA - LÍNEAS DE POBREZA E INDIGENCIA POR TRIMESTRE
+# -------------------------------------------------------------------------------
+
+LINEAS = ('linea_pobreza', 'linea_indigencia')
+
+# Mes (1 a 12) -> trimestre, armado a partir de la constante TRIMESTRES
+MES_A_TRIMESTRE = np.zeros(13, dtype=np.int8)
+for _trimestre, _meses in TRIMESTRES.items():
+    MES_A_TRIMESTRE[list(_meses)] = _trimestre
+
+# Tabla cargada en memoria. Se invalida cuando cambia la fecha de modificación del archivo.
+_tabla = {'ruta': None, 'mtime': None, 'anio_min': None, 'valores': None}
+_lock = threading.Lock()
+
+
+def _construir_tabla(ruta):
+    """
+    Lee la serie mensual de la canasta básica y precalcula los promedios trimestrales
+    de las líneas de pobreza e indigencia.
+
+    Parámetros:
+        ruta (Path): Ruta al archivo CSV.
+
+    Retorna:
+        tuple: (anio_min, valores), donde valores es un array de forma (años, 4, 2) con los
+        promedios de 'linea_pobreza' y 'linea_indigencia'. Los trimestres sin datos quedan en NaN.
+    """
+    try:
+        df_canasta = pd.read_csv(ruta, usecols=['indice_tiempo', *LINEAS])
+    except Exception as e:
+        raise FileNotFoundError(f"No se pudo leer el archivo en {ruta}: {e}")
+
+    # El parseo de fechas se hace una única vez por carga del archivo
+    fechas = pd.to_datetime(df_canasta['indice_tiempo'])
+    anios = fechas.dt.year.to_numpy()
+    trimestres = MES_A_TRIMESTRE[fechas.dt.month.to_numpy()]
+
+    anio_min = int(anios.min())
+    cantidad_anios = int(anios.max()) - anio_min + 1
+
+    # Sumas y cantidades por (año, trimestre) acumuladas de forma vectorizada
+    sumas = np.zeros((cantidad_anios, 4, len(LINEAS)))
+    cantidades = np.zeros((cantidad_anios, 4, 1))
+    fila_anio = anios - anio_min
+    col_trim = trimestres - 1
+    np.add.at(sumas, (fila_anio, col_trim), df_canasta[list(LINEAS)].to_numpy(dtype=float))
+    np.add.at(cantidades, (fila_anio, col_trim), 1)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        valores = np.round(sumas / cantidades, 2)
+
+    return anio_min, valores
+
+
+def obtener_tabla_trimestral(ruta=RUTA_ARCHIVO_CANASTA):
+    """
+    Devuelve la tabla de promedios trimestrales, leyendo el archivo sólo si es la primera vez
+    o si el archivo fue modificado desde la última lectura.
+
+    Parámetros:
+        ruta (Path): Ruta al archivo CSV.
+
+    Retorna:
+        tuple: (anio_min, valores) según lo descripto en _construir_tabla.
+    """
+    try:
+        mtime = ruta.stat().st_mtime_ns
+    except OSError as e:
+        raise FileNotFoundError(f"No se pudo leer el archivo en {ruta}: {e}")
+
+    with _lock:
+        if _tabla['ruta'] != ruta or _tabla['mtime'] != mtime:
+            _tabla['anio_min'], _tabla['valores'] = _construir_tabla(ruta)
+            _tabla['ruta'] = ruta
+            _tabla['mtime'] = mtime
+        return _tabla['anio_min'], _tabla['valores']
+
+
+def calculo_promedio_lineas_trimestre(trimestre_ingresado, anio_ingresado, ruta=RUTA_ARCHIVO_CANASTA):
+    """
+    Devuelve los promedios trimestrales de las líneas de indigencia y pobreza.
+
+    Parámetros:
+        trimestre_ingresado (int): Número de trimestre (1 al 4).
+        anio_ingresado (int): Año deseado.
+        ruta (Path): Ruta al archivo CSV.
+
+    Retorna:
+        dict: Diccionario con los valores promedio de 'linea_pobreza' y 'linea_indigencia'.
+    """
+    anio_min, valores = obtener_tabla_trimestral(ruta)
+
+    fila = anio_ingresado - anio_min
+    if not (0 <= fila < valores.shape[0] and 1 <= trimestre_ingresado <= 4) or \
+            np.isnan(valores[fila, trimestre_ingresado - 1]).any():
+        raise ValueError(f"No hay datos para el trimestre {trimestre_ingresado} del año {anio_ingresado}.")
+
+    prom_pobreza, prom_indigencia = valores[fila, trimestre_ingresado - 1]
+
+    return {
+        'linea_pobreza': float(prom_pobreza),
+        'linea_indigencia': float(prom_indigencia)
+    }
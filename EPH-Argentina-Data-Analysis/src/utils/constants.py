@@ -9,12 +9,20 @@ DATA_PROCESSED_DIR = DATA_DIR / "processed"
 
 FILENAME_HOGARES_PROCESSED = "hogares_procesados.txt"
 FILENAME_INDIVIDUOS_PROCESSED = "individuos_procesados.txt"
+FILENAME_PIRAMIDE_PROCESSED = "demografia_piramide.txt"
+FILENAME_EDADES_PROCESSED = "demografia_edades.txt"
+FILENAME_PANEL_PROCESSED = "panel_indice.txt"
+FILENAME_TRANSICIONES_PROCESSED = "panel_transiciones.txt"
 
 RUTA_ARCHIVO_CANASTA = Path('data') / 'Extras' / 'valores-canasta-basica-alimentos-canasta-basica-total-mensual-2016.csv'
 
 # Direcciones para los archivos procesados
 HOGARES_PROCESSED_DIR = DATA_PROCESSED_DIR / FILENAME_HOGARES_PROCESSED
 INDIVIDUOS_PROCESSED_DIR = DATA_PROCESSED_DIR / FILENAME_INDIVIDUOS_PROCESSED
+PIRAMIDE_PROCESSED_DIR = DATA_PROCESSED_DIR / FILENAME_PIRAMIDE_PROCESSED
+EDADES_PROCESSED_DIR = DATA_PROCESSED_DIR / FILENAME_EDADES_PROCESSED
+PANEL_PROCESSED_DIR = DATA_PROCESSED_DIR / FILENAME_PANEL_PROCESSED
+TRANSICIONES_PROCESSED_DIR = DATA_PROCESSED_DIR / FILENAME_TRANSICIONES_PROCESSED
 
 #Archivo JSON MAPA
 COORDENADAS_AGLOMERADOS=PROJECT_ROOT/"data" / "Extras"/"aglomerados_coordenadas.json"
@@ -64,6 +72,16 @@ REGIONES_NOMBRES = {
     43: "Pampeana",
     44: "Patagonia"}
 
+# Este diccionario contiene la región a la que pertenece cada aglomerado
+AGLOMERADOS_REGIONES = {
+    2: 43, 3: 43, 4: 43, 5: 43, 6: 43, 13: 43, 14: 43, 30: 43, 34: 43, 36: 43, 38: 43,
+    7: 41, 8: 41, 12: 41, 15: 41,
+    9: 44, 17: 44, 20: 44, 31: 44, 91: 44, 93: 44,
+    10: 42, 26: 42, 27: 42,
+    18: 40, 19: 40, 22: 40, 23: 40, 25: 40, 29: 40,
+    32: 1, 33: 1
+}
+
 # Definición de los niveles educativos
 NIVELES_EDUCATIVOS = {
     1: "Primario incompleto / Ed. especial",
@@ -75,6 +93,15 @@ NIVELES_EDUCATIVOS = {
     7: "Sin instrucción"
 }
 
+# Condición de actividad (variable ESTADO)
+ESTADOS_ACTIVIDAD = {
+    0: "Entrevista no realizada",
+    1: "Ocupado",
+    2: "Desocupado",
+    3: "Inactivo",
+    4: "Menor de 10 años"
+}
+
 # Meses en cada trimestre
 TRIMESTRES = {
     1: (1,2,3),
@@ -1,9 +1,12 @@
-from src.utils.constants import DATA_SOURCE_DIR,  DATA_PROCESSED_DIR, FILENAME_HOGARES_PROCESSED, FILENAME_INDIVIDUOS_PROCESSED, INDIVIDUOS_PROCESSED_DIR, AGLOMERADOS_NOMBRES,HOGARES_PROCESSED_DIR
+from src.utils.constants import DATA_SOURCE_DIR,  DATA_PROCESSED_DIR, FILENAME_HOGARES_PROCESSED, FILENAME_INDIVIDUOS_PROCESSED, INDIVIDUOS_PROCESSED_DIR,HOGARES_PROCESSED_DIR, PIRAMIDE_PROCESSED_DIR, EDADES_PROCESSED_DIR, PANEL_PROCESSED_DIR, TRANSICIONES_PROCESSED_DIR
 import streamlit as st
 from pathlib import Path
 from src.procesamientos.individuos import add_extra_data
 from src.procesamientos.hogares import procesar_hogares
+from src.procesamientos.demografia import materializar_demografia, COLUMNAS_DEMOGRAFIA
+from src.procesamientos.panel import materializar_panel, tabla_transiciones, vincular, COLUMNAS_PANEL
 from src.utils.helpers import save_to_file, process_file
+from src.utils.aglomerados import nombre_aglomerado
 import pandas as pd
 
 # -------------------------------------------------------------------------------
@@ -77,6 +80,26 @@ def actualizar():
         save_to_file(DATA_PROCESSED_DIR,
                      FILENAME_INDIVIDUOS_PROCESSED, encabezados_i, individuos)
 
+        # -------------------------------------------------------------------------------
+        # TABLAS DEMOGRÁFICAS MATERIALIZADAS
+        # -------------------------------------------------------------------------------
+
+        # Se calculan una vez por actualización para cada (período, aglomerado)
+        df_demografia = pd.read_csv(INDIVIDUOS_PROCESSED_DIR, delimiter=';', usecols=COLUMNAS_DEMOGRAFIA)
+        piramide, edades = materializar_demografia(df_demografia)
+        piramide.to_csv(PIRAMIDE_PROCESSED_DIR, sep=';', index=False)
+        edades.to_csv(EDADES_PROCESSED_DIR, sep=';', index=False)
+
+        # -------------------------------------------------------------------------------
+        # PANEL ROTATIVO (ÍNDICE DE PERSONAS Y TRANSICIONES ENTRE TRIMESTRES)
+        # -------------------------------------------------------------------------------
+
+        # El índice apunta a las filas de individuos_procesados, por eso se rearma en cada actualización
+        df_panel = pd.read_csv(INDIVIDUOS_PROCESSED_DIR, delimiter=';', usecols=COLUMNAS_PANEL)
+        indice_panel, transiciones = materializar_panel(df_panel)
+        indice_panel.to_csv(PANEL_PROCESSED_DIR, sep=';', index=False)
+        transiciones.to_csv(TRANSICIONES_PROCESSED_DIR, sep=';', index=False)
+
         # Calcular la fecha mínima y máxima global entre hogares e individuos
 
         fechas_validas = [f for f in [min_fecha_hog, min_fecha_indiv,
@@ -197,8 +220,8 @@ def eliminar_archivos():
         else:
             st.session_state["mensaje_eliminacion"] = (
                 "success", f"🗑️ {total_eliminados} archivo(s) eliminados correctamente.")
-            del st.session_state.df_ind
-            del st.session_state.df_hogares
+            for clave in ('df_ind', 'df_hogares', 'df_piramide', 'df_edades', 'df_transiciones'):
+                st.session_state.pop(clave, None)
 
     except Exception as e:
         st.session_state["mensaje_eliminacion"] = (
@@ -239,23 +262,68 @@ def cargar_df_hogares():
     finally:
         return df_hogar
 
-def get_nombre_aglomerado(id_aglomerados):
+def cargar_demografia():
+    """
+    Carga las tablas demográficas materializadas en la actualización (pirámide de edades y edades/dependencia).
+    Si no existen devuelve DataFrames vacíos.
     """
-    Devuelve una lista de nombres unicos de algomerados 
+    try:
+        df_piramide = pd.read_csv(PIRAMIDE_PROCESSED_DIR, delimiter=';')
+        df_edades = pd.read_csv(EDADES_PROCESSED_DIR, delimiter=';')
+    except Exception as e:
+        print('No se pudieron cargar las tablas demográficas', type(e).__name__)
+        df_piramide, df_edades = pd.DataFrame(), pd.DataFrame()
+    return df_piramide, df_edades
 
-    Args:
-        id_aglomerados: serie de nros de aglomerados
+def cargar_transiciones():
     """
-    return sorted([AGLOMERADOS_NOMBRES[nro] for nro in id_aglomerados.unique()])
+    Carga las transiciones de ESTADO entre trimestres consecutivos materializadas en la actualización.
+    Si no existen devuelve un DataFrame vacío.
+    """
+    try:
+        df_transiciones = pd.read_csv(TRANSICIONES_PROCESSED_DIR, delimiter=';')
+    except Exception as e:
+        print('No se pudieron cargar las transiciones del panel', type(e).__name__)
+        df_transiciones = pd.DataFrame()
+    return df_transiciones
 
-def get_nro_aglomerado(aglomerado):
+def calcular_transiciones(salto):
+    """
+    Calcula las transiciones de ESTADO entre cada trimestre y el de `salto` trimestres después
+    (por ejemplo, salto=4 para el mismo trimestre del año siguiente) con el índice del panel
+    guardado en la actualización, sin volver a hashear las personas. Si el índice no existe
+    devuelve un DataFrame vacío.
     """
-    Devuelve el nro de aglomerado si existe sino None. 
+    try:
+        indice = pd.read_csv(PANEL_PROCESSED_DIR, delimiter=';', dtype={'CLAVE': 'uint64'})
+        # FILA es la posición en individuos_procesados, que se lee en el mismo orden
+        df_panel = pd.read_csv(INDIVIDUOS_PROCESSED_DIR, delimiter=';', usecols=COLUMNAS_PANEL)
+    except Exception as e:
+        print('No se pudo cargar el índice del panel', type(e).__name__)
+        return pd.DataFrame()
+    return tabla_transiciones(df_panel, vincular(indice, salto=salto))
+
+def version_datos():
+    """
+    Devuelve un identificador de la versión de los datos procesados (fecha de modificación del
+    archivo de individuos procesados). Sirve como clave para las cachés de Streamlit: cambia cada
+    vez que se actualizan los datos.
+    """
+    try:
+        return INDIVIDUOS_PROCESSED_DIR.stat().st_mtime_ns
+    except OSError:
+        return 0
+
+def get_codigos_aglomerado(id_aglomerados):
+    """
+    Devuelve la lista de códigos únicos de aglomerados ordenada por nombre, para usar como
+    opciones de un selector (el nombre se muestra con format_func=nombre_aglomerado).
 
     Args:
-        aglomerado: nombre del aglomerado
+        id_aglomerados: serie de nros de aglomerados
     """
-    return next((k for k, v in AGLOMERADOS_NOMBRES.items() if v == aglomerado), None)
+    codigos = id_aglomerados.dropna().unique().astype(int)
+    return sorted(codigos.tolist(), key=lambda codigo: nombre_aglomerado(codigo, ''))
 
 def suma_dependiente(grupo):
     """
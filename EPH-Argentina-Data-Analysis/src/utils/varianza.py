@@ -0,0 +1,201 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+# -------------------------------------------------------------------------------
+# VARIANZA DE LOS INDICADORES POR PONDERADORES REPLICADOS
+# -------------------------------------------------------------------------------
+# Los indicadores de la app son cocientes de totales ponderados con PONDERA (por ejemplo,
+# desocupados / activos). Para estimar su error se arman ponderadores replicados: cada réplica
+# multiplica el PONDERA de todas las personas de un hogar por un mismo factor, y el indicador
+# se recalcula con cada réplica.
+#
+# - Bootstrap (Rao-Wu): en cada estrato (aglomerado) con n hogares se sortean n - 1 con
+#   reposición; el factor de un hogar es las veces que salió por n / (n - 1).
+# - Jackknife por grupos: los hogares se reparten al azar en G grupos; la réplica g deja
+#   afuera el grupo g y multiplica el resto por G / (G - 1).
+#
+# El cálculo es matricial: primero se suman los ponderadores por (celda, hogar), donde celda
+# es cada grupo del resultado (por ejemplo, período y aglomerado), y luego se multiplican por
+# la matriz de factores (hogares x réplicas). Las réplicas se procesan en lotes en paralelo
+# (NumPy libera el GIL en estas operaciones) y cada lote tiene su propia semilla, así el
+# resultado no depende de la cantidad de hilos.
+
+CONGLOMERADO = ['CODUSU', 'NRO_HOGAR']
+ESTRATO = 'AGLOMERADO'
+
+METODOS = ('bootstrap', 'jackknife')
+COLUMNAS_RESULTADO = ['ESTIMACION', 'ERROR_ESTANDAR', 'LI', 'LS', 'CV']
+REPLICAS = {'bootstrap': 200, 'jackknife': 100}
+TAMANIO_LOTE = 25
+
+
+def _codigos(df, columnas):
+    """
+    Código entero (0, 1, ...) de cada fila según las columnas, en el orden de sus valores.
+    """
+    codigos = df.groupby(columnas, sort=True, dropna=False).ngroup().to_numpy()
+    return codigos, int(codigos.max()) + 1 if len(codigos) else 0
+
+
+def _preparar(df, numerador, denominador, agrupacion, ponderador, conglomerado, estrato):
+    """
+    Suma los ponderadores del numerador y del denominador por (celda, hogar).
+
+    Retorna:
+        dict: celdas (DataFrame con los valores de agrupacion), hogar de cada par, inicio de
+        cada celda en los pares, sumas de cada par, y estrato de cada hogar.
+    """
+    pondera = df[ponderador].to_numpy(dtype=float)
+    en_denominador = np.asarray(denominador, dtype=float)
+    # El numerador sólo cuenta dentro del denominador
+    en_numerador = np.asarray(numerador, dtype=float) * en_denominador
+
+    # Hogares ordenados por estrato, para que cada estrato quede contiguo
+    hogar, cantidad_hogares = _codigos(df, [estrato] + conglomerado)
+    estrato_hogar = np.zeros(cantidad_hogares, dtype=np.int64)
+    estrato_hogar[hogar] = _codigos(df, [estrato])[0]
+
+    celda, _ = _codigos(df, agrupacion)
+    celdas = df[agrupacion].drop_duplicates().sort_values(agrupacion, ignore_index=True)
+
+    # np.unique ordena los pares por celda y, dentro de cada celda, por hogar
+    pares, posicion = np.unique(celda.astype(np.int64) * cantidad_hogares + hogar, return_inverse=True)
+    celda_par = pares // cantidad_hogares
+
+    return {
+        'celdas': celdas,
+        'hogar': pares % cantidad_hogares,
+        'inicio': np.flatnonzero(np.r_[True, celda_par[1:] != celda_par[:-1]]),
+        'numerador': np.bincount(posicion, weights=pondera * en_numerador, minlength=len(pares)),
+        'denominador': np.bincount(posicion, weights=pondera * en_denominador, minlength=len(pares)),
+        'estrato_hogar': estrato_hogar,
+    }
+
+
+def _factores_bootstrap(rng, estrato_hogar, replicas):
+    """
+    Factores bootstrap de Rao-Wu, de forma (hogares, replicas). Los estratos con un solo
+    hogar conservan factor 1.
+    """
+    cantidad_hogares = len(estrato_hogar)
+    tamanio = np.bincount(estrato_hogar)
+    inicio = np.r_[0, np.cumsum(tamanio)[:-1]]
+
+    # n - 1 sorteos por estrato, todos a la vez: inicio del estrato + posición al azar
+    sorteos = np.repeat(np.flatnonzero(tamanio > 1), (tamanio - 1).clip(min=0)[tamanio > 1])
+    elegidos = inicio[sorteos] + (rng.random((replicas, len(sorteos))) * tamanio[sorteos]).astype(np.int64)
+    elegidos += np.arange(replicas)[:, None] * cantidad_hogares
+    veces = np.bincount(elegidos.ravel(), minlength=replicas * cantidad_hogares).reshape(replicas, cantidad_hogares)
+
+    escala = np.where(tamanio > 1, tamanio / np.maximum(tamanio - 1, 1), 1.0)[estrato_hogar]
+    factores = veces.T * escala[:, None]
+    unicos = tamanio[estrato_hogar] == 1
+    factores[unicos] = 1.0
+    return factores
+
+
+def _factores_jackknife(grupo_hogar, grupos, desde, hasta):
+    """
+    Factores del jackknife por grupos para las réplicas desde..hasta-1, de forma (hogares, réplicas).
+    """
+    return np.where(grupo_hogar[:, None] == np.arange(desde, hasta)[None, :], 0.0, grupos / (grupos - 1))
+
+
+def _totales(datos, factores):
+    """
+    Totales replicados del numerador y del denominador de cada celda, de forma (celdas, réplicas).
+    """
+    factores_par = factores[datos['hogar']]
+    numerador = np.add.reduceat(datos['numerador'][:, None] * factores_par, datos['inicio'], axis=0)
+    denominador = np.add.reduceat(datos['denominador'][:, None] * factores_par, datos['inicio'], axis=0)
+    return numerador, denominador
+
+
+def estimar(df, numerador, denominador=None, agrupacion=('ANO4', 'TRIMESTRE'), metodo='bootstrap',
+            replicas=None, nivel=0.95, escala=100, semilla=0, hilos=None,
+            ponderador='PONDERA', conglomerado=CONGLOMERADO, estrato=ESTRATO):
+    """
+    Estima un indicador (cociente de totales ponderados) con su error estándar e intervalo de
+    confianza, por cada grupo de `agrupacion`.
+
+    Parámetros:
+        df (pd.DataFrame): personas (o hogares) con el ponderador, el conglomerado, el estrato y
+            las columnas de agrupacion.
+        numerador (array-like): máscara (o valor) de cada fila que se cuenta en el numerador,
+            por ejemplo df['CONDICION_LABORAL'] == 'Desocupado'.
+        denominador (array-like): máscara del denominador; None para todas las filas.
+        agrupacion (list): columnas de los grupos del resultado.
+        metodo (str): 'bootstrap' o 'jackknife'.
+        replicas (int): cantidad de réplicas (en el jackknife, de grupos); por defecto REPLICAS[metodo].
+        nivel (float): nivel de confianza del intervalo.
+        escala (float): factor del resultado (100 para porcentajes).
+        semilla (int): semilla de las réplicas.
+        hilos (int): hilos para procesar los lotes de réplicas; por defecto, uno por núcleo.
+        ponderador (str): columna del ponderador.
+        conglomerado (list): columnas que identifican al hogar.
+        estrato (str): columna del estrato.
+
+    Retorna:
+        pd.DataFrame: agrupacion + COLUMNAS_RESULTADO (['ESTIMACION', 'ERROR_ESTANDAR', 'LI',
+        'LS', 'CV']), donde CV es el coeficiente de variación en %. Sin filas en df, la tabla
+        queda vacía con esas columnas.
+
+    Lanza:
+        ValueError: si el método no existe o hay menos de 2 réplicas.
+    """
+    if metodo not in METODOS:
+        raise ValueError(f"Método desconocido: {metodo}. Opciones: {', '.join(METODOS)}.")
+    replicas = REPLICAS[metodo] if replicas is None else int(replicas)
+    if replicas < 2:
+        raise ValueError("Se necesitan al menos 2 réplicas.")
+
+    agrupacion = list(agrupacion)
+    if len(df) == 0:
+        return pd.DataFrame(columns=agrupacion + COLUMNAS_RESULTADO)
+    if denominador is None:
+        denominador = np.ones(len(df))
+    datos = _preparar(df, numerador, denominador, agrupacion, ponderador, conglomerado, estrato)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        estimacion = (np.add.reduceat(datos['numerador'], datos['inicio']) /
+                      np.add.reduceat(datos['denominador'], datos['inicio']))
+
+    # Lotes de réplicas, cada uno con su semilla
+    lotes = [(desde, min(desde + TAMANIO_LOTE, replicas)) for desde in range(0, replicas, TAMANIO_LOTE)]
+    semillas = np.random.SeedSequence(semilla).spawn(len(lotes) + 1)
+    grupo_hogar = np.random.default_rng(semillas[-1]).permutation(len(datos['estrato_hogar'])) % replicas
+
+    def evaluar_lote(lote):
+        (desde, hasta), semilla_lote = lote
+        if metodo == 'bootstrap':
+            factores = _factores_bootstrap(np.random.default_rng(semilla_lote), datos['estrato_hogar'], hasta - desde)
+        else:
+            factores = _factores_jackknife(grupo_hogar, replicas, desde, hasta)
+        numerador_replicas, denominador_replicas = _totales(datos, factores)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return numerador_replicas / denominador_replicas
+
+    with ThreadPoolExecutor(max_workers=hilos or os.cpu_count() or 1) as ejecutor:
+        estimaciones = np.hstack(list(ejecutor.map(evaluar_lote, zip(lotes, semillas))))
+
+    desvios = (estimaciones - estimacion[:, None]) ** 2
+    if metodo == 'bootstrap':
+        varianza = np.nanmean(desvios, axis=1)
+    else:
+        varianza = (replicas - 1) / replicas * np.nansum(desvios, axis=1)
+    error = np.sqrt(varianza)
+    z = NormalDist().inv_cdf((1 + nivel) / 2)
+
+    resultado = datos['celdas']
+    resultado['ESTIMACION'] = estimacion * escala
+    resultado['ERROR_ESTANDAR'] = error * escala
+    resultado['LI'] = (estimacion - z * error) * escala
+    resultado['LS'] = (estimacion + z * error) * escala
+    with np.errstate(invalid='ignore', divide='ignore'):
+        resultado['CV'] = error / estimacion * 100
+
+    return resultado
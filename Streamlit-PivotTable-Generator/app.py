@@ -1,66 +1,266 @@
+from pathlib import Path
+
 import streamlit as st
 import pandas as pd
-import csv
-import io
+from src import cache
+from src.aproximadas import FUNCIONES_APROXIMADAS, descripcion_error
+from src.catalogo import cargar_dataset, catalogo
+from src.compactacion import compactar
+from src.cruzada import COLUMNAS_POR_PAGINA, estructura_cruzada, pagina_cruzada, tabla_cruzada
+from src.disco import contar_filas, convertir_a_parquet, esquema, tabla_dinamica_disco, vista_previa
+from src.especificacion import a_texto, crear_especificacion, ejecutar, hashes_entradas, validar
+from src.filtros import AYUDA_FILTROS, compilar_filtro, mascara_filtro
+from src.lectura import EXTENSIONES_EXCEL, MOTORES_CSV, hojas_excel, leer_archivo
+from src.pivot import FUNCIONES_AGREGACION, tabla_dinamica
+from src.resultados import borrar_tabla, ejecutar_cacheado, guardar_tabla, tablas_guardadas, uso_disco
+from src.union import planificar_union, unir_archivos
+from src.vista import TAMANIOS_PAGINA, cantidad_paginas, descarga_csv, filas_seleccionadas, pagina
 
+# Copy-on-Write: seleccionar filas o columnas, reset_index, assign, etc. comparten los datos
+# hasta que se modifican. En pandas >= 3 siempre está activo y la opción ya no existe.
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
 
 
 st.set_page_config(page_title="Fusionador y Analizador de Datos", layout="wide")
 st.title("📊 Fusionador y Analizador Dinámico de Archivos")
 # 🔧 Inicializar merged_df
 merged_df = None
+clave_union = None
+plan = None
+confirmar = False
+resultado = None
 
 st.write("""
-Subí tus archivos **CSV o Excel (.xlsx)**.  
+Subí tus archivos **CSV o Excel (.xlsx, .xls)**.  
 El programa los leerá, los unirá automáticamente por columnas comunes y permitirá analizarlos dinámicamente.
 """)
 
 uploaded_files = st.file_uploader(
-    "Subí tus archivos CSV o Excel", type=["csv", "xlsx"], accept_multiple_files=True
+    "Subí tus archivos CSV o Excel", type=["csv", "xlsx", "xls"], accept_multiple_files=True
+)
+# Los datasets de la carpeta Datasets se abren desde su copia Parquet, sin subirlos
+datasets = catalogo()
+datasets_elegidos = st.multiselect("O abrí datasets de la carpeta Datasets",
+                                   datasets.loc[datasets['error'].isna(), 'dataset'].tolist())
+with st.expander(f"🗂️ Catálogo de datasets ({len(datasets)})"):
+    st.dataframe(datasets.drop(columns=['ruta', 'hash']), hide_index=True)
+motor_csv = st.selectbox(
+    "Motor de lectura CSV", MOTORES_CSV,
+    help="pyarrow lee los CSV en paralelo (varios hilos). Si falla, se usa el motor de pandas."
+)
+fuera_de_memoria = st.toggle(
+    "Modo fuera de memoria (CSV más grandes que la RAM)",
+    help="Convierte el CSV a Parquet en disco por bloques y calcula filtros y tabla dinámica con pyarrow, sin cargarlo entero."
 )
 
-if uploaded_files:
+# ------------------------- Tablas guardadas -------------------------
+tablas = tablas_guardadas()
+tabla_guardada = st.selectbox("📌 Abrir tabla guardada", [None] + sorted(tablas)) if tablas else None
+if tabla_guardada:
+    definicion = tablas[tabla_guardada]
+    subidos = {archivo.name: archivo for archivo in uploaded_files or []}
+    # Los datasets del catálogo se guardan con su ruta en el disco y no hace falta subirlos
+    faltantes = [archivo['ruta'] for archivo in definicion['especificacion']['archivos']
+                 if archivo['ruta'] not in subidos and not Path(archivo['ruta']).is_file()]
+    if faltantes:
+        st.info(f"Subí {', '.join(faltantes)} para abrir '{tabla_guardada}'.")
+    else:
+        try:
+            especificacion = validar(definicion['especificacion'])
+            # Con los mismos archivos (mismo hash) el resultado sale del disco, sin leerlos
+            hashes = hashes_entradas(especificacion, subidos)
+            with st.spinner("Calculando la tabla..."):
+                guardado, desde_disco = ejecutar_cacheado(especificacion, hashes,
+                                                          lambda: ejecutar(especificacion, subidos))
+            if desde_disco:
+                st.caption(f"Resultado guardado el {definicion['guardada']} (los archivos no cambiaron).")
+            elif hashes != definicion['hashes']:
+                st.caption("Los archivos cambiaron desde que se guardó la tabla: se volvió a calcular.")
+            else:
+                st.caption("El resultado guardado se había descartado de la caché en disco: se volvió a calcular.")
+            st.write(f"Filas: {especificacion['filas']} | Columnas: {especificacion['columnas']} | "
+                     f"Valores: {especificacion['valores']} | Filtro: {especificacion['filtro']}")
+            st.dataframe(guardado, height=500, use_container_width=True)
+            st.download_button(
+                label="📥 Descargar tabla dinámica CSV",
+                data=descarga_csv(("tabla_guardada", tabla_guardada, tuple(hashes)), lambda: guardado),
+                file_name="tabla_dinamica.csv",
+                mime="text/csv"
+            )
+        except Exception as e:
+            st.error(f"❌ Error al abrir la tabla guardada: {e}")
+    if st.button("🗑️ Borrar tabla guardada"):
+        borrar_tabla(tabla_guardada)
+        st.rerun()
+    st.stop()
+
+# ------------------------- Modo fuera de memoria -------------------------
+if uploaded_files and fuera_de_memoria:
+    archivo = uploaded_files[0]
+    if len(uploaded_files) > 1 or not archivo.name.endswith(".csv"):
+        st.error("❌ El modo fuera de memoria trabaja con un único archivo CSV.")
+        st.stop()
+    try:
+        hash_contenido = cache.hash_archivo(archivo)
+        ruta = convertir_a_parquet(archivo, hash_contenido)
+    except ValueError as e:
+        st.error(f"❌ {e}")
+        st.stop()
+    columnas = esquema(ruta).names
+    st.write(f"✅ Archivo convertido a Parquet en disco: {archivo.name} ({contar_filas(ruta):,} filas)")
+
+    st.write("## 📋 Previsualización")
+    col_filters, col_preview = st.columns([1, 3])
+    with col_filters:
+        with st.expander("⚙️ Opciones de Filtrado", expanded=True):
+            selected_cols = st.multiselect("Columnas a mostrar", columnas, default=columnas)
+            filas_preview = st.selectbox("Filas a mostrar", TAMANIOS_PAGINA, index=1)
+            filtro_preview = st.text_input("Filtro (usá [columna])", help=AYUDA_FILTROS)
+    with col_preview:
+        try:
+            arbol_preview = compilar_filtro(filtro_preview)
+            st.dataframe(vista_previa(ruta, selected_cols, arbol_preview, filas_preview),
+                         height=500, use_container_width=True)
+            total_filtradas = contar_filas(ruta, arbol_preview)
+            st.caption(f"Primeras {min(filas_preview, total_filtradas)} de {total_filtradas:,} filas que cumplen el filtro")
+        except ValueError as e:
+            st.warning(f"Filtro inválido: {e}")
+
+    st.write("## 🔄 Tabla Dinámica Interactiva")
+    col_table_filters, col_table_result = st.columns([1, 3])
+    with col_table_filters:
+        with st.expander("⚙️ Opciones de Tabla Dinámica", expanded=True):
+            rows = st.multiselect("Columnas para filas", columnas)
+            values = st.multiselect("Columnas para valores", columnas)
+            agg_dict = {val: st.selectbox(f"Función de agregación para '{val}'", FUNCIONES_AGREGACION)
+                        for val in values}
+            filtro_tabla = st.text_input("Filtro de la tabla (usá [columna])", help=AYUDA_FILTROS)
+    with col_table_result:
+        if rows and values:
+            try:
+                arbol_tabla = compilar_filtro(filtro_tabla)
+                pivot = cache.cacheado(("pivot_disco", str(ruta), tuple(rows), tuple(agg_dict.items()), arbol_tabla),
+                                       tabla_dinamica_disco, ruta, rows, agg_dict, arbol_tabla)
+                st.dataframe(pivot, height=500, use_container_width=True)
+                st.download_button(
+                    label="📥 Descargar tabla dinámica CSV",
+                    data=descarga_csv((str(ruta), tuple(rows), tuple(agg_dict.items()), arbol_tabla), lambda: pivot),
+                    file_name="tabla_dinamica.csv",
+                    mime="text/csv"
+                )
+                # Para repetir la tabla con cli.py, sin abrir la app
+                especificacion = crear_especificacion([{'ruta': archivo.name}], rows, agg_dict,
+                                                      filtro=filtro_tabla or None, motor_csv=motor_csv,
+                                                      fuera_de_memoria=True)
+                st.download_button(
+                    label="💾 Exportar especificación",
+                    data=a_texto(especificacion),
+                    file_name="especificacion.json",
+                    mime="application/json"
+                )
+                col_nombre, col_guardar = st.columns([3, 1])
+                nombre_tabla = col_nombre.text_input("Nombre de la tabla", placeholder="Nombre de la tabla",
+                                                     label_visibility="collapsed")
+                if col_guardar.button("📌 Guardar tabla"):
+                    try:
+                        guardar_tabla(nombre_tabla, especificacion, [hash_contenido], pivot)
+                        st.success(f"✅ Tabla '{nombre_tabla.strip()}' guardada.")
+                    except ValueError as e:
+                        st.error(f"❌ {e}")
+            except Exception as e:
+                st.error(f"❌ Error al crear la tabla dinámica: {e}")
+        else:
+            st.info("Seleccioná al menos una columna para filas y una para valores para generar la tabla dinámica.")
+    st.stop()
+
+if uploaded_files or datasets_elegidos:
     dfs = []
-    for uploaded_file in uploaded_files:
+    claves = []
+    # Archivos y hojas leídos, para exportar la especificación de la tabla dinámica
+    archivos_leidos = []
+    hashes_leidos = []
+    for uploaded_file in uploaded_files or []:
         try:
-            if uploaded_file.name.endswith(".csv"):
-                content = uploaded_file.getvalue().decode("utf-8", errors="ignore")
-                sample = "\n".join(content.splitlines()[:10])
-                dialect = csv.Sniffer().sniff(sample)
-                df = pd.read_csv(io.StringIO(content), sep=dialect.delimiter, low_memory=False, on_bad_lines='skip')
+            hash_contenido = cache.hash_archivo(uploaded_file)
+            es_excel = uploaded_file.name.endswith(EXTENSIONES_EXCEL)
+            if es_excel:
+                # Cada hoja elegida se une como si fuera un archivo más
+                hojas = cache.cacheado(("hojas", hash_contenido), hojas_excel, uploaded_file, hash_contenido)
+                lecturas = [(hoja, ("archivo", hash_contenido, hoja)) for hoja in
+                            st.multiselect(f"Hojas de {uploaded_file.name}", hojas, default=hojas[:1])]
             else:
-                df = pd.read_excel(uploaded_file)
+                lecturas = [(0, ("archivo", hash_contenido, motor_csv))]
+            archivos_leidos.append({'ruta': uploaded_file.name, 'hojas': [hoja for hoja, _ in lecturas]}
+                            if es_excel else {'ruta': uploaded_file.name})
+            hashes_leidos.append(hash_contenido)
 
-            dfs.append(df)
-            st.write(f"✅ Archivo leído: {uploaded_file.name} ({len(df)} filas)")
+            # Cada archivo (u hoja) se parsea una sola vez por contenido y motor de lectura
+            for hoja, clave in lecturas:
+                df = cache.cacheado(clave, leer_archivo, uploaded_file, motor_csv, hoja, hash_contenido)
+                dfs.append(df)
+                claves.append(clave)
+                nombre = f"{uploaded_file.name} [{hoja}]" if es_excel else uploaded_file.name
+                st.write(f"✅ Archivo leído: {nombre} ({len(df)} filas)")
         except Exception as e:
             st.error(f"❌ Error al leer {uploaded_file.name}: {e}")
 
+    for nombre in datasets_elegidos:
+        try:
+            dataset = datasets.loc[datasets['dataset'] == nombre].iloc[0]
+            hoja = None if pd.isna(dataset['hoja']) else dataset['hoja']
+            clave = ("catalogo", dataset['hash'], nombre)
+            df = cache.cacheado(clave, cargar_dataset, dataset['ruta'], hoja)
+            dfs.append(df)
+            claves.append(clave)
+            archivos_leidos.append({'ruta': dataset['ruta'], 'hojas': [hoja]} if hoja is not None
+                                   else {'ruta': dataset['ruta']})
+            hashes_leidos.append(dataset['hash'])
+            st.write(f"✅ Dataset del catálogo: {nombre} ({len(df)} filas)")
+        except Exception as e:
+            st.error(f"❌ Error al abrir {nombre}: {e}")
+
     if not dfs:
         st.stop()
 
-    # Unión automática por columnas comunes
-    if len(dfs) > 1:
-        common_cols = list(set.intersection(*(set(df.columns) for df in dfs)))
-        if not common_cols:
-            st.error("❌ No hay columnas comunes entre los archivos.")
-            merged_df = None
-        else:
-            st.write("Columnas comunes detectadas:", common_cols)
-            merged_df = dfs[0]
-            for df in dfs[1:]:
-                merged_df = pd.merge(merged_df, df, on=common_cols, how="outer")
-    else:
-        merged_df = dfs[0]
-# Después del merge
-if 'merged_df' in locals() and merged_df is not None:
-    # Crear id_base único por fila
-    merged_df = merged_df.reset_index(drop=True)  # aseguramos índice limpio
-    merged_df.insert(0, 'id_base', merged_df.index + 1)  # ID empezando en 1
+    # Unión automática por columnas comunes (cacheada por la secuencia de archivos) y creación de id_base
+    try:
+        if len(dfs) > 1:
+            plan = cache.cacheado(("plan", *claves), planificar_union, dfs)
+            st.write("Columnas comunes detectadas:", plan['columnas'])
+            with st.expander("🔑 Perfil de las columnas clave"):
+                st.dataframe(plan['perfiles'], hide_index=True)
+
+        confirmar = True
+        if plan is not None and plan['muchos_a_muchos']:
+            filas_entrada = int(plan['perfiles']['filas'].sum())
+            st.warning(
+                f"⚠️ Hay valores de clave repetidos en más de un archivo (unión muchos a muchos). "
+                f"El resultado tendría aproximadamente {plan['filas_estimadas']:,} filas "
+                f"(los archivos suman {filas_entrada:,})."
+            )
+            confirmar = st.checkbox("Unir de todas formas")
+
+        if confirmar:
+            clave_union = ("union", *claves)
+            # Sólo queda en la caché la versión compactada (tipos más chicos, categorías, fechas)
+            merged_df, informe_compactacion = cache.cacheado(
+                clave_union, lambda: compactar(unir_archivos(dfs, plan)[0]))
+            antes, despues = informe_compactacion['bytes_antes'].sum(), informe_compactacion['bytes_despues'].sum()
+            with st.expander(f"🗜️ Memoria: {antes / 1024 ** 2:.1f} MB → {despues / 1024 ** 2:.1f} MB "
+                             f"({antes / max(despues, 1):.1f}× menos)"):
+                st.dataframe(informe_compactacion, hide_index=True)
+    except ValueError as e:
+        st.error(f"❌ {e}")
+        merged_df = None
+
+    uso, entradas = cache.uso_memoria()
+    uso_guardados, guardados = uso_disco()
+    st.caption(f"Caché: {entradas} resultados en memoria ({uso / 1024 ** 2:.1f} MB), "
+               f"{guardados} tablas en disco ({uso_guardados / 1024 ** 2:.1f} MB)")
 
 import streamlit as st
 import pandas as pd
-import re
 
 if 'merged_df' in locals() and merged_df is not None:
 
@@ -78,25 +278,39 @@ if 'merged_df' in locals() and merged_df is not None:
                 merged_df.columns.tolist(),
                 default=merged_df.columns.tolist()
             )
-            # Filtrado por texto
+            # Filtrado por texto o expresión
             text_filter_col = st.selectbox(
                 "Filtrar por texto en columna (opcional)",
                 [None] + merged_df.columns.tolist()
             )
             text_filter_value = None
             if text_filter_col:
-                text_filter_value = st.text_input(f"Texto a filtrar en '{text_filter_col}'")
+                text_filter_value = st.text_input(f"Texto o expresión a filtrar en '{text_filter_col}'", help=AYUDA_FILTROS)
 
     with col_preview:
-        df_preview = merged_df[selected_cols].copy()
-        if text_filter_col and text_filter_value:
-            df_preview = df_preview[df_preview[text_filter_col].astype(str).str.contains(text_filter_value, case=False, na=False)]
-        st.dataframe(df_preview, height=500, use_container_width=True)
+        try:
+            mascara_preview, clave_preview = mascara_filtro(merged_df, text_filter_value, text_filter_col, clave_union)
+        except ValueError as e:
+            st.warning(f"Filtro inválido: {e}")
+            mascara_preview, clave_preview = None, None
+        posiciones = filas_seleccionadas(merged_df, mascara_preview)
+
+        # Sólo se envía al navegador la página visible
+        col_tamanio, col_pagina = st.columns(2)
+        tamanio_pagina = col_tamanio.selectbox("Filas por página", TAMANIOS_PAGINA, index=1)
+        total_paginas = cantidad_paginas(len(posiciones), tamanio_pagina)
+        numero_pagina = col_pagina.number_input(f"Página (de {total_paginas})", min_value=1, max_value=total_paginas, value=1)
+
+        st.dataframe(pagina(merged_df, posiciones, selected_cols, numero_pagina, tamanio_pagina),
+                     height=500, use_container_width=True)
+        desde = (numero_pagina - 1) * tamanio_pagina
+        st.caption(f"Filas {min(desde + 1, len(posiciones))}–{min(desde + tamanio_pagina, len(posiciones))} de {len(posiciones)}")
 
-        # Botón de descarga cerca del DataFrame
+        # Botón de descarga cerca del DataFrame (el CSV se genera al hacer clic)
         st.download_button(
             label="📥 Descargar previsualización como CSV",
-            data=df_preview.to_csv(index=False).encode("utf-8"),
+            data=descarga_csv((clave_union, clave_preview, tuple(selected_cols)),
+                              lambda: merged_df, posiciones, selected_cols),
             file_name="previsualizacion.csv",
             mime="text/csv"
         )
@@ -110,53 +324,81 @@ if merged_df is not None:
             all_cols = merged_df.columns.tolist()
 
             rows = st.multiselect("Columnas para filas", all_cols)
+            cols = st.multiselect("Columnas para columnas (opcional)", all_cols)
             values = st.multiselect("Columnas para valores", all_cols)
 
-            agg_options = ["sum", "mean", "count", "max", "min"]
-            agg_dict = {val: st.selectbox(f"Función de agregación para '{val}'", agg_options)
+            # Las funciones _aprox usan resúmenes de memoria acotada (src/aproximadas.py)
+            agg_dict = {val: st.selectbox(f"Función de agregación para '{val}'",
+                                          FUNCIONES_AGREGACION + list(FUNCIONES_APROXIMADAS))
                         for val in values} if values else {}
 
             filter_col = st.selectbox("Filtrar por columna (opcional)", [None] + all_cols)
             filter_val = None
             if filter_col:
-                filter_val = st.text_input(f"Valor a filtrar en '{filter_col}' (ej: >30, <=50, ==18, texto parcial)")
-
-    df_table = merged_df.copy()
-
-    # Aplicar filtro si corresponde
-    if filter_col and filter_val:
-        if pd.api.types.is_numeric_dtype(df_table[filter_col]):
-            m = re.match(r'(>=|<=|>|<|==)\s*(\d+(\.\d+)?)', filter_val.strip())
-            if m:
-                op, num, _ = m.groups()
-                num = float(num)
-                if op == '>': df_table = df_table[df_table[filter_col] > num]
-                if op == '<': df_table = df_table[df_table[filter_col] < num]
-                if op == '>=': df_table = df_table[df_table[filter_col] >= num]
-                if op == '<=': df_table = df_table[df_table[filter_col] <= num]
-                if op == '==': df_table = df_table[df_table[filter_col] == num]
-            else:
-                st.warning("Formato inválido para filtro numérico. Usá: >30, <=50, ==18")
-        else:
-            df_table = df_table[df_table[filter_col].astype(str).str.contains(filter_val, case=False, na=False)]
+                filter_val = st.text_input(f"Valor a filtrar en '{filter_col}' (ej: >30, <=50, ==18, texto parcial)", help=AYUDA_FILTROS)
+
+    # El filtro se compila a una máscara de filas (cada predicado queda en la caché), sin copiar merged_df
+    try:
+        mascara, clave_filtro = mascara_filtro(merged_df, filter_val, filter_col, clave_union)
+    except ValueError as e:
+        st.warning(f"Filtro inválido: {e}")
+        mascara, clave_filtro = None, None
 
     with col_table_result:
-        if rows and values:
+        if rows and values and cols:
             try:
-                pivot = pd.pivot_table(
-                    df_table,
-                    index=rows,
-                    values=values,
-                    aggfunc=agg_dict,
-                    fill_value=0
-                ).reset_index()
+                # La tabla cruzada queda en formato largo (una fila por celda con datos) y sólo
+                # la página visible se pasa a formato ancho
+                largo = resultado = tabla_cruzada(merged_df, rows, cols, agg_dict, clave_union, mascara, clave_filtro)
+                estructura = cache.cacheado(
+                    ("estructura_cruzada", clave_union, tuple(rows), tuple(cols), tuple(agg_dict.items()), clave_filtro),
+                    estructura_cruzada, largo, rows, cols)
+                total_filas, total_columnas = len(estructura['inicios']) - 1, len(estructura['columnas'])
+
+                col_tamanio, col_pagina, col_pagina_columnas = st.columns(3)
+                tamanio_pagina = col_tamanio.selectbox("Filas por página", TAMANIOS_PAGINA, index=1,
+                                                     key="filas_pagina_cruzada")
+                paginas_filas = cantidad_paginas(total_filas, tamanio_pagina)
+                paginas_columnas = cantidad_paginas(total_columnas, COLUMNAS_POR_PAGINA)
+                numero_pagina = col_pagina.number_input(f"Página de filas (de {paginas_filas})",
+                                                        min_value=1, max_value=paginas_filas, value=1)
+                numero_columnas = col_pagina_columnas.number_input(f"Página de columnas (de {paginas_columnas})",
+                                                                   min_value=1, max_value=paginas_columnas, value=1)
+
+                st.dataframe(pagina_cruzada(largo, estructura, rows, cols, sorted(agg_dict), numero_pagina,
+                                            tamanio_pagina, numero_columnas),
+                             height=500, use_container_width=True)
+                celdas = total_filas * total_columnas
+                st.caption(f"{total_filas:,} filas × {total_columnas:,} claves de columna; "
+                           f"{len(largo):,} celdas con datos ({len(largo) / max(celdas, 1):.1%})")
+                if descripcion_error(agg_dict.values()):
+                    st.caption(descripcion_error(agg_dict.values()))
+
+                # La descarga es la tabla en formato largo, sin las celdas vacías
+                st.download_button(
+                    label="📥 Descargar tabla cruzada CSV (formato largo)",
+                    data=descarga_csv((clave_union, tuple(rows), tuple(cols), tuple(agg_dict.items()), clave_filtro),
+                                      lambda: largo),
+                    file_name="tabla_cruzada.csv",
+                    mime="text/csv"
+                )
+
+            except Exception as e:
+                st.error(f"❌ Error al crear la tabla dinámica: {e}")
+        elif rows and values:
+            try:
+                # Reutiliza grupos y agregados parciales de reruns anteriores
+                pivot = resultado = tabla_dinamica(merged_df, rows, agg_dict, clave_union, mascara, clave_filtro)
 
                 st.dataframe(pivot, height=500, use_container_width=True)
+                if descripcion_error(agg_dict.values()):
+                    st.caption(descripcion_error(agg_dict.values()))
 
                 # Descargar CSV
                 st.download_button(
                     label="📥 Descargar tabla dinámica CSV",
-                    data=pivot.to_csv(index=False).encode("utf-8"),
+                    data=descarga_csv((clave_union, tuple(rows), tuple(agg_dict.items()), clave_filtro),
+                                      lambda: pivot),
                     file_name="tabla_dinamica.csv",
                     mime="text/csv"
                 )
@@ -165,5 +407,29 @@ if merged_df is not None:
                 st.error(f"❌ Error al crear la tabla dinámica: {e}")
         else:
             st.info("Seleccioná al menos una columna para filas y una para valores para generar la tabla dinámica.")
+
+        if rows and values:
+            # Para repetir la tabla con cli.py, sin abrir la app. Las rutas son los nombres
+            # de los archivos subidos
+            especificacion = crear_especificacion(
+                archivos_leidos, rows, agg_dict, cols, filter_col, filter_val or None, motor_csv,
+                plan['columnas'] if plan is not None else None,
+                permitir_muchos_a_muchos=plan is not None and plan['muchos_a_muchos'] and confirmar)
+            st.download_button(
+                label="💾 Exportar especificación",
+                data=a_texto(especificacion),
+                file_name="especificacion.json",
+                mime="application/json"
+            )
+            # La tabla guardada se abre desde "📌 Abrir tabla guardada", con su resultado en disco
+            col_nombre, col_guardar = st.columns([3, 1])
+            nombre_tabla = col_nombre.text_input("Nombre de la tabla", placeholder="Nombre de la tabla",
+                                                 label_visibility="collapsed")
+            if col_guardar.button("📌 Guardar tabla") and resultado is not None:
+                try:
+                    guardar_tabla(nombre_tabla, especificacion, hashes_leidos, resultado)
+                    st.success(f"✅ Tabla '{nombre_tabla.strip()}' guardada.")
+                except ValueError as e:
+                    st.error(f"❌ {e}")
 else:
     st.warning("🔹 Subí y fusioná archivos para habilitar la tabla dinámica.")
\ No newline at end of file
@@ -0,0 +1,291 @@
+import argparse
+import gc
+import multiprocessing
+import os
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src import cache
+from src.catalogo import CARPETA_DATASETS, cargar_dataset
+from src.compactacion import compactar
+from src.pivot import tabla_dinamica
+from src.union import agregar_id_base, columnas_comunes, planificar_union, unir_archivos
+
+# -------------------------------------------------------------------------------
+# BENCHMARK DE UNIONES Y TABLAS DINÁMICAS
+# -------------------------------------------------------------------------------
+# Mide tiempo y memoria pico de la unión y la tabla dinámica de la app sobre las tablas
+# relacionadas de la carpeta Datasets (taxis, películas, licencias, CTA) y sobre réplicas
+# sintéticas más grandes (cada tabla repetida N veces con las claves desplazadas, así cada
+# copia se une sólo con su copia y la cardinalidad de la unión se mantiene).
+#
+#   python benchmark.py
+#   python benchmark.py --escalas 1 10 100 --escenarios peliculas cta --salida benchmark.csv
+#
+# Cada medición corre en un proceso nuevo, para que la memoria de una no afecte a la otra.
+# La memoria pico es el aumento máximo del RSS del proceso durante la operación (incluye
+# NumPy, pyarrow y pandas); donde no hay /proc, se usa el pico de tracemalloc.
+
+ESCALAS = [1, 10, 100]
+REPETICIONES = 3
+INTERVALO_MUESTREO = 0.001  # segundos entre lecturas del RSS
+
+# Escenario -> archivos (pickle, columnas que se usan, columnas renombradas), filas y valores
+# de la tabla dinámica. Las columnas comunes de los archivos son la clave de la unión.
+ESCENARIOS = {
+    "taxis": {
+        'archivos': [("taxi_owners.p", ["vid", "owner", "zip"], {}),
+                     ("taxi_vehicles.p", ["vid", "make", "year", "fuel_type"], {})],
+        'filas': ["fuel_type"], 'valores': {"year": "mean", "owner": "count"},
+    },
+    "peliculas": {
+        'archivos': [("movies.p", ["id", "title", "popularity"], {}),
+                     ("ratings.p", ["id", "vote_average", "vote_count"], {}),
+                     ("taglines.p", ["id", "tagline"], {}),
+                     ("movie_to_genres.p", ["movie_id", "genre"], {"movie_id": "id"})],
+        'filas': ["genre"], 'valores': {"vote_average": "mean", "popularity": "max", "vote_count": "sum"},
+    },
+    "peliculas_equipos": {
+        'archivos': [("movies.p", ["id", "popularity"], {}),
+                     ("sequels.p", ["id", "sequel"], {}),
+                     ("crews.p", ["id", "department", "job"], {})],
+        'filas': ["department"], 'valores': {"popularity": "mean", "job": "count"},
+    },
+    "licencias_duenios": {
+        'archivos': [("licenses.p", ["account", "ward", "business"], {}),
+                     ("business_owners.p", ["account", "title"], {})],
+        'filas': ["title"], 'valores': {"business": "count"},
+    },
+    "licencias_barrios": {
+        'archivos': [("licenses.p", ["ward", "account", "zip"], {}),
+                     ("ward.p", ["ward", "alderman"], {})],
+        'filas': ["alderman"], 'valores': {"account": "count"},
+    },
+    "licencias_zonas": {
+        'archivos': [("licenses.p", ["zip", "account"], {}),
+                     ("zip_demo.p", ["zip", "income"], {})],
+        'filas': ["zip"], 'valores': {"income": "mean", "account": "count"},
+    },
+    "cta": {
+        'archivos': [("cta_ridership.p", ["station_id", "year", "month", "day", "rides"], {}),
+                     ("cta_calendar.p", ["year", "month", "day", "day_type"], {})],
+        'filas': ["day_type"], 'valores': {"rides": "sum"},
+    },
+    "cta_estaciones": {
+        'archivos': [("cta_ridership.p", ["station_id", "rides"], {}),
+                     ("stations.p", ["station_id", "station_name"], {})],
+        'filas': ["station_name"], 'valores': {"rides": "sum"},
+    },
+}
+
+# Operación -> estrategias que se comparan
+OPERACIONES = {
+    "union": ["plan", "pandas"],
+    "compactacion": ["compactar"],
+    "tabla_dinamica": ["parciales", "pivot_table"],
+}
+
+
+def replicar(dfs, factor):
+    """
+    Repite cada tabla `factor` veces. En cada copia se desplaza la primera columna clave
+    (sumando un múltiplo de su máximo si es numérica, o agregando un sufijo si es texto),
+    así la copia k de una tabla sólo se une con la copia k de las otras.
+    """
+    if factor == 1:
+        return dfs
+    clave = columnas_comunes(dfs)[0]
+    numerica = all(pd.api.types.is_integer_dtype(df[clave]) for df in dfs)
+    paso = max(int(df[clave].max()) for df in dfs) + 1 if numerica else None
+
+    replicas = []
+    for df in dfs:
+        copias = []
+        for k in range(factor):
+            if numerica:
+                desplazada = df[clave] + k * paso
+            else:
+                desplazada = (df[clave].astype(str) + f"~{k}").where(df[clave].notna())
+            copias.append(df.assign(**{clave: desplazada}))
+        replicas.append(pd.concat(copias, ignore_index=True))
+    return replicas
+
+
+def cargar_escenario(nombre, factor, carpeta=CARPETA_DATASETS):
+    """
+    Lee las tablas del escenario (desde las copias Parquet del catálogo) y las replica.
+    """
+    dfs = []
+    for archivo, columnas, renombres in ESCENARIOS[nombre]['archivos']:
+        dfs.append(cargar_dataset(Path(carpeta) / archivo)[columnas].rename(columns=renombres))
+    return replicar(dfs, factor)
+
+
+def _union_pandas(dfs):
+    """
+    Unión como la hacía la app al principio: pd.merge de izquierda a derecha sobre las
+    claves originales.
+    """
+    common_cols = columnas_comunes(dfs)
+    merged_df = dfs[0]
+    for df in dfs[1:]:
+        merged_df = pd.merge(merged_df, df, on=common_cols, how="outer")
+    return agregar_id_base(merged_df)
+
+
+def _rss():
+    """
+    RSS actual del proceso en bytes, o None si no hay /proc (fuera de Linux).
+    """
+    try:
+        with open("/proc/self/statm") as archivo:
+            return int(archivo.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return None
+
+
+def medir(funcion):
+    """
+    Ejecuta funcion() midiendo el tiempo y la memoria pico.
+
+    Retorna:
+        tuple: (resultado, segundos, bytes pico por encima de la memoria inicial)
+    """
+    gc.collect()
+    inicial = _rss()
+    if inicial is None:
+        tracemalloc.start()
+        inicio = time.perf_counter()
+        resultado = funcion()
+        segundos = time.perf_counter() - inicio
+        pico = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return resultado, segundos, pico
+
+    maximo = [inicial]
+    terminado = threading.Event()
+
+    def muestrear():
+        while not terminado.is_set():
+            maximo[0] = max(maximo[0], _rss())
+            time.sleep(INTERVALO_MUESTREO)
+
+    muestreo = threading.Thread(target=muestrear, daemon=True)
+    muestreo.start()
+    inicio = time.perf_counter()
+    try:
+        resultado = funcion()
+    finally:
+        segundos = time.perf_counter() - inicio
+        terminado.set()
+        muestreo.join()
+    return resultado, segundos, max(maximo[0], _rss()) - inicial
+
+
+def _preparar(escenario, factor, operacion):
+    """
+    Datos de entrada de la operación (lo previo a ella no se mide).
+    """
+    dfs = cargar_escenario(escenario, factor)
+    if operacion == "union":
+        return dfs
+    merged_df = unir_archivos(dfs)[0]
+    if operacion == "compactacion":
+        return merged_df
+    return compactar(merged_df)[0]
+
+
+def _funcion(escenario, operacion, estrategia, datos):
+    """
+    La operación a medir, sin argumentos.
+    """
+    definicion = ESCENARIOS[escenario]
+    filas, valores = definicion['filas'], definicion['valores']
+    if estrategia == "plan":
+        return lambda: unir_archivos(datos, planificar_union(datos))[0]
+    if estrategia == "pandas":
+        return lambda: _union_pandas(datos)
+    if estrategia == "compactar":
+        return lambda: compactar(datos)[0]
+    if estrategia == "parciales":
+        return lambda: tabla_dinamica(datos, filas, valores, ("benchmark", escenario))
+    # Como calculaba la tabla la app al principio
+    return lambda: pd.pivot_table(datos, index=filas, values=list(valores), aggfunc=valores,
+                                  fill_value=0, observed=True).reset_index()
+
+
+def ejecutar_caso(escenario, factor, operacion, estrategia, repeticiones=REPETICIONES):
+    """
+    Mide una estrategia de una operación sobre un escenario y escala. Se ejecuta en un
+    proceso propio (ver main).
+
+    Retorna:
+        dict: una fila de resultados.
+    """
+    datos = _preparar(escenario, factor, operacion)
+    funcion = _funcion(escenario, operacion, estrategia, datos)
+    filas_entrada = sum(len(df) for df in datos) if isinstance(datos, list) else len(datos)
+
+    tiempos, picos = [], []
+    for _ in range(repeticiones):
+        # Sin resultados de la repetición anterior en la caché de la app
+        cache.limpiar()
+        resultado, segundos, pico = medir(funcion)
+        filas_resultado = len(resultado)
+        tiempos.append(segundos)
+        picos.append(pico)
+        del resultado
+
+    return {
+        'escenario': escenario,
+        'escala': factor,
+        'operacion': operacion,
+        'estrategia': estrategia,
+        'filas_entrada': filas_entrada,
+        'filas_resultado': filas_resultado,
+        'segundos': round(min(tiempos), 4),
+        'segundos_mediana': round(float(np.median(tiempos)), 4),
+        # La primera repetición es la única que parte sin memoria ya reservada por el proceso
+        'pico_mb': round(picos[0] / 1024 ** 2, 1),
+    }
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(
+        description="Mide tiempo y memoria pico de la unión y la tabla dinámica sobre las tablas de Datasets.")
+    parser.add_argument("--escenarios", nargs="+", choices=list(ESCENARIOS), default=list(ESCENARIOS))
+    parser.add_argument("--escalas", nargs="+", type=int, default=ESCALAS, help="factores de réplica (1 = tablas originales)")
+    parser.add_argument("--operaciones", nargs="+", choices=list(OPERACIONES), default=list(OPERACIONES))
+    parser.add_argument("--repeticiones", type=int, default=REPETICIONES)
+    parser.add_argument("--salida", help="archivo CSV donde guardar los resultados")
+    argumentos = parser.parse_args(argumentos)
+
+    casos = [(escenario, factor, operacion, estrategia)
+             for escenario in argumentos.escenarios for factor in argumentos.escalas
+             for operacion in argumentos.operaciones for estrategia in OPERACIONES[operacion]]
+
+    filas = []
+    # Un proceso nuevo por caso (max_tasks_per_child=1)
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"),
+                             max_tasks_per_child=1) as ejecutor:
+        for caso in casos:
+            fila = ejecutor.submit(ejecutar_caso, *caso, repeticiones=argumentos.repeticiones).result()
+            print(f"{fila['escenario']:<18} x{fila['escala']:<4} {fila['operacion']:<15} {fila['estrategia']:<12} "
+                  f"{fila['filas_entrada']:>10,} → {fila['filas_resultado']:>10,} filas  "
+                  f"{fila['segundos']:>8.3f} s  {fila['pico_mb']:>8.1f} MB", flush=True)
+            filas.append(fila)
+
+    resultados = pd.DataFrame(filas)
+    if argumentos.salida:
+        resultados.to_csv(argumentos.salida, index=False)
+    return resultados
+
+
+if __name__ == "__main__":
+    main()
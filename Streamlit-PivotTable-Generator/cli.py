@@ -0,0 +1,60 @@
+import argparse
+import sys
+
+from src.especificacion import cargar, ejecutar, guardar, hashes_entradas, validar
+from src.resultados import ejecutar_cacheado, tablas_guardadas
+
+# -------------------------------------------------------------------------------
+# EJECUCIÓN SIN STREAMLIT
+# -------------------------------------------------------------------------------
+# Ejecuta una especificación exportada desde la app (o escrita a mano) y guarda la tabla
+# dinámica como CSV o Parquet:
+#
+#   python cli.py especificacion.json
+#   python cli.py especificacion.yaml --salida resultado.parquet
+#   python cli.py --tabla "Ventas por región" --salida ventas.csv
+#
+# Si los archivos no cambiaron desde una ejecución anterior, el resultado sale de la caché
+# en disco de src/resultados.py, sin leerlos. Las rutas de las tablas guardadas en la app
+# son los nombres de los archivos subidos, relativos a la carpeta actual.
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(
+        description="Une archivos, aplica el filtro y arma la tabla dinámica de una especificación JSON o YAML.")
+    origen = parser.add_mutually_exclusive_group(required=True)
+    origen.add_argument("especificacion", nargs="?", help="archivo .json, .yaml o .yml con la especificación")
+    origen.add_argument("--tabla", help="nombre de una tabla guardada en la app")
+    parser.add_argument("--salida", help="archivo de salida (.csv o .parquet); reemplaza al de la especificación")
+    parser.add_argument("--sin-cache", action="store_true", help="recalcular aunque haya un resultado guardado")
+    argumentos = parser.parse_args(argumentos)
+
+    try:
+        if argumentos.tabla is not None:
+            tablas = tablas_guardadas()
+            if argumentos.tabla not in tablas:
+                raise ValueError(f"No hay una tabla guardada llamada '{argumentos.tabla}'.")
+            especificacion = validar(tablas[argumentos.tabla]['especificacion'])
+        else:
+            especificacion = cargar(argumentos.especificacion)
+        salida = argumentos.salida or especificacion.get('salida')
+        if not salida:
+            raise ValueError("Indicá el archivo de salida con --salida o con \"salida\" en la especificación.")
+
+        if argumentos.sin_cache:
+            resultado, desde_cache = ejecutar(especificacion), False
+        else:
+            resultado, desde_cache = ejecutar_cacheado(
+                especificacion, hashes_entradas(especificacion), lambda: ejecutar(especificacion))
+        guardar(resultado, salida)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+
+    origen_resultado = "resultado guardado" if desde_cache else "calculada"
+    print(f"✅ Tabla dinámica guardada en {salida} ({len(resultado):,} filas, {origen_resultado})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
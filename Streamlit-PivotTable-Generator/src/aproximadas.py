@@ -0,0 +1,208 @@
+import numpy as np
+import pandas as pd
+
+# -------------------------------------------------------------------------------
+# AGREGACIONES APROXIMADAS CON RESÚMENES COMBINABLES
+# -------------------------------------------------------------------------------
+# Cantidad de distintos y percentiles exactos necesitan guardar todos los valores de cada
+# grupo. En su lugar, cada celda de la tabla dinámica guarda un resumen de tamaño acotado
+# que se puede calcular por bloques de filas y combinar después (como los parciales de
+# src/pivot.py):
+#   - HyperLogLog para la cantidad de distintos: REGISTROS_HLL registros por grupo con el
+#     máximo de ceros iniciales del hash de sus valores. Se guarda en forma dispersa (sólo
+#     los registros usados) como un arreglo ordenado de (grupo, registro, rango).
+#   - Resumen de cuantiles: a lo sumo PUNTOS_CUANTILES valores por grupo, ordenados y con
+#     peso (la cantidad de filas que representa cada uno). Al podar, el rango estimado de
+#     cualquier valor se aleja del real en menos de total / PUNTOS_CUANTILES.
+#
+# Los resúmenes son tuplas de arreglos de NumPy, ordenadas por grupo.
+
+PRECISION_HLL = 12
+REGISTROS_HLL = 1 << PRECISION_HLL
+PUNTOS_CUANTILES = 1000
+
+# Error estándar relativo de HyperLogLog
+ERROR_DISTINTOS = 1.04 / np.sqrt(REGISTROS_HLL)
+# Error máximo de rango de los percentiles: una poda por bloque y una al combinar
+ERROR_CUANTILES = 2 / PUNTOS_CUANTILES
+
+# Función de agregación -> (resumen que usa, percentil)
+FUNCIONES_APROXIMADAS = {
+    "nunique_aprox": ("hll", None),
+    "median_aprox": ("cuantiles", 0.5),
+    "p25_aprox": ("cuantiles", 0.25),
+    "p75_aprox": ("cuantiles", 0.75),
+    "p90_aprox": ("cuantiles", 0.9),
+}
+
+_BITS_RANGO = 6  # el rango (1 a 64 - PRECISION_HLL + 1) entra en 6 bits
+
+
+def hash_valores(serie):
+    """
+    Hash de 64 bits de cada valor de la columna (el mismo valor da siempre el mismo hash).
+    """
+    return pd.util.hash_pandas_object(serie, index=False).to_numpy(dtype=np.uint64)
+
+
+def _ceros_iniciales(x):
+    """
+    Cantidad de bits en cero al comienzo de cada entero de 64 bits sin signo.
+    """
+    x = x.copy()
+    ceros = np.zeros(len(x), dtype=np.int64)
+    for bits in (32, 16, 8, 4, 2, 1):
+        vacios = x < (np.uint64(1) << np.uint64(64 - bits))
+        ceros[vacios] += bits
+        x[vacios] <<= np.uint64(bits)
+    return ceros + (x == 0)
+
+
+def _maximo_por_clave(compuesto):
+    """
+    Dado un arreglo de claves desplazadas _BITS_RANGO bits con el rango en los bits bajos,
+    deja una entrada por clave con el rango máximo.
+    """
+    compuesto = np.unique(compuesto)
+    if not len(compuesto):
+        # Sin filas (por ejemplo, una columna toda nula) el resumen queda vacío
+        return compuesto
+    claves = compuesto >> _BITS_RANGO
+    ultima = np.append(claves[1:] != claves[:-1], True)
+    return compuesto[ultima]
+
+
+def hll_bloque(codigos, hashes):
+    """
+    Calcula los registros HyperLogLog de cada grupo sobre un bloque de filas.
+
+    Parámetros:
+        codigos (np.ndarray): número de grupo de cada fila (-1 para ignorarla).
+        hashes (np.ndarray): resultado de hash_valores.
+
+    Retorna:
+        np.ndarray: registros usados, como grupo, registro y rango en un único int64.
+    """
+    validas = codigos >= 0
+    codigos, hashes = codigos[validas].astype(np.int64), hashes[validas]
+    registro = (hashes >> np.uint64(64 - PRECISION_HLL)).astype(np.int64)
+    resto = hashes << np.uint64(PRECISION_HLL)
+    rango = np.minimum(_ceros_iniciales(resto), 64 - PRECISION_HLL) + 1
+    clave = (codigos << PRECISION_HLL) | registro
+    return _maximo_por_clave((clave << _BITS_RANGO) | rango)
+
+
+def combinar_hll(resumenes):
+    """
+    Combina resúmenes HyperLogLog de distintos bloques (máximo por registro).
+    """
+    return _maximo_por_clave(np.concatenate(resumenes))
+
+
+def estimar_distintos(resumen, cantidad_grupos):
+    """
+    Estima la cantidad de valores distintos de cada grupo.
+
+    Retorna:
+        np.ndarray: estimación redondeada de cada grupo (0 si no tiene valores).
+    """
+    m = REGISTROS_HLL
+    grupo = resumen >> (_BITS_RANGO + PRECISION_HLL)
+    rango = resumen & ((1 << _BITS_RANGO) - 1)
+    usados = np.bincount(grupo, minlength=cantidad_grupos)
+    # Los registros sin usar valen 0 y suman 2^0 = 1 cada uno
+    suma = np.bincount(grupo, weights=np.exp2(-rango.astype(float)), minlength=cantidad_grupos) + (m - usados)
+
+    alfa = 0.7213 / (1 + 1.079 / m)
+    estimacion = alfa * m * m / suma
+    # Para cantidades chicas se usa el conteo lineal de registros vacíos
+    vacios = m - usados
+    lineal = (estimacion <= 2.5 * m) & (vacios > 0)
+    estimacion[lineal] = m * np.log(m / vacios[lineal])
+    return np.round(estimacion).astype(np.int64)
+
+
+def _podar(codigos, valores, pesos, puntos):
+    """
+    Reduce cada grupo (ordenado por valor) a lo sumo a `puntos` valores: se queda con el
+    primer valor que alcanza cada rango total * j / puntos y le suma el peso de los
+    descartados anteriores.
+    """
+    if not len(codigos):
+        return codigos, valores, pesos
+    acumulado = np.cumsum(pesos)
+    inicio_grupo = np.flatnonzero(np.append(True, codigos[1:] != codigos[:-1]))
+    largo_grupo = np.diff(np.append(inicio_grupo, len(codigos)))
+    base = np.repeat(np.append(0, acumulado[inicio_grupo[1:] - 1]), largo_grupo)
+    acumulado -= base
+    total = np.repeat(acumulado[inicio_grupo + largo_grupo - 1], largo_grupo)
+
+    # Se conserva el valor si hay un j entero con acumulado - peso < total * j / puntos <= acumulado
+    conservar = (acumulado * puntos) // total > ((acumulado - pesos) * puntos) // total
+    codigos, valores, acumulado = codigos[conservar], valores[conservar], acumulado[conservar]
+    nuevo_grupo = np.append(True, codigos[1:] != codigos[:-1])
+    pesos = np.where(nuevo_grupo, acumulado, acumulado - np.append(0, acumulado[:-1]))
+    return codigos, valores, pesos
+
+
+def cuantiles_bloque(codigos, valores, puntos=PUNTOS_CUANTILES):
+    """
+    Calcula el resumen de cuantiles de cada grupo sobre un bloque de filas.
+
+    Parámetros:
+        codigos (np.ndarray): número de grupo de cada fila (-1 para ignorarla).
+        valores (np.ndarray): valores numéricos; los NaN se ignoran.
+
+    Retorna:
+        tuple: (codigos, valores, pesos) ordenados por grupo y valor.
+    """
+    valores = valores.astype(np.float64, copy=False)
+    validas = (codigos >= 0) & ~np.isnan(valores)
+    codigos, valores = codigos[validas].astype(np.int64), valores[validas]
+    orden = np.lexsort((valores, codigos))
+    return _podar(codigos[orden], valores[orden], np.ones(len(orden), dtype=np.int64), puntos)
+
+
+def combinar_cuantiles(resumenes, puntos=PUNTOS_CUANTILES):
+    """
+    Combina resúmenes de cuantiles de distintos bloques y los vuelve a podar.
+    """
+    codigos, valores, pesos = (np.concatenate(partes) for partes in zip(*resumenes))
+    orden = np.lexsort((valores, codigos))
+    return _podar(codigos[orden], valores[orden], pesos[orden], puntos)
+
+
+def estimar_cuantil(resumen, cantidad_grupos, q):
+    """
+    Estima el percentil q (entre 0 y 1) de cada grupo: el primer valor del resumen cuyo
+    rango acumulado alcanza q * total.
+
+    Retorna:
+        np.ndarray: el percentil de cada grupo (NaN si no tiene valores).
+    """
+    codigos, valores, pesos = resumen
+    resultado = np.full(cantidad_grupos, np.nan)
+    if not len(codigos):
+        return resultado
+    acumulado = np.cumsum(pesos)
+    inicio_grupo = np.flatnonzero(np.append(True, codigos[1:] != codigos[:-1]))
+    largo_grupo = np.diff(np.append(inicio_grupo, len(codigos)))
+    acumulado -= np.repeat(np.append(0, acumulado[inicio_grupo[1:] - 1]), largo_grupo)
+    total = np.repeat(acumulado[inicio_grupo + largo_grupo - 1], largo_grupo)
+
+    alcanzados = np.flatnonzero(acumulado >= q * total)
+    grupos, primeros = np.unique(codigos[alcanzados], return_index=True)
+    resultado[grupos] = valores[alcanzados[primeros]]
+    return resultado
+
+
+def descripcion_error(funciones):
+    """
+    Texto con la cota de error de las funciones aproximadas usadas, para mostrar en la UI.
+    """
+    partes = []
+    if "nunique_aprox" in funciones:
+        partes.append(f"distintos con error estándar de ±{ERROR_DISTINTOS:.1%}")
+    if any(FUNCIONES_APROXIMADAS.get(funcion, (None,))[0] == "cuantiles" for funcion in funciones):
+        partes.append(f"percentiles con error de rango menor a {ERROR_CUANTILES:.1%} de las filas de cada celda")
+    return "≈ Valores aproximados: " + "; ".join(partes) + "." if partes else ""
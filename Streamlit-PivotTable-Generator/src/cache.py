@@ -0,0 +1,190 @@
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# -------------------------------------------------------------------------------
+# CACHÉ EN MEMORIA ENTRE RERUNS
+# -------------------------------------------------------------------------------
+# Streamlit vuelve a ejecutar app.py completo ante cada cambio de un widget. Los resultados
+# costosos (archivos parseados, unión de archivos) se guardan acá, compartidos entre reruns,
+# con política LRU y un presupuesto máximo de memoria.
+#
+# Las claves son tuplas cuyo primer elemento indica el tipo de resultado, por ejemplo
+# ("archivo", hash, motor) o ("union", clave_archivo_1, clave_archivo_2, ...).
+# Los valores guardados no deben modificarse: quien los obtiene trabaja sobre copias.
+#
+# Los archivos convertidos en disco (DIRECTORIO_DISCO) se descartan también por LRU, según
+# su fecha de último uso, con un presupuesto de bytes por directorio.
+
+PRESUPUESTO_MEMORIA = 2 * 1024 ** 3  # 2 GB
+
+# Directorio de los archivos convertidos en disco (se reutilizan entre sesiones)
+DIRECTORIO_DISCO = Path(tempfile.gettempdir()) / "pivot_cache"
+
+_BYTES_POR_LECTURA = 1024 * 1024
+
+_entradas = OrderedDict()  # clave -> (valor, bytes)
+_estado = {'uso': 0}
+_lock = threading.RLock()
+
+
+def hash_archivo(archivo):
+    """
+    Calcula el hash del contenido de un archivo subido, leyendo su buffer sin copiarlo.
+
+    Parámetros:
+        archivo: UploadedFile de Streamlit (o cualquier io.BytesIO).
+
+    Retorna:
+        str: hash hexadecimal del contenido.
+    """
+    with archivo.getbuffer() as buffer:
+        return hashlib.blake2b(buffer, digest_size=16).hexdigest()
+
+
+def hash_ruta(ruta):
+    """
+    Calcula el hash del contenido de un archivo en disco, leyéndolo de a bloques. Es el
+    mismo que da hash_archivo para el archivo subido.
+    """
+    hash_contenido = hashlib.blake2b(digest_size=16)
+    with open(ruta, "rb") as archivo:
+        for bloque in iter(lambda: archivo.read(_BYTES_POR_LECTURA), b""):
+            hash_contenido.update(bloque)
+    return hash_contenido.hexdigest()
+
+
+def tamanio_en_memoria(valor):
+    """
+    Estima los bytes ocupados por un valor guardado en la caché.
+    Las tuplas y listas suman el tamaño de sus elementos.
+    """
+    if isinstance(valor, (pd.DataFrame, pd.Series)):
+        uso = valor.memory_usage(deep=True)
+        return int(uso.sum()) if isinstance(uso, pd.Series) else int(uso)
+    if isinstance(valor, pd.Index):
+        return int(valor.memory_usage(deep=True))
+    if isinstance(valor, np.ndarray):
+        return int(valor.nbytes)
+    if isinstance(valor, (tuple, list)):
+        return sum(tamanio_en_memoria(elemento) for elemento in valor)
+    if isinstance(valor, dict):
+        return sum(tamanio_en_memoria(elemento) for elemento in valor.values())
+    return sys.getsizeof(valor)
+
+
+def obtener(clave):
+    """
+    Devuelve el valor guardado para la clave (marcándolo como usado recientemente), o None.
+    """
+    with _lock:
+        if clave not in _entradas:
+            return None
+        _entradas.move_to_end(clave)
+        return _entradas[clave][0]
+
+
+def guardar(clave, valor):
+    """
+    Guarda un valor en la caché, descartando los menos usados recientemente hasta respetar
+    PRESUPUESTO_MEMORIA. Un valor más grande que todo el presupuesto no se guarda.
+
+    Retorna:
+        el mismo valor recibido.
+    """
+    tamanio = tamanio_en_memoria(valor)
+    with _lock:
+        descartar(clave)
+        if tamanio > PRESUPUESTO_MEMORIA:
+            return valor
+        while _entradas and _estado['uso'] + tamanio > PRESUPUESTO_MEMORIA:
+            _, (_, liberado) = _entradas.popitem(last=False)
+            _estado['uso'] -= liberado
+        _entradas[clave] = (valor, tamanio)
+        _estado['uso'] += tamanio
+    return valor
+
+
+def descartar(clave):
+    """
+    Elimina una clave de la caché, si existe.
+    """
+    with _lock:
+        if clave in _entradas:
+            _estado['uso'] -= _entradas.pop(clave)[1]
+
+
+def cacheado(clave, funcion, *args, **kwargs):
+    """
+    Devuelve el valor guardado para la clave o, si no existe, lo calcula con
+    funcion(*args, **kwargs) y lo guarda.
+    """
+    valor = obtener(clave)
+    if valor is None:
+        valor = guardar(clave, funcion(*args, **kwargs))
+    return valor
+
+
+def marcar_uso(ruta):
+    """
+    Marca un archivo de los directorios en disco como recién usado (su fecha de modificación
+    es la del último uso, para descartar_antiguos_disco).
+    """
+    try:
+        os.utime(ruta)
+    except FileNotFoundError:
+        pass
+
+
+def descartar_antiguos_disco(directorio, presupuesto, patron="*.parquet", conservar=None):
+    """
+    Borra los archivos del directorio usados hace más tiempo hasta que los que quedan
+    ocupen a lo sumo `presupuesto` bytes (LRU por fecha de último uso).
+
+    Parámetros:
+        directorio (Path): directorio con los archivos.
+        presupuesto (int): bytes máximos.
+        patron (str): archivos que cuentan para el presupuesto.
+        conservar (Path): archivo que no se borra aunque sea más grande que el presupuesto
+            (el que se acaba de crear y se va a usar).
+    """
+    archivos = []
+    for ruta in Path(directorio).glob(patron):
+        try:
+            datos = ruta.stat()
+        except FileNotFoundError:
+            continue
+        archivos.append((datos.st_mtime, datos.st_size, ruta))
+    uso = sum(tamanio for _, tamanio, _ in archivos)
+    for _, tamanio, ruta in sorted(archivos, key=lambda archivo: archivo[0]):
+        if uso <= presupuesto:
+            break
+        if ruta == conservar:
+            continue
+        ruta.unlink(missing_ok=True)
+        uso -= tamanio
+
+
+def uso_memoria():
+    """
+    Retorna:
+        tuple: (bytes usados, cantidad de entradas).
+    """
+    with _lock:
+        return _estado['uso'], len(_entradas)
+
+
+def limpiar():
+    """
+    Vacía la caché.
+    """
+    with _lock:
+        _entradas.clear()
+        _estado['uso'] = 0
@@ -0,0 +1,222 @@
+import io
+import json
+import threading
+from pathlib import Path
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from src.cache import DIRECTORIO_DISCO, hash_ruta
+from src.lectura import EXTENSIONES_EXCEL, _a_parquet, hojas_excel, leer_csv, leer_excel
+
+# -------------------------------------------------------------------------------
+# CATÁLOGO DE LA CARPETA Datasets
+# -------------------------------------------------------------------------------
+# Indexa los archivos de la carpeta Datasets del repositorio (CSV, Excel y pickles de
+# pandas) con su esquema, cantidad de filas y tamaño. La primera vez que aparece un archivo
+# (o cuando cambia) se lee una sola vez y se guarda una copia Parquet por hash de su
+# contenido; después el índice sale de ARCHIVO_INDICE y los datos se cargan recién cuando
+# se piden, leyendo sólo la copia Parquet.
+#
+# Cada hoja de un Excel es un dataset aparte, llamado "archivo [hoja]". Los pickles
+# ejecutan código al abrirse: el catálogo sólo debe apuntar a carpetas de confianza.
+
+CARPETA_DATASETS = Path(__file__).resolve().parents[2] / "Datasets"
+DIRECTORIO_CATALOGO = DIRECTORIO_DISCO / "catalogo"
+ARCHIVO_INDICE = DIRECTORIO_CATALOGO / "indice.json"
+
+EXTENSIONES_PICKLE = (".p", ".pkl")
+EXTENSIONES_CATALOGO = (".csv", *EXTENSIONES_EXCEL, *EXTENSIONES_PICKLE)
+
+_COLUMNAS_CATALOGO = ['dataset', 'ruta', 'hoja', 'formato', 'bytes', 'filas', 'columnas', 'esquema', 'hash', 'error']
+
+_lock = threading.RLock()
+
+
+def _excel_en_memoria(ruta):
+    """
+    Contenido de un Excel como archivo en memoria con atributo name, como los subidos.
+    """
+    contenido = io.BytesIO(ruta.read_bytes())
+    contenido.name = ruta.name
+    return contenido
+
+
+def _leer_fuente(ruta, hoja=None):
+    """
+    Lee el archivo original, con los mismos lectores que los archivos subidos a la app.
+
+    Lanza:
+        ValueError: si un pickle no contiene un DataFrame.
+    """
+    extension = ruta.suffix.lower()
+    if extension in EXTENSIONES_PICKLE:
+        df = pd.read_pickle(ruta)
+        if not isinstance(df, pd.DataFrame):
+            raise ValueError(f"{ruta.name} no contiene un DataFrame ({type(df).__name__}).")
+        # Un índice con nombre es una columna más; uno sin nombre se descarta, como al subir un CSV
+        return df.reset_index() if any(nombre is not None for nombre in df.index.names) else df
+    if extension == ".csv":
+        with open(ruta, "rb") as archivo:
+            return leer_csv(archivo)
+    return leer_excel(_excel_en_memoria(ruta), hoja)
+
+
+def _ruta_copia(hash_contenido, posicion):
+    """
+    Copia Parquet de la hoja (o del único dataset) en la posición indicada del archivo.
+    """
+    return DIRECTORIO_CATALOGO / f"{hash_contenido}-{posicion}.parquet"
+
+
+def _convertir(ruta, hash_contenido):
+    """
+    Lee el archivo y guarda una copia Parquet de cada hoja (o del único dataset).
+
+    Retorna:
+        list: una entrada {'hoja', 'filas', 'esquema'} por dataset del archivo.
+    """
+    DIRECTORIO_CATALOGO.mkdir(parents=True, exist_ok=True)
+    hojas = hojas_excel(_excel_en_memoria(ruta)) if ruta.suffix.lower() in EXTENSIONES_EXCEL else [None]
+    tablas = []
+    for posicion, hoja in enumerate(hojas):
+        destino = _ruta_copia(hash_contenido, posicion)
+        if not destino.exists():
+            temporal = destino.with_suffix(f".{threading.get_ident()}.tmp")
+            _a_parquet(_leer_fuente(ruta, hoja), temporal)
+            temporal.replace(destino)
+        # Filas y esquema salen de los metadatos del Parquet, sin leer los datos
+        metadatos = pq.ParquetFile(destino)
+        tablas.append({
+            'hoja': hoja,
+            'filas': metadatos.metadata.num_rows,
+            'esquema': {campo.name: str(campo.type) for campo in metadatos.schema_arrow},
+        })
+    return tablas
+
+
+def _leer_indice():
+    """
+    Retorna:
+        dict: ruta -> {'bytes', 'modificado', 'hash', 'tablas', 'error'} de cada archivo.
+    """
+    try:
+        return json.loads(ARCHIVO_INDICE.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+
+
+def _escribir_indice(indice):
+    """
+    Reemplaza ARCHIVO_INDICE de una sola vez, para no dejarlo a medio escribir.
+    """
+    DIRECTORIO_CATALOGO.mkdir(parents=True, exist_ok=True)
+    temporal = ARCHIVO_INDICE.with_suffix(".tmp")
+    temporal.write_text(json.dumps(indice, ensure_ascii=False, indent=2), encoding="utf-8")
+    temporal.replace(ARCHIVO_INDICE)
+
+
+def _entrada(ruta, indice):
+    """
+    Entrada del índice para el archivo. Si es nuevo o cambió su tamaño o fecha, lo vuelve
+    a leer y a convertir.
+
+    Retorna:
+        tuple: (entrada, True si hubo que actualizar el índice).
+    """
+    datos = ruta.stat()
+    entrada = indice.get(str(ruta))
+    if entrada is not None and (entrada['bytes'], entrada['modificado']) == (datos.st_size, datos.st_mtime):
+        return entrada, False
+
+    entrada = {'bytes': datos.st_size, 'modificado': datos.st_mtime, 'hash': hash_ruta(ruta)}
+    try:
+        entrada['tablas'], entrada['error'] = _convertir(ruta, entrada['hash']), None
+    except Exception as e:
+        entrada['tablas'], entrada['error'] = [], str(e)
+    indice[str(ruta)] = entrada
+    return entrada, True
+
+
+def catalogo(carpeta=CARPETA_DATASETS):
+    """
+    Indexa los datasets de la carpeta. Sólo se leen los archivos nuevos o modificados
+    desde la última vez.
+
+    Parámetros:
+        carpeta (Path): carpeta con los archivos.
+
+    Retorna:
+        pd.DataFrame: una fila por dataset con 'dataset', 'ruta', 'hoja', 'formato',
+        'bytes', 'filas', 'columnas', 'esquema', 'hash' y 'error' (None si se pudo leer).
+    """
+    carpeta = Path(carpeta).resolve()
+    archivos = sorted(ruta for ruta in carpeta.iterdir()
+                      if ruta.is_file() and ruta.suffix.lower() in EXTENSIONES_CATALOGO) if carpeta.is_dir() else []
+
+    filas_catalogo = []
+    with _lock:
+        indice = _leer_indice()
+        cambios = False
+        for ruta in archivos:
+            entrada, actualizada = _entrada(ruta, indice)
+            cambios |= actualizada
+            comunes = {'ruta': str(ruta), 'formato': ruta.suffix.lower().lstrip("."), 'bytes': entrada['bytes'],
+                       'hash': entrada['hash'], 'error': entrada['error']}
+            if entrada['error'] is not None:
+                filas_catalogo.append({'dataset': ruta.name, **comunes})
+            for tabla in entrada['tablas']:
+                filas_catalogo.append({
+                    'dataset': ruta.name if tabla['hoja'] is None else f"{ruta.name} [{tabla['hoja']}]",
+                    'hoja': tabla['hoja'],
+                    'filas': tabla['filas'],
+                    'columnas': len(tabla['esquema']),
+                    'esquema': ", ".join(f"{col} ({tipo})" for col, tipo in tabla['esquema'].items()),
+                    **comunes,
+                })
+
+        # Los archivos que ya no están salen del índice
+        vigentes = {str(ruta) for ruta in archivos}
+        borrados = [ruta for ruta in indice if Path(ruta).parent == carpeta and ruta not in vigentes]
+        for ruta in borrados:
+            del indice[ruta]
+        if cambios or borrados:
+            _escribir_indice(indice)
+
+    return pd.DataFrame(filas_catalogo, columns=_COLUMNAS_CATALOGO)
+
+
+def cargar_dataset(ruta, hoja=None):
+    """
+    Carga un dataset del catálogo desde su copia Parquet. El archivo original sólo se lee
+    si todavía no se convirtió o cambió desde la última vez.
+
+    Parámetros:
+        ruta (str | Path): archivo original.
+        hoja (str): hoja, para los Excel.
+
+    Retorna:
+        pd.DataFrame: los datos, con los mismos tipos que al subir el archivo a la app.
+
+    Lanza:
+        ValueError: si el archivo no se pudo leer o la hoja no existe.
+    """
+    ruta = Path(ruta).resolve()
+    # En el DataFrame del catálogo, la hoja de los archivos que no son Excel queda como NaN
+    hoja = None if hoja is None or pd.isna(hoja) else hoja
+    with _lock:
+        indice = _leer_indice()
+        entrada, actualizada = _entrada(ruta, indice)
+        if actualizada:
+            _escribir_indice(indice)
+    if entrada['error'] is not None:
+        raise ValueError(entrada['error'])
+
+    hojas = [tabla['hoja'] for tabla in entrada['tablas']]
+    if hoja not in hojas:
+        raise ValueError(f"{ruta.name} no tiene la hoja '{hoja}'.")
+    destino = _ruta_copia(entrada['hash'], hojas.index(hoja))
+    if not destino.exists():
+        # La copia se borró (por ejemplo, al limpiar la carpeta temporal): se vuelve a crear
+        _convertir(ruta, entrada['hash'])
+    return pd.read_parquet(destino)
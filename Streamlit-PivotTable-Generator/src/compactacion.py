@@ -0,0 +1,122 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from src.cache import tamanio_en_memoria
+
+# -------------------------------------------------------------------------------
+# COMPACTACIÓN DE MEMORIA
+# -------------------------------------------------------------------------------
+# Después de leer y unir los archivos, cada columna se pasa al tipo más chico que conserva
+# exactamente sus valores:
+#   - enteros al ancho mínimo (int8, uint16, ...),
+#   - texto con fechas (AAAA-MM-DD o DD/MM/AAAA) a datetime, si todas las fechas son válidas,
+#   - texto con pocos valores distintos a categoría (ordenada, así min/max y el orden de
+#     la tabla dinámica son los mismos que con el texto).
+# Los decimales quedan en float64: aunque float32 conserve cada valor, las sumas, promedios
+# y varianzas de la tabla dinámica se acumularían en 32 bits y cambiarían los totales.
+# Las columnas con tipos mezclados (números y texto) se dejan como están.
+
+# Proporción máxima de valores distintos (sobre los no nulos) para pasar texto a categoría
+PROPORCION_CATEGORIA = 0.5
+FILAS_MUESTRA_FECHAS = 100
+
+# Patrón de los valores de la muestra -> formatos a probar, en orden
+_FORMATOS_FECHA = [
+    (re.compile(r"^\d{4}-\d{2}-\d{2}([ T]\d{2}:\d{2}(:\d{2}(\.\d+)?)?)?$"), ["ISO8601"]),
+    (re.compile(r"^\d{1,2}/\d{1,2}/\d{4}$"), ["%d/%m/%Y", "%m/%d/%Y"]),
+    (re.compile(r"^\d{1,2}/\d{1,2}/\d{4} \d{1,2}:\d{2}(:\d{2})?$"), ["%d/%m/%Y %H:%M:%S", "%d/%m/%Y %H:%M",
+                                                                    "%m/%d/%Y %H:%M:%S", "%m/%d/%Y %H:%M"]),
+]
+
+
+def _es_texto(serie):
+    """
+    Indica si todos los valores no nulos de la columna son texto.
+    """
+    if isinstance(serie.dtype, pd.StringDtype):
+        return True
+    return serie.dtype == object and pd.api.types.infer_dtype(serie, skipna=True) == "string"
+
+
+def _compactar_entero(serie):
+    """
+    Entero con el ancho mínimo que contiene todos sus valores.
+    """
+    return pd.to_numeric(serie, downcast="unsigned" if serie.min() >= 0 else "integer")
+
+
+def _a_fecha(serie):
+    """
+    Convierte texto con fechas a datetime si todos los valores no nulos tienen el mismo
+    formato reconocido. Devuelve None si la columna no es de fechas.
+    """
+    muestra = serie.dropna().head(FILAS_MUESTRA_FECHAS).astype(str)
+    if muestra.empty:
+        return None
+    for patron, formatos in _FORMATOS_FECHA:
+        if not muestra.str.match(patron).all():
+            continue
+        for formato in formatos:
+            convertida = pd.to_datetime(serie, format=formato, errors="coerce")
+            if convertida.notna().sum() == serie.notna().sum():
+                return convertida
+    return None
+
+
+def _a_categoria(serie):
+    """
+    Convierte texto con pocos valores distintos a categoría ordenada. Devuelve None si hay
+    demasiados valores distintos.
+    """
+    no_nulos = serie.notna().sum()
+    categorias = serie.dropna().unique()
+    if not no_nulos or len(categorias) > PROPORCION_CATEGORIA * no_nulos:
+        return None
+    return pd.Categorical(serie, categories=np.sort(categorias.astype(object)), ordered=True)
+
+
+def compactar_columna(serie):
+    """
+    Devuelve la columna con el tipo más chico que conserva sus valores.
+    """
+    # Los tipos de extensión de pandas (categorías, enteros con nulos, ...) quedan igual
+    tipo = serie.dtype.kind if isinstance(serie.dtype, np.dtype) else None
+    if tipo in ("i", "u") and len(serie):
+        return _compactar_entero(serie)
+    if _es_texto(serie):
+        fecha = _a_fecha(serie)
+        if fecha is not None:
+            return fecha
+        categoria = _a_categoria(serie)
+        if categoria is not None:
+            return pd.Series(categoria, index=serie.index, name=serie.name)
+    return serie
+
+
+def compactar(df):
+    """
+    Compacta todas las columnas del DataFrame.
+
+    Parámetros:
+        df (pd.DataFrame): datos a compactar. No se modifica.
+
+    Retorna:
+        tuple: (DataFrame compactado, informe), donde informe es un pd.DataFrame con el
+        tipo y los bytes de cada columna antes y después.
+    """
+    columnas, filas_informe = {}, []
+    for col in df.columns:
+        original = df[col]
+        compactada = compactar_columna(original)
+        columnas[col] = compactada
+        filas_informe.append({
+            'columna': col,
+            'tipo_antes': str(original.dtype),
+            'tipo_despues': str(compactada.dtype),
+            'bytes_antes': tamanio_en_memoria(original),
+            'bytes_despues': tamanio_en_memoria(compactada),
+        })
+    # copy=False: las columnas que no cambian de tipo se comparten con df
+    return pd.DataFrame(columnas, index=df.index, copy=False), pd.DataFrame(filas_informe)
@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+
+from src.pivot import tabla_dinamica
+
+# -------------------------------------------------------------------------------
+# TABLA DINÁMICA CON COLUMNAS (TABLA CRUZADA)
+# -------------------------------------------------------------------------------
+# Con columnas de muchas categorías, la tabla ancha de pd.pivot_table(columns=...) es casi
+# toda ceros. Acá la tabla se guarda en formato largo: una fila por celda no vacía, con las
+# columnas de filas, las de columnas y los valores (es la tabla dinámica de filas +
+# columnas). Sólo la página visible se pasa a formato ancho, rellenando con 0 las celdas
+# vacías, así la memoria depende de la cantidad de celdas con datos.
+
+COLUMNAS_POR_PAGINA = 20
+
+
+def tabla_cruzada(df, rows, cols, agg_dict, clave_datos, mascara=None, clave_filtro=None):
+    """
+    Calcula la tabla cruzada en formato largo, reutilizando los parciales de src/pivot.py.
+
+    Parámetros:
+        df (pd.DataFrame): datos completos (sin filtrar). No se modifica.
+        rows (list): columnas para filas.
+        cols (list): columnas para columnas.
+        agg_dict (dict): columna de valores -> función de agregación.
+        clave_datos: clave que identifica a df en la caché.
+        mascara (np.ndarray): filas que pasan el filtro, o None para usar todas.
+        clave_filtro: clave que identifica a la máscara (None si no hay filtro).
+
+    Retorna:
+        pd.DataFrame: una fila por celda no vacía, ordenada por filas y después por columnas.
+
+    Lanza:
+        ValueError: si una columna está en más de un rol o la función no existe.
+    """
+    repetidas = [col for col in cols if col in rows]
+    if repetidas:
+        raise ValueError(f"Las columnas {repetidas} no pueden estar en filas y en columnas a la vez.")
+    return tabla_dinamica(df, list(rows) + list(cols), agg_dict, clave_datos, mascara, clave_filtro)
+
+
+def estructura_cruzada(largo, rows, cols):
+    """
+    Indexa la tabla larga para paginarla sin recorrerla entera en cada página.
+
+    Retorna:
+        dict: {'inicios': posición de la primera celda de cada fila de la tabla ancha (más
+               una posición final), 'columnas': pd.DataFrame con las claves de columna
+               ordenadas, 'codigo_columna': np.ndarray con la columna de cada celda}
+    """
+    rows, cols = list(rows), list(cols)
+    if len(largo):
+        nueva_fila = np.ones(len(largo), dtype=bool)
+        nueva_fila[1:] = (largo[rows].iloc[1:].to_numpy() != largo[rows].iloc[:-1].to_numpy()).any(axis=1)
+        inicios = np.append(np.flatnonzero(nueva_fila), len(largo))
+    else:
+        inicios = np.zeros(1, dtype=np.intp)
+
+    agrupado = largo.groupby(cols, sort=True, observed=True)
+    return {
+        'inicios': inicios,
+        'columnas': agrupado.size().index.to_frame(index=False),
+        'codigo_columna': agrupado.ngroup().to_numpy(dtype=np.intp),
+    }
+
+
+def pagina_cruzada(largo, estructura, rows, cols, valores, pagina_filas, tamanio_filas,
+                   pagina_columnas=1, tamanio_columnas=COLUMNAS_POR_PAGINA):
+    """
+    Pasa a formato ancho sólo una página de filas y de columnas de la tabla cruzada.
+
+    Parámetros:
+        largo (pd.DataFrame): resultado de tabla_cruzada.
+        estructura (dict): resultado de estructura_cruzada.
+        rows, cols (list): columnas para filas y para columnas.
+        valores (list): columnas de valores, en el orden de la tabla larga.
+        pagina_filas, pagina_columnas (int): números de página, empezando en 1.
+        tamanio_filas, tamanio_columnas (int): filas y claves de columna por página.
+
+    Retorna:
+        pd.DataFrame: como pd.pivot_table(..., columns=cols, fill_value=0), con las filas
+        como índice y columnas (valor, clave de columna) para la página.
+    """
+    rows, cols = list(rows), list(cols)
+    inicios = estructura['inicios']
+    desde_fila = (pagina_filas - 1) * tamanio_filas
+    hasta_fila = min(desde_fila + tamanio_filas, len(inicios) - 1)
+    desde_col = (pagina_columnas - 1) * tamanio_columnas
+    claves_columna = estructura['columnas'].iloc[desde_col:desde_col + tamanio_columnas]
+
+    celdas = slice(inicios[desde_fila], inicios[hasta_fila]) if hasta_fila > desde_fila else slice(0, 0)
+    codigos = estructura['codigo_columna'][celdas]
+    en_pagina = (codigos >= desde_col) & (codigos < desde_col + tamanio_columnas)
+    parte = largo.iloc[celdas][en_pagina]
+
+    claves_fila = largo.iloc[inicios[desde_fila:hasta_fila]][rows]
+    indice_filas = pd.MultiIndex.from_frame(claves_fila) if len(rows) > 1 else pd.Index(claves_fila[rows[0]])
+    indice_columnas = (pd.MultiIndex.from_frame(claves_columna) if len(cols) > 1
+                       else pd.Index(claves_columna[cols[0]]))
+
+    ancho = parte.set_index(rows + cols)[list(valores)].unstack(cols) if len(parte) else None
+    columnas = pd.MultiIndex.from_tuples(
+        [(valor, *(clave if isinstance(clave, tuple) else (clave,))) for valor in valores for clave in indice_columnas],
+        names=[None] + cols)
+    if ancho is None:
+        ancho = pd.DataFrame(0, index=indice_filas, columns=columnas)
+    # Las celdas vacías agregan NaN al pasar a ancho; se vuelve al tipo de cada valor
+    return ancho.reindex(index=indice_filas, columns=columnas).fillna(0).astype(
+        {columna: largo[columna[0]].dtype for columna in columnas})
@@ -0,0 +1,248 @@
+from functools import reduce
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.acero as ac
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from src.cache import DIRECTORIO_DISCO, descartar_antiguos_disco, marcar_uso
+from src.lectura import detectar_delimitador
+from src.pivot import FUNCIONES_AGREGACION, PARCIALES
+
+# -------------------------------------------------------------------------------
+# MODO FUERA DE MEMORIA
+# -------------------------------------------------------------------------------
+# Para archivos que no entran en memoria como DataFrame, el CSV se convierte por bloques a
+# un archivo Parquet en disco, y los filtros y la tabla dinámica se ejecutan con pyarrow
+# (Acero) recorriendo el archivo por lotes. Sólo el resultado agregado pasa a pandas.
+
+DIRECTORIO_DATASETS = DIRECTORIO_DISCO / "datasets"
+# Al superarlo se borran las conversiones usadas hace más tiempo (cada rerun marca la que usa)
+PRESUPUESTO_DATASETS = 10 * 1024 ** 3  # 10 GB
+
+# Bytes de CSV por bloque de lectura (los tipos de las columnas se infieren del primero)
+TAMANIO_BLOQUE = 16 * 1024 * 1024
+
+# Opciones de los agregados por grupo, para que coincidan con pandas
+_OPCIONES_AGREGADO = {
+    "sum": pc.ScalarAggregateOptions(min_count=0),
+    "count": pc.CountOptions(mode="only_valid"),
+    "min": pc.ScalarAggregateOptions(min_count=1),
+    "max": pc.ScalarAggregateOptions(min_count=1),
+}
+
+
+def convertir_a_parquet(archivo, hash_contenido):
+    """
+    Convierte un CSV subido a Parquet en disco, leyendo y escribiendo de a un bloque.
+    Si el mismo contenido ya fue convertido, reutiliza el archivo existente (y lo marca
+    como recién usado).
+
+    Parámetros:
+        archivo: archivo binario del CSV (por ejemplo, el UploadedFile de Streamlit).
+        hash_contenido (str): hash del contenido, usado como nombre del archivo Parquet.
+
+    Retorna:
+        Path: ruta del archivo Parquet.
+
+    Lanza:
+        ValueError: si el CSV no se puede convertir (por ejemplo, si una columna cambia de
+        tipo después del primer bloque).
+    """
+    destino = DIRECTORIO_DATASETS / f"{hash_contenido}.parquet"
+    if destino.exists():
+        marcar_uso(destino)
+        return destino
+    DIRECTORIO_DATASETS.mkdir(parents=True, exist_ok=True)
+
+    delimitador = detectar_delimitador(archivo)
+    temporal = destino.with_suffix(".tmp")
+    try:
+        lector = pa_csv.open_csv(
+            archivo,
+            read_options=pa_csv.ReadOptions(block_size=TAMANIO_BLOQUE),
+            # Las líneas mal formadas se descartan, como en la lectura en memoria
+            parse_options=pa_csv.ParseOptions(delimiter=delimitador, invalid_row_handler=lambda fila: "skip"),
+            # Los campos vacíos son nulos también en columnas de texto, como en pandas
+            convert_options=pa_csv.ConvertOptions(strings_can_be_null=True),
+        )
+        with pq.ParquetWriter(temporal, lector.schema) as escritor:
+            for lote in lector:
+                escritor.write_batch(lote)
+    except pa.ArrowException as e:
+        temporal.unlink(missing_ok=True)
+        raise ValueError(f"No se pudo convertir el archivo a Parquet: {e}")
+
+    temporal.replace(destino)
+    descartar_antiguos_disco(DIRECTORIO_DATASETS, PRESUPUESTO_DATASETS, conservar=destino)
+    return destino
+
+
+def esquema(ruta):
+    """
+    Devuelve el esquema (columnas y tipos) del archivo Parquet.
+    """
+    return ds.dataset(ruta, format="parquet").schema
+
+
+def _valor_arrow(tipo, valor):
+    """
+    Convierte un valor del filtro al tipo de la columna de Arrow.
+    """
+    if pa.types.is_timestamp(tipo) or pa.types.is_date(tipo):
+        return pa.scalar(pd.Timestamp(valor).to_pydatetime()).cast(tipo)
+    if pa.types.is_boolean(tipo):
+        return valor.lower() in ("true", "1")
+    if pa.types.is_integer(tipo) or pa.types.is_floating(tipo) or pa.types.is_decimal(tipo):
+        try:
+            return float(valor)
+        except ValueError:
+            raise ValueError(f"'{valor}' no es un número válido.")
+    return valor
+
+
+def expresion_arrow(arbol, esquema_datos):
+    """
+    Traduce un árbol de src/filtros.py a una expresión de pyarrow.dataset, con el mismo
+    resultado que evaluar_filtro en memoria (también con NOT sobre valores nulos).
+
+    Parámetros:
+        arbol (tuple): resultado de compilar_filtro.
+        esquema_datos (pa.Schema): esquema del archivo.
+
+    Retorna:
+        pyarrow.dataset.Expression
+
+    Lanza:
+        ValueError: si una columna no existe o un valor no corresponde al tipo.
+    """
+    tipo_nodo = arbol[0]
+    if tipo_nodo == "not":
+        return ~expresion_arrow(arbol[1], esquema_datos)
+    if tipo_nodo in ("and", "or"):
+        expresiones = [expresion_arrow(nodo, esquema_datos) for nodo in arbol[1]]
+        return reduce((lambda a, b: a & b) if tipo_nodo == "and" else (lambda a, b: a | b), expresiones)
+
+    # Como en src/filtros.py, un predicado sobre un nulo es falso (no nulo), así NOT lo
+    # vuelve verdadero igual que la máscara en memoria
+    return pc.coalesce(_predicado_arrow(*arbol[1:], esquema_datos), pa.scalar(False))
+
+
+def _predicado_arrow(columna, operador, valores, esquema_datos):
+    """
+    Expresión de un único predicado. Da nulo en las filas con la columna nula.
+    """
+    if columna not in esquema_datos.names:
+        raise ValueError(f"La columna '{columna}' no existe.")
+    tipo = esquema_datos.field(columna).type
+    campo = pc.field(columna)
+
+    es_texto = not (pa.types.is_integer(tipo) or pa.types.is_floating(tipo) or pa.types.is_decimal(tipo)
+                    or pa.types.is_temporal(tipo) or pa.types.is_boolean(tipo))
+    if operador == "contains" or (operador == "igual_o_contiene" and es_texto):
+        return pc.match_substring(campo.cast(pa.string()), valores[0], ignore_case=True)
+
+    convertidos = [_valor_arrow(tipo, valor) for valor in valores]
+    if operador == "in":
+        return campo.isin(convertidos)
+    if operador == "between":
+        return (campo >= convertidos[0]) & (campo <= convertidos[1])
+
+    comparaciones = {
+        ">": lambda v: campo > v, "<": lambda v: campo < v, ">=": lambda v: campo >= v,
+        "<=": lambda v: campo <= v, "==": lambda v: campo == v, "igual_o_contiene": lambda v: campo == v,
+        "!=": lambda v: campo != v,
+    }
+    return comparaciones[operador](convertidos[0])
+
+
+def _filtro(esquema_datos, arbol, no_nulos=()):
+    """
+    Combina el filtro del usuario con la condición de no nulo en las columnas indicadas.
+    """
+    condiciones = [pc.field(col).is_valid() for col in no_nulos]
+    if arbol is not None:
+        condiciones.append(expresion_arrow(arbol, esquema_datos))
+    return reduce(lambda a, b: a & b, condiciones) if condiciones else None
+
+
+def contar_filas(ruta, arbol=None):
+    """
+    Cantidad de filas del archivo que cumplen el filtro.
+    """
+    dataset = ds.dataset(ruta, format="parquet")
+    return dataset.count_rows(filter=_filtro(dataset.schema, arbol))
+
+
+def vista_previa(ruta, columnas, arbol=None, filas=100):
+    """
+    Devuelve las primeras filas que cumplen el filtro, sin leer el resto del archivo.
+    """
+    dataset = ds.dataset(ruta, format="parquet")
+    return dataset.scanner(columns=list(columnas), filter=_filtro(dataset.schema, arbol)).head(filas).to_pandas()
+
+
+def tabla_dinamica_disco(ruta, rows, agg_dict, arbol=None):
+    """
+    Tabla dinámica equivalente a src/pivot.tabla_dinamica, calculada con Acero sobre el
+    archivo Parquet: el archivo se recorre por lotes y sólo se mantienen en memoria los
+    agregados parciales de cada grupo.
+
+    Parámetros:
+        ruta (Path): archivo Parquet.
+        rows (list): columnas para filas.
+        agg_dict (dict): columna de valores -> función de agregación.
+        arbol (tuple): filtro compilado con src/filtros.compilar_filtro, o None.
+
+    Retorna:
+        pd.DataFrame: columnas de filas seguidas de las columnas de valores (en orden
+        alfabético), con 0 en lugar de los valores faltantes.
+
+    Lanza:
+        ValueError: si una columna de valores también está en filas, la función no existe
+        o el filtro no es válido.
+    """
+    rows = list(rows)
+    repetidas = [col for col in agg_dict if col in rows]
+    if repetidas:
+        raise ValueError(f"Las columnas {repetidas} no pueden estar en filas y en valores a la vez.")
+
+    parciales = []
+    for col, funcion in agg_dict.items():
+        # Las funciones aproximadas usan resúmenes que sólo calcula src/pivot.py
+        if funcion not in FUNCIONES_AGREGACION:
+            raise ValueError(f"Función de agregación no soportada: '{funcion}'.")
+        parciales += [(col, estadistico) for estadistico in PARCIALES[funcion] if (col, estadistico) not in parciales]
+
+    dataset = ds.dataset(ruta, format="parquet")
+    # Como pivot_table, se descartan las filas con nulos en las columnas de filas
+    filtro = _filtro(dataset.schema, arbol, no_nulos=rows)
+    columnas = rows + list(dict.fromkeys(col for col, _ in parciales))
+
+    plan = [ac.Declaration("scan", ac.ScanNodeOptions(dataset, columns=columnas, filter=filtro))]
+    if filtro is not None:
+        plan.append(ac.Declaration("filter", ac.FilterNodeOptions(filtro)))
+    plan.append(ac.Declaration("aggregate", ac.AggregateNodeOptions(
+        [(col, f"hash_{estadistico}", _OPCIONES_AGREGADO[estadistico], f"{col}|{estadistico}")
+         for col, estadistico in parciales],
+        keys=rows)))
+    agregado = ac.Declaration.from_sequence(plan).to_table(use_threads=True).to_pandas()
+
+    agregado = agregado.sort_values(rows, ignore_index=True)
+    valores = {}
+    for col, funcion in agg_dict.items():
+        if funcion == "mean":
+            conteo = agregado[f"{col}|count"]
+            valores[col] = agregado[f"{col}|sum"] / conteo.where(conteo > 0)
+        else:
+            valores[col] = agregado[f"{col}|{funcion}"]
+
+    resultado = pd.DataFrame(valores, index=agregado.index)
+    if len(resultado.columns):
+        resultado = resultado.sort_index(axis=1).dropna(how="all")
+
+    return pd.concat([agregado.loc[resultado.index, rows].reset_index(drop=True),
+                      resultado.reset_index(drop=True).fillna(0)], axis=1)
@@ -0,0 +1,294 @@
+import io
+import json
+from pathlib import Path
+
+from src.cache import hash_archivo, hash_ruta
+from src.catalogo import EXTENSIONES_PICKLE, cargar_dataset
+from src.compactacion import compactar
+from src.cruzada import estructura_cruzada, pagina_cruzada, tabla_cruzada
+from src.disco import convertir_a_parquet, tabla_dinamica_disco
+from src.filtros import compilar_filtro, mascara_filtro
+from src.lectura import EXTENSIONES_EXCEL, MOTORES_CSV, leer_archivo
+from src.pivot import PARCIALES, tabla_dinamica
+from src.union import planificar_union, unir_archivos
+
+# -------------------------------------------------------------------------------
+# ESPECIFICACIÓN DE UNA TABLA DINÁMICA (PARA EJECUTAR SIN STREAMLIT)
+# -------------------------------------------------------------------------------
+# La app puede exportar su estado (archivos, filtro, filas, columnas y valores) como una
+# especificación JSON o YAML, y cli.py la ejecuta con la misma lógica de lectura, unión,
+# filtro y tabla dinámica. Ejemplo:
+#
+#   {
+#     "archivos": [{"ruta": "personas.csv"}, {"ruta": "ventas.xlsx", "hojas": ["Orders"]}],
+#     "motor_csv": "pyarrow",
+#     "claves_union": ["id"],
+#     "filtro": {"columna": "edad", "expresion": ">=18 AND <65"},
+#     "filas": ["provincia"],
+#     "columnas": [],
+#     "valores": {"ingreso": "mean", "id": "count"},
+#     "salida": "resultado.parquet"
+#   }
+#
+# Las rutas relativas se resuelven desde la carpeta de la especificación. Con "columnas",
+# el resultado se escribe en formato largo (una fila por celda con datos), salvo que se
+# indique "formato": "ancho".
+
+VERSION = 1
+EXTENSIONES_SALIDA = (".csv", ".parquet")
+FORMATOS = ("largo", "ancho")
+
+
+def crear_especificacion(archivos, filas, valores, columnas=(), filtro_columna=None, filtro=None,
+                         motor_csv="pyarrow", claves_union=None, permitir_muchos_a_muchos=False,
+                         fuera_de_memoria=False, salida=None):
+    """
+    Arma una especificación a partir del estado de la app.
+
+    Parámetros:
+        archivos (list): dicts {'ruta': nombre del archivo, 'hojas': [...] (sólo Excel)}.
+        filas, columnas (list): columnas para filas y para columnas.
+        valores (dict): columna de valores -> función de agregación.
+        filtro_columna (str): columna por defecto del filtro, o None.
+        filtro (str): expresión del filtro de la tabla, o None.
+        motor_csv (str): uno de MOTORES_CSV.
+        claves_union (list): columnas comunes usadas para unir, o None.
+        permitir_muchos_a_muchos (bool): si se confirmó una unión muchos a muchos.
+        fuera_de_memoria (bool): usar el modo fuera de memoria (un único CSV).
+        salida (str): archivo de salida (.csv o .parquet), o None.
+
+    Retorna:
+        dict: la especificación, lista para json.dumps o yaml.safe_dump.
+    """
+    especificacion = {
+        'version': VERSION,
+        'archivos': [dict(archivo) for archivo in archivos],
+        'motor_csv': motor_csv,
+        'claves_union': list(claves_union) if claves_union else None,
+        'permitir_muchos_a_muchos': bool(permitir_muchos_a_muchos),
+        'filtro': {'columna': filtro_columna, 'expresion': filtro} if filtro else None,
+        'filas': list(filas),
+        'columnas': list(columnas),
+        'valores': dict(valores),
+        'fuera_de_memoria': bool(fuera_de_memoria),
+    }
+    if salida:
+        especificacion['salida'] = salida
+    return especificacion
+
+
+def _modulo_yaml():
+    """
+    Importa pyyaml, que sólo hace falta para las especificaciones YAML.
+    """
+    try:
+        import yaml
+    except ImportError:
+        raise ValueError("Para usar especificaciones YAML hay que instalar pyyaml.")
+    return yaml
+
+
+def a_texto(especificacion, formato="json"):
+    """
+    Serializa la especificación como JSON o YAML.
+
+    Lanza:
+        ValueError: si se pide YAML y pyyaml no está instalado.
+    """
+    if formato == "yaml":
+        yaml = _modulo_yaml()
+        return yaml.safe_dump(especificacion, allow_unicode=True, sort_keys=False)
+    return json.dumps(especificacion, ensure_ascii=False, indent=2)
+
+
+def validar(especificacion):
+    """
+    Completa los valores por defecto y verifica la especificación.
+
+    Retorna:
+        dict: la especificación completa.
+
+    Lanza:
+        ValueError: si falta un dato o alguno no es válido.
+    """
+    if not isinstance(especificacion, dict):
+        raise ValueError("La especificación debe ser un objeto con claves.")
+    especificacion = {
+        'motor_csv': "pyarrow", 'claves_union': None, 'filtro': None, 'columnas': [],
+        'fuera_de_memoria': False, 'formato': "largo", 'permitir_muchos_a_muchos': False,
+        **especificacion,
+    }
+
+    if not especificacion.get('archivos'):
+        raise ValueError("La especificación no indica 'archivos'.")
+    for archivo in especificacion['archivos']:
+        if not isinstance(archivo, dict) or 'ruta' not in archivo:
+            raise ValueError("Cada archivo debe indicar su 'ruta'.")
+    if not especificacion.get('filas') or not especificacion.get('valores'):
+        raise ValueError("La especificación debe indicar 'filas' y 'valores'.")
+    for col, funcion in especificacion['valores'].items():
+        if funcion not in PARCIALES:
+            raise ValueError(f"Función de agregación no soportada para '{col}': '{funcion}'.")
+    if especificacion['motor_csv'] not in MOTORES_CSV:
+        raise ValueError(f"'motor_csv' debe ser uno de {MOTORES_CSV}.")
+    if especificacion['formato'] not in FORMATOS:
+        raise ValueError(f"'formato' debe ser uno de {FORMATOS}.")
+    if especificacion['fuera_de_memoria']:
+        archivos = especificacion['archivos']
+        if len(archivos) > 1 or not archivos[0]['ruta'].endswith(".csv"):
+            raise ValueError("El modo fuera de memoria trabaja con un único archivo CSV.")
+    return especificacion
+
+
+def cargar(ruta):
+    """
+    Lee una especificación JSON (.json) o YAML (.yaml, .yml) y la valida. Las rutas
+    relativas de los archivos y de la salida se resuelven desde la carpeta de la especificación.
+
+    Lanza:
+        ValueError: si el archivo no es una especificación válida.
+    """
+    ruta = Path(ruta)
+    texto = ruta.read_text(encoding="utf-8")
+    if ruta.suffix in (".yaml", ".yml"):
+        especificacion = _modulo_yaml().safe_load(texto)
+    else:
+        especificacion = json.loads(texto)
+
+    especificacion = validar(especificacion)
+    for archivo in especificacion['archivos']:
+        archivo['ruta'] = str(ruta.parent / archivo['ruta'])
+    if especificacion.get('salida'):
+        especificacion['salida'] = str(ruta.parent / especificacion['salida'])
+    return especificacion
+
+
+def hashes_entradas(especificacion, subidos=None):
+    """
+    Hash del contenido de cada archivo de la especificación, en su orden.
+
+    Parámetros:
+        especificacion (dict): especificación validada.
+        subidos (dict): nombre -> archivo subido, para usar en lugar de las rutas del disco.
+
+    Retorna:
+        list: un hash hexadecimal por archivo.
+    """
+    subidos = subidos or {}
+    return [hash_archivo(subidos[archivo['ruta']]) if archivo['ruta'] in subidos else hash_ruta(archivo['ruta'])
+            for archivo in especificacion['archivos']]
+
+
+def _leer_entradas(especificacion, subidos=None):
+    """
+    Lee los archivos de la especificación. Los CSV se leen desde el disco (pyarrow los
+    recorre por bloques); los Excel pasan por la caché Parquet de src/lectura.py y los
+    pickles por la del catálogo (src/catalogo.py).
+
+    Retorna:
+        list: un DataFrame por archivo CSV o por hoja de Excel.
+    """
+    subidos = subidos or {}
+    dfs = []
+    for archivo in especificacion['archivos']:
+        ruta = archivo['ruta']
+        if ruta in subidos:
+            contenido = subidos[ruta]
+            for hoja in (archivo.get('hojas') or [0]) if ruta.endswith(EXTENSIONES_EXCEL) else [0]:
+                dfs.append(leer_archivo(contenido, especificacion['motor_csv'], hoja, hash_archivo(contenido)))
+        elif ruta.endswith(EXTENSIONES_EXCEL):
+            contenido = io.BytesIO(Path(ruta).read_bytes())
+            contenido.name = ruta
+            for hoja in archivo.get('hojas') or [0]:
+                dfs.append(leer_archivo(contenido, especificacion['motor_csv'], hoja, hash_archivo(contenido)))
+        elif ruta.endswith(EXTENSIONES_PICKLE):
+            dfs.append(cargar_dataset(ruta))
+        else:
+            with open(ruta, "rb") as contenido:
+                dfs.append(leer_archivo(contenido, especificacion['motor_csv']))
+    return dfs
+
+
+def _ejecutar_fuera_de_memoria(especificacion, arbol, subidos=None):
+    """
+    Tabla dinámica de un único CSV convertido a Parquet en disco (src/disco.py).
+    """
+    ruta = especificacion['archivos'][0]['ruta']
+    if subidos and ruta in subidos:
+        parquet = convertir_a_parquet(subidos[ruta], hash_archivo(subidos[ruta]))
+    else:
+        with open(ruta, "rb") as archivo:
+            parquet = convertir_a_parquet(archivo, hash_ruta(ruta))
+    # La tabla de filas + columnas es la tabla cruzada en formato largo
+    return tabla_dinamica_disco(parquet, especificacion['filas'] + especificacion['columnas'],
+                                especificacion['valores'], arbol)
+
+
+def ejecutar(especificacion, subidos=None):
+    """
+    Ejecuta la especificación: lee y une los archivos, aplica el filtro y arma la tabla.
+
+    Parámetros:
+        especificacion (dict): resultado de cargar o validar.
+        subidos (dict): nombre -> archivo subido, para usar en lugar de las rutas del disco.
+
+    Retorna:
+        pd.DataFrame: la tabla dinámica (con columnas, en el formato indicado).
+
+    Lanza:
+        ValueError: si los archivos no se pueden unir como indica la especificación o el
+        filtro o la tabla no son válidos.
+    """
+    filas, columnas, valores = especificacion['filas'], especificacion['columnas'], especificacion['valores']
+    filtro = especificacion['filtro'] or {}
+
+    if especificacion['fuera_de_memoria']:
+        largo = _ejecutar_fuera_de_memoria(
+            especificacion, compilar_filtro(filtro.get('expresion'), filtro.get('columna')), subidos)
+    else:
+        dfs = _leer_entradas(especificacion, subidos)
+        plan = None
+        if len(dfs) > 1:
+            plan = planificar_union(dfs)
+            claves = especificacion['claves_union']
+            if claves is not None and list(plan['columnas']) != list(claves):
+                raise ValueError(f"Las columnas comunes de los archivos ({plan['columnas']}) no coinciden "
+                                 f"con 'claves_union' ({claves}).")
+            if plan['muchos_a_muchos'] and not especificacion['permitir_muchos_a_muchos']:
+                raise ValueError(f"La unión es muchos a muchos (≈{plan['filas_estimadas']:,} filas). "
+                                 "Indicá \"permitir_muchos_a_muchos\": true para unir de todas formas.")
+        df, _ = compactar(unir_archivos(dfs, plan)[0])
+
+        # Los mismos archivos (por contenido), hojas y motor dan los mismos datos unidos, así
+        # que pueden compartir los parciales de la caché entre ejecuciones
+        hojas = tuple(tuple(archivo.get('hojas') or ()) for archivo in especificacion['archivos'])
+        clave_datos = ("lote", *hashes_entradas(especificacion, subidos), hojas, especificacion['motor_csv'])
+        mascara, clave_filtro = mascara_filtro(df, filtro.get('expresion'), filtro.get('columna'), clave_datos)
+        if not columnas:
+            return tabla_dinamica(df, filas, valores, clave_datos, mascara, clave_filtro)
+        largo = tabla_cruzada(df, filas, columnas, valores, clave_datos, mascara, clave_filtro)
+
+    if not columnas or especificacion['formato'] == "largo":
+        return largo
+    estructura = estructura_cruzada(largo, filas, columnas)
+    ancho = pagina_cruzada(largo, estructura, filas, columnas, sorted(valores), 1, max(len(largo), 1),
+                           1, max(len(estructura['columnas']), 1))
+    # Las claves de columna quedan como "valor|clave1|clave2" para poder escribir CSV y Parquet
+    ancho.columns = ["|".join(str(parte) for parte in columna) for columna in ancho.columns]
+    return ancho.reset_index()
+
+
+def guardar(df, ruta):
+    """
+    Escribe el resultado como CSV (UTF-8, sin índice) o Parquet según la extensión.
+
+    Lanza:
+        ValueError: si la extensión no es .csv ni .parquet.
+    """
+    ruta = Path(ruta)
+    if ruta.suffix not in EXTENSIONES_SALIDA:
+        raise ValueError(f"Formato de salida no soportado: '{ruta.suffix}'. Usá .csv o .parquet.")
+    if ruta.suffix == ".parquet":
+        df.to_parquet(ruta, index=False)
+    else:
+        df.to_csv(ruta, index=False)
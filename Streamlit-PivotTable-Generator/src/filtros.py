@@ -0,0 +1,293 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from src import cache
+from src.indice_texto import buscar, construir_indice
+
+# -------------------------------------------------------------------------------
+# LENGUAJE DE FILTROS
+# -------------------------------------------------------------------------------
+# Un filtro es una expresión que se compila a un árbol de predicados y se evalúa como
+# máscara booleana vectorizada. Cada predicado se guarda en la caché por separado, así al
+# editar un predicado sólo se recalcula ese y el resto se combina con & | ~.
+#
+# Sintaxis (las palabras clave no distinguen mayúsculas):
+#   >30                         comparación sobre la columna seleccionada (> < >= <= == = !=)
+#   >=18 AND <65                AND, OR, NOT y paréntesis
+#   [Edad] > 30 OR [Sexo] = 'F' otras columnas entre corchetes
+#   IN (1, 2, 3)                lista de valores
+#   BETWEEN 2024-01-01 AND 2024-03-31   rango inclusivo (números o fechas AAAA-MM-DD)
+#   CONTAINS 'texto'            texto parcial, sin distinguir mayúsculas (usa src/indice_texto.py)
+#   Buenos Aires                sin operador: texto parcial (o igualdad en columnas numéricas)
+#
+# Un valor nulo no cumple ningún predicado, y NOT niega el resultado: la fila con [Edad]
+# nula no cumple [Edad] > 30 y sí cumple NOT [Edad] > 30 (igual en src/disco.py).
+
+AYUDA_FILTROS = (
+    "Ej: >30 · >=18 AND <65 · IN (1, 2, 3) · BETWEEN 2024-01-01 AND 2024-03-31 · "
+    "texto parcial · [otra columna] = 'valor' OR NOT [col] CONTAINS 'x'"
+)
+
+PALABRAS_CLAVE = {"AND", "OR", "NOT", "IN", "BETWEEN", "CONTAINS"}
+
+_TOKENS = re.compile(r"""
+    \s*(?:
+        \[(?P<columna>[^\]]+)\]
+      | '(?P<texto1>[^']*)'
+      | "(?P<texto2>[^"]*)"
+      | (?P<operador>>=|<=|!=|==|=|>|<)
+      | (?P<simbolo>[(),])
+      | (?P<palabra>[^\s()\[\],<>=!'"]+)
+    )""", re.VERBOSE)
+
+_FECHA = re.compile(r"^\d{4}-\d{2}-\d{2}([ T]\d{2}:\d{2}(:\d{2})?)?$")
+
+
+def _tokenizar(expresion):
+    """
+    Divide la expresión en tokens (tipo, valor). Los textos entre comillas quedan como 'valor'.
+    """
+    tokens = []
+    posicion = 0
+    expresion = expresion.strip()
+    while posicion < len(expresion):
+        m = _TOKENS.match(expresion, posicion)
+        if not m or m.end() == posicion:
+            raise ValueError(f"Carácter inesperado en el filtro: '{expresion[posicion:].strip()[:10]}'")
+        posicion = m.end()
+        if m.group("columna") is not None:
+            tokens.append(("columna", m.group("columna").strip()))
+        elif m.group("texto1") is not None or m.group("texto2") is not None:
+            tokens.append(("valor", m.group("texto1") if m.group("texto1") is not None else m.group("texto2")))
+        elif m.group("operador"):
+            tokens.append(("operador", "==" if m.group("operador") == "=" else m.group("operador")))
+        elif m.group("simbolo"):
+            tokens.append((m.group("simbolo"), m.group("simbolo")))
+        elif m.group("palabra").upper() in PALABRAS_CLAVE:
+            tokens.append((m.group("palabra").upper(), m.group("palabra")))
+        else:
+            tokens.append(("palabra", m.group("palabra")))
+    return tokens
+
+
+class _Parser:
+    """
+    Parser descendente recursivo del lenguaje de filtros.
+    """
+
+    def __init__(self, tokens, columna_defecto):
+        self.tokens = tokens
+        self.posicion = 0
+        self.columna_defecto = columna_defecto
+
+    def actual(self):
+        return self.tokens[self.posicion][0] if self.posicion < len(self.tokens) else None
+
+    def consumir(self, tipo=None):
+        if self.actual() is None or (tipo is not None and self.actual() != tipo):
+            esperado = f"'{tipo}'" if tipo else "un valor"
+            raise ValueError(f"Filtro incompleto: se esperaba {esperado}.")
+        token = self.tokens[self.posicion]
+        self.posicion += 1
+        return token[1]
+
+    def expresion(self):
+        nodos = [self.conjuncion()]
+        while self.actual() == "OR":
+            self.consumir()
+            nodos.append(self.conjuncion())
+        return nodos[0] if len(nodos) == 1 else ("or", tuple(nodos))
+
+    def conjuncion(self):
+        nodos = [self.termino()]
+        while self.actual() == "AND":
+            self.consumir()
+            nodos.append(self.termino())
+        return nodos[0] if len(nodos) == 1 else ("and", tuple(nodos))
+
+    def termino(self):
+        if self.actual() == "NOT":
+            self.consumir()
+            return ("not", self.termino())
+        if self.actual() == "(":
+            self.consumir()
+            nodo = self.expresion()
+            self.consumir(")")
+            return nodo
+        return self.predicado()
+
+    def valor(self):
+        if self.actual() not in ("valor", "palabra"):
+            raise ValueError("Filtro incompleto: se esperaba un valor.")
+        return self.consumir()
+
+    def predicado(self):
+        columna = self.consumir() if self.actual() == "columna" else self.columna_defecto
+        if columna is None:
+            raise ValueError("Indicá la columna entre corchetes, por ejemplo: [Edad] > 30.")
+
+        tipo = self.actual()
+        if tipo == "operador":
+            operador = self.consumir()
+            return ("predicado", columna, operador, (self.valor(),))
+        if tipo == "IN":
+            self.consumir()
+            self.consumir("(")
+            valores = [self.valor()]
+            while self.actual() == ",":
+                self.consumir()
+                valores.append(self.valor())
+            self.consumir(")")
+            return ("predicado", columna, "in", tuple(valores))
+        if tipo == "BETWEEN":
+            self.consumir()
+            desde = self.valor()
+            self.consumir("AND")
+            return ("predicado", columna, "between", (desde, self.valor()))
+        if tipo == "CONTAINS":
+            self.consumir()
+            return ("predicado", columna, "contains", (self.valor(),))
+
+        # Sin operador: todas las palabras seguidas forman un único valor
+        palabras = [self.valor()]
+        while self.actual() in ("valor", "palabra"):
+            palabras.append(self.consumir())
+        return ("predicado", columna, "igual_o_contiene", (" ".join(palabras),))
+
+
+def compilar_filtro(expresion, columna_defecto=None):
+    """
+    Compila una expresión de filtro a un árbol de tuplas (hashable, se usa como clave de caché).
+
+    Parámetros:
+        expresion (str): el filtro ingresado.
+        columna_defecto (str): columna de los predicados que no indican columna.
+
+    Retorna:
+        tuple: el árbol del filtro, o None si la expresión está vacía.
+
+    Lanza:
+        ValueError: si la expresión no es válida.
+    """
+    tokens = _tokenizar(expresion or "")
+    if not tokens:
+        return None
+    parser = _Parser(tokens, columna_defecto)
+    arbol = parser.expresion()
+    if parser.actual() is not None:
+        raise ValueError(f"Filtro inválido cerca de '{parser.tokens[parser.posicion][1]}'.")
+    return arbol
+
+
+def _convertir(serie, valor):
+    """
+    Convierte un valor del filtro al tipo de la columna (número o fecha). En columnas de
+    texto se compara como texto.
+    """
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return pd.Timestamp(valor)
+    if pd.api.types.is_bool_dtype(serie):
+        if valor.lower() not in ("true", "false", "1", "0"):
+            raise ValueError(f"'{valor}' no es un valor válido para la columna booleana '{serie.name}'.")
+        return valor.lower() in ("true", "1")
+    if pd.api.types.is_numeric_dtype(serie):
+        try:
+            return float(valor)
+        except ValueError:
+            raise ValueError(f"'{valor}' no es un número válido para la columna '{serie.name}'.")
+    return valor
+
+
+def _columna_texto(df, columna, clave_datos):
+    """
+    Devuelve la columna convertida a texto (se convierte una sola vez, queda en la caché).
+    """
+    return cache.cacheado(("columna_texto", clave_datos, columna), lambda: df[columna].astype(str))
+
+
+def _columna_comparable(df, columna, valores, clave_datos):
+    """
+    Devuelve la columna a comparar. Una columna de texto comparada con fechas se convierte a
+    fecha (una sola vez, queda en la caché); el resto de las columnas de texto se comparan
+    como texto.
+    """
+    serie = df[columna]
+    if pd.api.types.is_numeric_dtype(serie) or pd.api.types.is_datetime64_any_dtype(serie):
+        return serie
+    if all(_FECHA.match(valor) for valor in valores):
+        return cache.cacheado(("columna_fecha", clave_datos, columna),
+                              lambda: pd.to_datetime(serie, errors="coerce", format="mixed"))
+    return _columna_texto(df, columna, clave_datos)
+
+
+def _evaluar_predicado(df, columna, operador, valores, clave_datos):
+    """
+    Calcula la máscara de un único predicado. Los valores nulos no cumplen ninguna
+    comparación.
+    """
+    if columna not in df.columns:
+        raise ValueError(f"La columna '{columna}' no existe.")
+    serie = df[columna]
+
+    es_texto = not (pd.api.types.is_numeric_dtype(serie) or pd.api.types.is_datetime64_any_dtype(serie))
+    if operador == "contains" or (operador == "igual_o_contiene" and es_texto):
+        # Índice de texto de la columna, armado la primera vez que se busca en ella
+        indice = cache.cacheado(("indice_texto", clave_datos, columna), construir_indice, serie)
+        return buscar(indice, valores[0]) & serie.notna().to_numpy()
+
+    comparable = _columna_comparable(df, columna, valores, clave_datos)
+    convertidos = [_convertir(comparable, valor) for valor in valores]
+
+    if operador == "in":
+        mascara = comparable.isin(convertidos)
+    elif operador == "between":
+        mascara = comparable.between(convertidos[0], convertidos[1])
+    else:
+        comparaciones = {
+            ">": comparable.gt, "<": comparable.lt, ">=": comparable.ge, "<=": comparable.le,
+            "==": comparable.eq, "igual_o_contiene": comparable.eq, "!=": comparable.ne,
+        }
+        mascara = comparaciones[operador](convertidos[0])
+
+    return (mascara & serie.notna()).fillna(False).to_numpy(dtype=bool)
+
+
+def evaluar_filtro(df, arbol, clave_datos):
+    """
+    Evalúa un árbol de filtro sobre el DataFrame.
+
+    Parámetros:
+        df (pd.DataFrame): datos a filtrar. No se modifica.
+        arbol (tuple): resultado de compilar_filtro.
+        clave_datos: clave que identifica a df en la caché.
+
+    Retorna:
+        np.ndarray: máscara booleana de las filas que cumplen el filtro.
+    """
+    tipo = arbol[0]
+    if tipo == "predicado":
+        return cache.cacheado(("predicado", clave_datos, arbol), _evaluar_predicado, df, *arbol[1:], clave_datos)
+    if tipo == "not":
+        return ~evaluar_filtro(df, arbol[1], clave_datos)
+
+    mascaras = [evaluar_filtro(df, nodo, clave_datos) for nodo in arbol[1]]
+    combinar = np.logical_and if tipo == "and" else np.logical_or
+    return combinar.reduce(mascaras)
+
+
+def mascara_filtro(df, expresion, columna_defecto, clave_datos):
+    """
+    Compila y evalúa una expresión de filtro.
+
+    Retorna:
+        tuple: (máscara booleana o None si no hay filtro, árbol del filtro como clave)
+
+    Lanza:
+        ValueError: si la expresión no es válida.
+    """
+    arbol = compilar_filtro(expresion, columna_defecto)
+    if arbol is None:
+        return None, None
+    return evaluar_filtro(df, arbol, clave_datos), arbol
@@ -0,0 +1,102 @@
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+# -------------------------------------------------------------------------------
+# ÍNDICE DE BÚSQUEDA DE TEXTO PARCIAL
+# -------------------------------------------------------------------------------
+# Para buscar texto parcial sin recorrer toda la columna en cada búsqueda, cada columna se
+# indexa una vez:
+#   - diccionario: valores distintos de la columna, como texto en minúsculas,
+#   - codigos: para cada fila, la posición de su valor en el diccionario,
+#   - trigramas: para cada secuencia de 3 caracteres, las posiciones del diccionario que
+#     la contienen.
+# Una búsqueda sólo revisa las entradas candidatas del diccionario y después marca las
+# filas con un indexado de NumPy.
+
+LARGO_TRIGRAMA = 3
+
+
+def construir_indice(serie):
+    """
+    Arma el índice de una columna.
+
+    Parámetros:
+        serie (pd.Series): columna a indexar. Los nulos se tratan igual que con astype(str).
+
+    Retorna:
+        dict: {'codigos': np.ndarray, 'diccionario': np.ndarray de str, 'trigramas': dict}
+    """
+    codigos, unicos = pd.factorize(serie, use_na_sentinel=False)
+
+    # Valores distintos que sólo difieren en mayúsculas comparten la entrada del diccionario.
+    # Si astype(str) conserva los nulos, quedan con código -1 y no coinciden con ningún texto.
+    minusculas = pd.Index(unicos).astype(str).str.lower()
+    recodificacion, diccionario = pd.factorize(minusculas)
+
+    return {
+        'codigos': recodificacion[codigos].astype(np.int32),
+        'diccionario': np.asarray(diccionario, dtype=object),
+        'trigramas': _construir_trigramas(diccionario)
+    }
+
+
+def _construir_trigramas(diccionario):
+    """
+    Arma las listas de posiciones del diccionario por trigrama.
+    """
+    listas = defaultdict(list)
+    for posicion, texto in enumerate(diccionario):
+        for trigrama in {texto[i:i + LARGO_TRIGRAMA] for i in range(len(texto) - LARGO_TRIGRAMA + 1)}:
+            listas[trigrama].append(posicion)
+    return {trigrama: np.array(posiciones, dtype=np.int32) for trigrama, posiciones in listas.items()}
+
+
+def _candidatos(indice, texto):
+    """
+    Devuelve las posiciones del diccionario que pueden contener el texto: la intersección
+    de las listas de sus trigramas, empezando por la más corta. None si el texto es corto
+    y hay que revisar todo el diccionario.
+    """
+    if len(texto) < LARGO_TRIGRAMA:
+        return None
+
+    trigramas = {texto[i:i + LARGO_TRIGRAMA] for i in range(len(texto) - LARGO_TRIGRAMA + 1)}
+    listas = sorted((indice['trigramas'].get(trigrama) for trigrama in trigramas),
+                    key=lambda lista: -1 if lista is None else len(lista))
+    if listas[0] is None:
+        return np.empty(0, dtype=np.int32)
+
+    candidatos = listas[0]
+    for lista in listas[1:]:
+        if not len(candidatos):
+            break
+        candidatos = np.intersect1d(candidatos, lista, assume_unique=True)
+    return candidatos
+
+
+def buscar(indice, texto):
+    """
+    Busca un texto parcial (sin distinguir mayúsculas) en la columna indexada.
+
+    Parámetros:
+        indice (dict): resultado de construir_indice.
+        texto (str): texto a buscar.
+
+    Retorna:
+        np.ndarray: máscara booleana de las filas cuyo valor contiene el texto.
+    """
+    texto = texto.lower()
+    diccionario = indice['diccionario']
+    candidatos = _candidatos(indice, texto)
+
+    # La última posición (siempre False) es la de los nulos, con código -1
+    coincide = np.zeros(len(diccionario) + 1, dtype=bool)
+    if candidatos is None:
+        coincide[:-1] = pd.Series(diccionario, dtype=object).str.contains(texto, regex=False).to_numpy()
+    elif len(candidatos):
+        # Los trigramas en común no garantizan el texto completo: se verifica cada candidato
+        coincide[candidatos] = [texto in diccionario[posicion] for posicion in candidatos]
+
+    return coincide[indice['codigos']]
@@ -0,0 +1,215 @@
+import csv
+import io
+import json
+import threading
+
+import pandas as pd
+
+from src.cache import DIRECTORIO_DISCO, descartar_antiguos_disco, marcar_uso
+
+# -------------------------------------------------------------------------------
+# LECTURA DE ARCHIVOS SUBIDOS
+# -------------------------------------------------------------------------------
+# Los archivos se leen directamente del buffer de bytes del upload, sin decodificarlos
+# a texto ni copiarlos, para que la memoria usada sea del orden del tamaño del archivo.
+
+# Cantidad máxima de bytes del comienzo del archivo usados para detectar el delimitador
+TAMANIO_MUESTRA = 64 * 1024
+LINEAS_MUESTRA = 10
+
+# Motores de lectura CSV: pyarrow lee en paralelo con varios hilos, "c" es el de pandas
+MOTORES_CSV = ["pyarrow", "c"]
+
+# Cada hoja de Excel se convierte una vez a Parquet y se guarda acá, por hash de contenido,
+# junto con la lista de hojas del libro. Las copias usadas hace más tiempo se descartan al
+# superar PRESUPUESTO_EXCEL.
+DIRECTORIO_EXCEL = DIRECTORIO_DISCO / "excel"
+PRESUPUESTO_EXCEL = 1024 ** 3  # 1 GB
+EXTENSIONES_EXCEL = (".xlsx", ".xls")
+
+
+def detectar_delimitador(archivo):
+    """
+    Detecta el delimitador de un CSV a partir de las primeras líneas del archivo, leyendo
+    como máximo TAMANIO_MUESTRA bytes. Deja el archivo posicionado al comienzo.
+
+    Parámetros:
+        archivo: archivo binario (por ejemplo, el UploadedFile de Streamlit).
+
+    Retorna:
+        str: el delimitador detectado, o "," si no se pudo detectar.
+    """
+    archivo.seek(0)
+    prefijo = archivo.read(TAMANIO_MUESTRA)
+    archivo.seek(0)
+
+    lineas = prefijo.decode("utf-8", errors="ignore").splitlines()
+    if len(prefijo) == TAMANIO_MUESTRA:
+        # La última línea puede estar cortada a la mitad
+        lineas = lineas[:-1]
+    muestra = lineas[:LINEAS_MUESTRA]
+    try:
+        return csv.Sniffer().sniff("\n".join(muestra)).delimiter
+    except csv.Error:
+        return ","
+
+
+def _tiene_columnas_binarias(df):
+    """
+    Indica si pyarrow dejó alguna columna como bytes (pasa cuando el archivo tiene texto
+    que no es UTF-8 válido).
+    """
+    for col in df.select_dtypes(include="object").columns:
+        primer_valor = df[col].dropna().head(1)
+        if not primer_valor.empty and isinstance(primer_valor.iloc[0], bytes):
+            return True
+    return False
+
+
+def leer_csv(archivo, motor="pyarrow"):
+    """
+    Lee un CSV directamente del buffer binario del archivo.
+
+    Con el motor pyarrow el parseo es multihilo. Si pyarrow no puede leer el archivo, o
+    encuentra texto que no es UTF-8 válido, se vuelve a leer con el motor de pandas
+    ignorando los caracteres inválidos.
+
+    Parámetros:
+        archivo: archivo binario (por ejemplo, el UploadedFile de Streamlit).
+        motor (str): uno de MOTORES_CSV.
+
+    Retorna:
+        pd.DataFrame: los datos leídos. Las líneas mal formadas se descartan.
+    """
+    delimitador = detectar_delimitador(archivo)
+
+    if motor == "pyarrow":
+        try:
+            df = pd.read_csv(archivo, sep=delimitador, engine="pyarrow", on_bad_lines="skip")
+            if not _tiene_columnas_binarias(df):
+                return df
+        except Exception:
+            pass
+        archivo.seek(0)
+
+    return pd.read_csv(archivo, sep=delimitador, engine="c", low_memory=False,
+                       on_bad_lines="skip", encoding_errors="ignore")
+
+
+def hojas_excel(archivo, hash_contenido=None):
+    """
+    Devuelve los nombres de las hojas de un Excel, sin leer sus celdas. Con el hash del
+    contenido, la lista se guarda en disco y las llamadas siguientes no abren el libro.
+
+    Parámetros:
+        archivo: archivo binario .xlsx o .xls (con atributo name).
+        hash_contenido (str): hash del contenido del archivo, o None para no usar el disco.
+
+    Retorna:
+        list: nombres de las hojas, en el orden del libro.
+    """
+    ruta = DIRECTORIO_EXCEL / f"{hash_contenido}.hojas.json" if hash_contenido is not None else None
+    if ruta is not None:
+        try:
+            return json.loads(ruta.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            pass
+
+    archivo.seek(0)
+    with pd.ExcelFile(io.BytesIO(archivo.getvalue()), engine=_motor_excel(archivo)) as libro:
+        hojas = libro.sheet_names
+
+    if ruta is not None:
+        DIRECTORIO_EXCEL.mkdir(parents=True, exist_ok=True)
+        temporal = ruta.with_suffix(f".{threading.get_ident()}.tmp")
+        temporal.write_text(json.dumps(hojas, ensure_ascii=False), encoding="utf-8")
+        temporal.replace(ruta)
+    return hojas
+
+
+def _motor_excel(archivo):
+    """
+    Motor de pd.read_excel para el archivo: calamine (lector en Rust, varias veces más
+    rápido) si está instalado, y si no el de pandas por defecto para la extensión.
+    """
+    try:
+        import python_calamine  # noqa: F401
+        return "calamine"
+    except ImportError:
+        return "xlrd" if archivo.name.endswith(".xls") else "openpyxl"
+
+
+def _a_parquet(df, destino):
+    """
+    Guarda la hoja como Parquet. Las columnas con tipos mezclados (por ejemplo números y
+    texto en la misma columna), que Parquet no admite, se guardan como texto.
+    """
+    import pyarrow as pa
+
+    try:
+        df.to_parquet(destino, index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        mezcladas = {col: df[col].astype(str).where(df[col].notna())
+                     for col in df.columns if df[col].dtype == object}
+        df.assign(**mezcladas).to_parquet(destino, index=False)
+
+
+def leer_excel(archivo, hoja=0, hash_contenido=None):
+    """
+    Lee una hoja de un Excel. Si se indica el hash del contenido, la hoja se convierte
+    una sola vez a Parquet y las lecturas siguientes leen ese archivo columnar, sin copiar
+    ni abrir el libro (la posición de la hoja sale de la lista guardada por hojas_excel).
+
+    Parámetros:
+        archivo: archivo binario .xlsx o .xls (con atributo name).
+        hoja (str | int): nombre o posición de la hoja.
+        hash_contenido (str): hash del contenido del archivo, o None para no usar el disco.
+
+    Retorna:
+        pd.DataFrame: los datos de la hoja, con la primera fila como encabezado.
+    """
+    destino = None
+    if isinstance(hoja, int) or hash_contenido is not None:
+        hojas = hojas_excel(archivo, hash_contenido)
+        hoja = hojas[hoja] if isinstance(hoja, int) else hoja
+        if hash_contenido is not None:
+            destino = DIRECTORIO_EXCEL / f"{hash_contenido}-{hojas.index(hoja)}.parquet"
+            try:
+                df = pd.read_parquet(destino)
+                marcar_uso(destino)
+                return df
+            except FileNotFoundError:
+                pass
+
+    archivo.seek(0)
+    df = pd.read_excel(io.BytesIO(archivo.getvalue()), sheet_name=hoja, engine=_motor_excel(archivo))
+
+    if destino is not None:
+        DIRECTORIO_EXCEL.mkdir(parents=True, exist_ok=True)
+        temporal = destino.with_suffix(f".{threading.get_ident()}.tmp")
+        _a_parquet(df, temporal)
+        temporal.replace(destino)
+        # Se devuelve lo guardado, para que la primera lectura y las siguientes den los
+        # mismos tipos aunque alguna columna mezclada haya quedado como texto
+        df = pd.read_parquet(destino)
+        descartar_antiguos_disco(DIRECTORIO_EXCEL, PRESUPUESTO_EXCEL)
+
+    return df
+
+
+def leer_archivo(archivo, motor="pyarrow", hoja=0, hash_contenido=None):
+    """
+    Lee un archivo subido según su extensión (.csv, .xlsx o .xls).
+
+    Parámetros:
+        archivo: UploadedFile de Streamlit (o cualquier archivo binario con atributo name).
+        motor (str): motor de lectura para los CSV, uno de MOTORES_CSV.
+        hoja (str | int): hoja a leer de los Excel.
+        hash_contenido (str): hash del contenido, para la caché en disco de los Excel.
+
+    Retorna:
+        pd.DataFrame: los datos leídos.
+    """
+    if archivo.name.endswith(".csv"):
+        return leer_csv(archivo, motor)
+    return leer_excel(archivo, hoja, hash_contenido)
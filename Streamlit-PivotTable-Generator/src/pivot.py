@@ -0,0 +1,470 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from src import cache
+from src.aproximadas import (FUNCIONES_APROXIMADAS, combinar_cuantiles, combinar_hll, cuantiles_bloque,
+                             estimar_cuantil, estimar_distintos, hash_valores, hll_bloque)
+
+# -------------------------------------------------------------------------------
+# TABLA DINÁMICA INCREMENTAL
+# -------------------------------------------------------------------------------
+# En lugar de llamar a pd.pivot_table desde cero en cada rerun, la tabla se arma con
+# resultados parciales guardados en la caché:
+#   - el índice de grupos (código de grupo por fila) para cada selección de filas,
+#   - la cantidad de filas de cada grupo para cada filtro,
+#   - cada estadístico parcial (sum, count, min, max) por columna, grupo y filtro.
+# Agregar una columna de valores sólo calcula los parciales de esa columna, y cambiar
+# entre sum y mean reutiliza sum y count.
+#
+# El resultado es el mismo que pd.pivot_table(df, index=rows, values=values,
+# aggfunc=agg_dict, fill_value=0).reset_index().
+#
+# En tablas grandes, los parciales de las columnas numéricas se calculan por bloques de
+# filas en un pool de procesos: los códigos de grupo y la columna se copian una vez a
+# memoria compartida, cada proceso agrega sus bloques con NumPy y los resultados por
+# bloque se combinan en orden (sum y count se suman, min y max se comparan). Las sumas de
+# decimales se reparten por rangos de grupos en lugar de bloques de filas: las filas se
+# ordenan por grupo (sin cambiar el orden dentro de cada uno) y cada proceso suma sus
+# grupos con groupby, que compensa el error de redondeo igual que en un solo proceso.
+# Así todos los parciales dan exactamente lo mismo que el cálculo sin paralelizar.
+#
+# Las funciones aproximadas (FUNCIONES_APROXIMADAS) usan como parcial un resumen de
+# src/aproximadas.py por columna: los resúmenes de cada bloque se combinan igual que los
+# demás parciales, y la mediana y los percentiles comparten el mismo resumen.
+
+FUNCIONES_AGREGACION = ["sum", "mean", "count", "max", "min"]
+
+# Estadísticos parciales que necesita cada función de agregación
+PARCIALES = {
+    "sum": ("sum",),
+    "mean": ("sum", "count"),
+    "count": ("count",),
+    "max": ("max",),
+    "min": ("min",),
+    **{funcion: (resumen,) for funcion, (resumen, _) in FUNCIONES_APROXIMADAS.items()},
+}
+
+# Parciales que son resúmenes de src/aproximadas.py en lugar de un valor por grupo
+RESUMENES = ("hll", "cuantiles")
+
+# Filas a partir de las cuales los parciales se calculan por bloques en paralelo
+FILAS_PARALELO = 2_000_000
+FILAS_POR_BLOQUE = 1_000_000
+PROCESOS = os.cpu_count() or 1
+
+_pool = {'ejecutor': None, 'procesos': 0}
+_lock_pool = threading.Lock()
+
+
+def indice_grupos(df, rows):
+    """
+    Factoriza las columnas de filas de la tabla dinámica.
+
+    Parámetros:
+        df (pd.DataFrame): datos completos (sin filtrar).
+        rows (list): columnas para filas.
+
+    Retorna:
+        tuple: (codigos, claves)
+            codigos: np.ndarray con el número de grupo de cada fila (-1 si alguna columna
+                     de filas es nula, igual que pivot_table que descarta esas filas).
+            claves: pd.DataFrame con los valores de las columnas de filas de cada grupo,
+                    ordenados como en pivot_table.
+    """
+    agrupado = df.groupby(list(rows), sort=True, dropna=True, observed=True)
+    codigos = agrupado.ngroup().fillna(-1).to_numpy(dtype=np.intp)
+    claves = agrupado.size().index.to_frame(index=False)
+    return codigos, claves
+
+
+def _filas_validas(codigos, mascara):
+    """
+    Devuelve la máscara de filas que participan en la tabla: con grupo y que pasan el filtro.
+    """
+    validas = codigos >= 0
+    if mascara is not None:
+        validas &= np.asarray(mascara, dtype=bool)
+    return validas
+
+
+def _filas_por_grupo(codigos, mascara, cantidad_grupos):
+    """
+    Cantidad de filas de cada grupo que pasan el filtro.
+    """
+    return np.bincount(codigos[_filas_validas(codigos, mascara)], minlength=cantidad_grupos)
+
+
+def _valores_resumen(serie, codigos, estadistico):
+    """
+    Prepara una columna para un resumen: el hash de cada valor para HyperLogLog (las filas
+    nulas quedan sin grupo) o los valores como decimales para los cuantiles.
+
+    Retorna:
+        tuple: (codigos, valores) como arreglos de NumPy.
+
+    Lanza:
+        ValueError: si se piden percentiles de una columna no numérica.
+    """
+    if estadistico == "hll":
+        return np.where(serie.notna().to_numpy(), codigos, -1), hash_valores(serie)
+    if not admite_paralelo(serie, estadistico):
+        raise ValueError(f"La mediana y los percentiles requieren una columna numérica ('{serie.name}').")
+    return codigos, serie.to_numpy(dtype=np.float64)
+
+
+def _parcial(serie, codigos, mascara, estadistico):
+    """
+    Calcula un estadístico parcial de una columna para cada grupo.
+
+    Retorna:
+        pd.Series: indexada por código de grupo (sólo los grupos con filas), o el resumen
+        de src/aproximadas.py si el estadístico está en RESUMENES.
+    """
+    validas = _filas_validas(codigos, mascara)
+    if estadistico in RESUMENES:
+        return _agregar_bloque(*_valores_resumen(serie, np.where(validas, codigos, -1), estadistico), 0, estadistico)
+    return getattr(serie[validas].groupby(codigos[validas]), estadistico)()
+
+
+def _ejecutor(procesos):
+    """
+    Devuelve el pool de procesos (se crea la primera vez y se reutiliza entre reruns).
+    Se usa "spawn" porque el servidor de Streamlit tiene varios hilos y no es seguro
+    hacer fork.
+    """
+    with _lock_pool:
+        if _pool['ejecutor'] is None or _pool['procesos'] != procesos:
+            if _pool['ejecutor'] is not None:
+                _pool['ejecutor'].shutdown()
+            _pool['ejecutor'] = ProcessPoolExecutor(procesos, mp_context=multiprocessing.get_context("spawn"))
+            _pool['procesos'] = procesos
+        return _pool['ejecutor']
+
+
+def _a_memoria_compartida(arreglo):
+    """
+    Copia un arreglo a un bloque nuevo de memoria compartida. Quien lo crea debe cerrarlo
+    y liberarlo con unlink().
+    """
+    bloque = shared_memory.SharedMemory(create=True, size=max(arreglo.nbytes, 1))
+    np.ndarray(arreglo.shape, dtype=arreglo.dtype, buffer=bloque.buf)[:] = arreglo
+    return bloque
+
+
+def _abrir_memoria_compartida(nombre):
+    """
+    Abre un bloque de memoria compartida creado por el proceso principal, sin que este
+    proceso lo libere al terminar (lo libera sólo quien lo creó).
+    """
+    try:
+        return shared_memory.SharedMemory(name=nombre, track=False)
+    except TypeError:
+        # Python < 3.13 no tiene el parámetro track; los procesos del pool comparten el
+        # resource_tracker del proceso principal, que libera el bloque una sola vez
+        return shared_memory.SharedMemory(name=nombre)
+
+
+def _agregar_bloque(codigos, valores, cantidad_grupos, estadistico):
+    """
+    Calcula un estadístico por grupo sobre un bloque de filas, ignorando las filas sin
+    grupo (código -1) y los valores nulos.
+
+    Retorna:
+        tuple: (resultado, conteo), dos arreglos de largo cantidad_grupos. conteo es la
+        cantidad de valores no nulos de cada grupo. Para los RESUMENES, el resumen del
+        bloque.
+    """
+    if estadistico == "hll":
+        return hll_bloque(codigos, valores)
+    if estadistico == "cuantiles":
+        return cuantiles_bloque(codigos, valores)
+
+    validas = codigos >= 0
+    if valores.dtype.kind == "f":
+        validas &= ~np.isnan(valores)
+    codigos, valores = codigos[validas], valores[validas]
+
+    conteo = np.bincount(codigos, minlength=cantidad_grupos)
+    if estadistico == "count":
+        return conteo, conteo
+    if estadistico == "sum":
+        if valores.dtype.kind == "f":
+            return np.bincount(codigos, weights=valores, minlength=cantidad_grupos), conteo
+        # Los enteros se suman en 64 bits, como pandas
+        tipo = np.uint64 if valores.dtype.kind == "u" else np.int64
+        resultado = np.zeros(cantidad_grupos, dtype=tipo)
+        np.add.at(resultado, codigos, valores.astype(tipo, copy=False))
+        return resultado, conteo
+
+    funcion = np.minimum if estadistico == "min" else np.maximum
+    if valores.dtype.kind == "f":
+        neutro = np.inf if estadistico == "min" else -np.inf
+    elif valores.dtype.kind == "b":
+        neutro = estadistico == "min"
+    else:
+        limites = np.iinfo(valores.dtype)
+        neutro = limites.max if estadistico == "min" else limites.min
+    resultado = np.full(cantidad_grupos, neutro, dtype=valores.dtype)
+    funcion.at(resultado, codigos, valores)
+    return resultado, conteo
+
+
+def _agregar_bloque_compartido(nombre_codigos, nombre_valores, tipo, filas, desde, hasta,
+                               cantidad_grupos, estadistico):
+    """
+    Tarea de un proceso del pool: agrega las filas [desde, hasta) leyendo los códigos y
+    la columna de la memoria compartida, sin copiarlos.
+    """
+    bloque_codigos = _abrir_memoria_compartida(nombre_codigos)
+    bloque_valores = _abrir_memoria_compartida(nombre_valores)
+    try:
+        codigos = np.ndarray((filas,), dtype=np.intp, buffer=bloque_codigos.buf)
+        valores = np.ndarray((filas,), dtype=tipo, buffer=bloque_valores.buf)
+        resultado = _agregar_bloque(codigos[desde:hasta], valores[desde:hasta], cantidad_grupos, estadistico)
+        # Las vistas sobre los bloques se sueltan antes de cerrarlos
+        del codigos, valores
+        return resultado
+    finally:
+        bloque_codigos.close()
+        bloque_valores.close()
+
+
+def _sumar_grupos(codigos, valores, grupo_desde, grupo_hasta):
+    """
+    Suma decimal de los grupos [grupo_desde, grupo_hasta) sobre las filas de esos grupos,
+    con groupby como en _parcial para obtener los mismos valores.
+
+    Retorna:
+        np.ndarray: la suma de cada grupo del rango (0 en los grupos sin valores).
+    """
+    sumas = pd.Series(valores).groupby(codigos).sum()
+    return sumas.reindex(range(grupo_desde, grupo_hasta), fill_value=0).to_numpy()
+
+
+def _sumar_grupos_compartido(nombre_codigos, nombre_valores, tipo, filas, desde, hasta,
+                             grupo_desde, grupo_hasta):
+    """
+    Tarea de un proceso del pool: suma los grupos [grupo_desde, grupo_hasta), cuyas filas
+    son [desde, hasta) en los códigos y la columna ordenados por grupo de la memoria
+    compartida.
+    """
+    bloque_codigos = _abrir_memoria_compartida(nombre_codigos)
+    bloque_valores = _abrir_memoria_compartida(nombre_valores)
+    try:
+        codigos = np.ndarray((filas,), dtype=np.intp, buffer=bloque_codigos.buf)
+        valores = np.ndarray((filas,), dtype=tipo, buffer=bloque_valores.buf)
+        resultado = _sumar_grupos(codigos[desde:hasta], valores[desde:hasta], grupo_desde, grupo_hasta)
+        del codigos, valores
+        return resultado
+    finally:
+        bloque_codigos.close()
+        bloque_valores.close()
+
+
+def _suma_decimal_paralela(codigos, valores, cantidad_grupos):
+    """
+    Suma por grupo de una columna decimal, repartida en rangos de grupos de alrededor de
+    FILAS_POR_BLOQUE filas. Un grupo nunca se parte entre dos tareas, así que cada suma se
+    hace en el orden original de las filas, igual que en _parcial.
+
+    Retorna:
+        np.ndarray: la suma de cada grupo, de largo cantidad_grupos.
+    """
+    validas = codigos >= 0
+    orden = np.argsort(codigos[validas], kind="stable")
+    codigos, valores = codigos[validas][orden], valores[validas][orden]
+    inicio = np.searchsorted(codigos, np.arange(cantidad_grupos + 1))
+    cortes = np.unique(np.r_[0, np.searchsorted(inicio, np.arange(0, len(codigos), FILAS_POR_BLOQUE),
+                                                side="right") - 1, cantidad_grupos])
+    rangos = [(int(grupo_desde), int(grupo_hasta)) for grupo_desde, grupo_hasta in zip(cortes[:-1], cortes[1:])]
+
+    if PROCESOS > 1 and len(rangos) > 1:
+        bloque_codigos = _a_memoria_compartida(codigos)
+        bloque_valores = _a_memoria_compartida(valores)
+        try:
+            tareas = [_ejecutor(PROCESOS).submit(
+                _sumar_grupos_compartido, bloque_codigos.name, bloque_valores.name, valores.dtype, len(valores),
+                inicio[grupo_desde], inicio[grupo_hasta], grupo_desde, grupo_hasta) for grupo_desde, grupo_hasta in rangos]
+            sumas = [tarea.result() for tarea in tareas]
+        finally:
+            for bloque in (bloque_codigos, bloque_valores):
+                bloque.close()
+                bloque.unlink()
+    else:
+        sumas = [_sumar_grupos(codigos[inicio[grupo_desde]:inicio[grupo_hasta]],
+                               valores[inicio[grupo_desde]:inicio[grupo_hasta]], grupo_desde, grupo_hasta)
+                 for grupo_desde, grupo_hasta in rangos]
+
+    return np.concatenate(sumas) if sumas else np.zeros(0)
+
+
+def admite_paralelo(serie, estadistico=None):
+    """
+    Indica si los parciales de la columna se pueden calcular por bloques: columnas
+    numéricas o booleanas de NumPy (no fechas, texto ni tipos de extensión de pandas).
+    HyperLogLog trabaja sobre el hash de los valores, así que admite cualquier columna.
+    """
+    if estadistico == "hll":
+        return True
+    return isinstance(serie.dtype, np.dtype) and serie.dtype.kind in "biuf"
+
+
+def _parcial_paralelo(serie, codigos, mascara, estadistico):
+    """
+    Igual que _parcial, pero calculado por bloques de FILAS_POR_BLOQUE filas en el pool
+    de PROCESOS procesos (o en este proceso, si hay un solo núcleo). Los bloques tienen
+    tamaño fijo y se combinan siempre en el mismo orden, así el resultado no depende de
+    la cantidad de procesos. Las sumas de decimales se reparten por grupos
+    (_suma_decimal_paralela).
+
+    Retorna:
+        pd.Series: indexada por código de grupo, o el resumen combinado de los bloques si
+        el estadístico está en RESUMENES.
+    """
+    codigos = np.where(_filas_validas(codigos, mascara), codigos, -1)
+    if estadistico in RESUMENES:
+        codigos, valores = _valores_resumen(serie, codigos, estadistico)
+    else:
+        valores = serie.to_numpy()
+    cantidad_grupos = int(codigos.max()) + 1 if len(codigos) else 0
+    if estadistico == "sum" and valores.dtype.kind == "f":
+        return pd.Series(_suma_decimal_paralela(codigos, valores, cantidad_grupos).astype(valores.dtype))
+    limites = [(desde, min(desde + FILAS_POR_BLOQUE, len(valores)))
+               for desde in range(0, len(valores), FILAS_POR_BLOQUE)]
+
+    if PROCESOS > 1:
+        bloque_codigos = _a_memoria_compartida(codigos)
+        bloque_valores = _a_memoria_compartida(valores)
+        try:
+            tareas = [_ejecutor(PROCESOS).submit(
+                _agregar_bloque_compartido, bloque_codigos.name, bloque_valores.name, valores.dtype,
+                len(valores), desde, hasta, cantidad_grupos, estadistico) for desde, hasta in limites]
+            parciales = [tarea.result() for tarea in tareas]
+        finally:
+            for bloque in (bloque_codigos, bloque_valores):
+                bloque.close()
+                bloque.unlink()
+    else:
+        parciales = [_agregar_bloque(codigos[desde:hasta], valores[desde:hasta], cantidad_grupos, estadistico)
+                     for desde, hasta in limites]
+
+    if not parciales:
+        parciales = [_agregar_bloque(codigos, valores, cantidad_grupos, estadistico)]
+    if estadistico == "hll":
+        return combinar_hll(parciales)
+    if estadistico == "cuantiles":
+        return combinar_cuantiles(parciales)
+
+    resultado, conteo = parciales[0]
+    for parcial, conteo_bloque in parciales[1:]:
+        if estadistico in ("sum", "count"):
+            resultado = resultado + parcial
+        else:
+            resultado = (np.minimum if estadistico == "min" else np.maximum)(resultado, parcial)
+        conteo = conteo + conteo_bloque
+
+    if estadistico in ("min", "max"):
+        # Como groupby, los grupos sin valores no nulos quedan en NaN
+        resultado = pd.Series(resultado).where(conteo > 0)
+        if valores.dtype.kind != "f":
+            # Sin nulos posibles, los grupos con filas tienen valor; los demás se descartan
+            resultado = resultado.dropna().astype(valores.dtype)
+        return resultado
+    if estadistico == "sum" and valores.dtype.kind in "iu":
+        # Como pandas, la suma vuelve al tipo de la columna si todos los totales entran en él
+        limites = np.iinfo(valores.dtype)
+        if len(resultado) == 0 or (resultado.min() >= limites.min and resultado.max() <= limites.max):
+            resultado = resultado.astype(valores.dtype)
+    return pd.Series(resultado)
+
+
+def _tipo_vacio(serie, funcion):
+    """
+    Tipo de la columna de valores cuando la tabla queda vacía, el mismo que tendría con datos.
+    """
+    if funcion in ("count", "nunique_aprox"):
+        return np.int64
+    if funcion in ("min", "max"):
+        return serie.dtype
+    if funcion == "sum" and (pd.api.types.is_integer_dtype(serie.dtype) or pd.api.types.is_bool_dtype(serie.dtype)):
+        return np.int64
+    return np.float64
+
+
+def tabla_dinamica(df, rows, agg_dict, clave_datos, mascara=None, clave_filtro=None):
+    """
+    Arma la tabla dinámica reutilizando los resultados parciales de la caché.
+
+    Parámetros:
+        df (pd.DataFrame): datos completos (sin filtrar). No se modifica.
+        rows (list): columnas para filas.
+        agg_dict (dict): columna de valores -> función de FUNCIONES_AGREGACION o de
+            FUNCIONES_APROXIMADAS.
+        clave_datos: clave que identifica a df en la caché (por ejemplo, la de la unión).
+        mascara (np.ndarray): filas que pasan el filtro, o None para usar todas.
+        clave_filtro: clave que identifica a la máscara (None si no hay filtro).
+
+    Retorna:
+        pd.DataFrame: columnas de filas seguidas de las columnas de valores (en orden
+        alfabético), con 0 en lugar de los valores faltantes. Si ninguna fila pasa el
+        filtro, la tabla vacía tiene las mismas columnas.
+
+    Lanza:
+        ValueError: si una columna de valores también está en filas, la función no existe
+        o se piden percentiles de una columna no numérica.
+    """
+    rows = tuple(rows)
+    repetidas = [col for col in agg_dict if col in rows]
+    if repetidas:
+        raise ValueError(f"Las columnas {repetidas} no pueden estar en filas y en valores a la vez.")
+    for funcion in agg_dict.values():
+        if funcion not in PARCIALES:
+            raise ValueError(f"Función de agregación no soportada: '{funcion}'.")
+
+    codigos, claves = cache.cacheado(("grupos", clave_datos, rows), indice_grupos, df, rows)
+    filas = cache.cacheado(("filas_grupo", clave_datos, rows, clave_filtro),
+                           _filas_por_grupo, codigos, mascara, len(claves))
+    presentes = np.flatnonzero(filas)
+    if not len(presentes):
+        # Ninguna fila pasa el filtro: tabla vacía con las mismas columnas que cuando hay datos
+        # (pivot_table devolvería sólo las columnas de filas)
+        vacias = {col: pd.Series(dtype=_tipo_vacio(df[col], agg_dict[col])) for col in sorted(agg_dict)}
+        return pd.concat([claves.iloc[:0], pd.DataFrame(vacias)], axis=1)
+
+    def calcular(col, estadistico):
+        funcion = _parcial_paralelo if len(df) >= FILAS_PARALELO and admite_paralelo(df[col], estadistico) else _parcial
+        return cache.cacheado(("parcial", clave_datos, rows, clave_filtro, col, estadistico),
+                              funcion, df[col], codigos, mascara, estadistico)
+
+    def parcial(col, estadistico):
+        return calcular(col, estadistico).reindex(presentes)
+
+    valores = {}
+    for col, funcion in agg_dict.items():
+        if funcion == "mean":
+            conteo = parcial(col, "count")
+            valores[col] = parcial(col, "sum") / conteo.where(conteo > 0)
+        elif funcion in FUNCIONES_APROXIMADAS:
+            resumen, q = FUNCIONES_APROXIMADAS[funcion]
+            if resumen == "hll":
+                estimado = estimar_distintos(calcular(col, resumen), len(claves))
+            else:
+                estimado = estimar_cuantil(calcular(col, resumen), len(claves), q)
+            valores[col] = pd.Series(estimado[presentes], index=presentes)
+        else:
+            valores[col] = parcial(col, funcion)
+
+    resultado = pd.DataFrame(valores, index=presentes)
+    if len(resultado.columns):
+        resultado = resultado.sort_index(axis=1)
+        # Como pivot_table, se descartan los grupos sin ningún valor
+        resultado = resultado.dropna(how="all")
+
+    return pd.concat([claves.iloc[resultado.index].reset_index(drop=True),
+                      resultado.reset_index(drop=True).fillna(0)], axis=1)
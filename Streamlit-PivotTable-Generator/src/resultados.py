@@ -0,0 +1,173 @@
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from src.cache import DIRECTORIO_DISCO, descartar_antiguos_disco, marcar_uso
+from src.especificacion import validar
+
+# -------------------------------------------------------------------------------
+# RESULTADOS EN DISCO Y TABLAS GUARDADAS
+# -------------------------------------------------------------------------------
+# Las tablas dinámicas que se repiten sobre los mismos archivos se guardan en disco como
+# Parquet, con clave (hashes de los archivos, hash de la especificación). Así, abrir una
+# tabla guardada sobre archivos sin cambios muestra el resultado sin leer los archivos.
+# Los resultados se descartan por LRU (fecha de último uso) al superar PRESUPUESTO_DISCO.
+#
+# Las tablas guardadas son especificaciones de src/especificacion.py con un nombre, en
+# ARCHIVO_TABLAS, junto con los hashes de los archivos sobre los que se calcularon. A
+# diferencia de los resultados (que se pueden volver a calcular), no van al directorio
+# temporal: se guardan en la carpeta de configuración del usuario, o en la ruta de la
+# variable de entorno PIVOT_TABLAS_GUARDADAS.
+
+PRESUPUESTO_DISCO = 1024 ** 3  # 1 GB
+
+DIRECTORIO_RESULTADOS = DIRECTORIO_DISCO / "resultados"
+ARCHIVO_TABLAS = Path(os.environ.get(
+    "PIVOT_TABLAS_GUARDADAS",
+    Path(os.environ.get("XDG_CONFIG_HOME") or Path.home() / ".config") / "pivot-generator" / "tablas_guardadas.json"))
+# Ubicación anterior (en el directorio temporal), se lee si todavía no hay ARCHIVO_TABLAS
+_ARCHIVO_TABLAS_ANTERIOR = DIRECTORIO_DISCO / "tablas_guardadas.json"
+
+# Datos de la especificación que no cambian el resultado
+_CLAVES_IGNORADAS = ("version", "salida")
+
+_lock = threading.RLock()
+
+
+def clave_resultado(especificacion, hashes):
+    """
+    Clave del resultado de una especificación sobre archivos con los hashes indicados.
+    No depende de las rutas de los archivos ni del archivo de salida.
+
+    Parámetros:
+        especificacion (dict): especificación de src/especificacion.py.
+        hashes (list): hash del contenido de cada archivo, en el orden de la especificación.
+
+    Retorna:
+        str: hash hexadecimal.
+    """
+    especificacion = validar(especificacion)
+    datos = {clave: valor for clave, valor in especificacion.items() if clave not in _CLAVES_IGNORADAS}
+    datos['archivos'] = [{'hash': hash_contenido, 'hojas': archivo.get('hojas')}
+                         for archivo, hash_contenido in zip(especificacion['archivos'], hashes)]
+    texto = json.dumps(datos, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.blake2b(texto.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def leer_resultado(clave):
+    """
+    Devuelve el resultado guardado para la clave (marcándolo como usado), o None.
+    """
+    ruta = DIRECTORIO_RESULTADOS / f"{clave}.parquet"
+    try:
+        resultado = pd.read_parquet(ruta)
+        marcar_uso(ruta)
+    except FileNotFoundError:
+        return None
+    return resultado
+
+
+def guardar_resultado(clave, resultado):
+    """
+    Guarda el resultado en disco y descarta los más antiguos si se supera el presupuesto.
+
+    Retorna:
+        el mismo resultado recibido.
+    """
+    DIRECTORIO_RESULTADOS.mkdir(parents=True, exist_ok=True)
+    destino = DIRECTORIO_RESULTADOS / f"{clave}.parquet"
+    temporal = destino.with_suffix(f".{threading.get_ident()}.tmp")
+    resultado.to_parquet(temporal, index=False)
+    temporal.replace(destino)
+    with _lock:
+        descartar_antiguos_disco(DIRECTORIO_RESULTADOS, PRESUPUESTO_DISCO)
+    return resultado
+
+
+def uso_disco():
+    """
+    Retorna:
+        tuple: (bytes usados, cantidad de resultados en disco).
+    """
+    tamanios = [ruta.stat().st_size for ruta in DIRECTORIO_RESULTADOS.glob("*.parquet")]
+    return sum(tamanios), len(tamanios)
+
+
+def ejecutar_cacheado(especificacion, hashes, ejecutar):
+    """
+    Devuelve el resultado guardado de la especificación o, si no existe, lo calcula con
+    ejecutar() y lo guarda.
+
+    Retorna:
+        tuple: (resultado, True si vino del disco).
+    """
+    clave = clave_resultado(especificacion, hashes)
+    resultado = leer_resultado(clave)
+    if resultado is not None:
+        return resultado, True
+    return guardar_resultado(clave, ejecutar()), False
+
+
+def tablas_guardadas():
+    """
+    Retorna:
+        dict: nombre -> {'especificacion', 'hashes', 'guardada'} de cada tabla guardada.
+    """
+    for archivo in (ARCHIVO_TABLAS, _ARCHIVO_TABLAS_ANTERIOR):
+        try:
+            return json.loads(archivo.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            continue
+    return {}
+
+
+def _escribir_tablas(tablas):
+    """
+    Reemplaza ARCHIVO_TABLAS de una sola vez, para no dejarlo a medio escribir.
+    """
+    ARCHIVO_TABLAS.parent.mkdir(parents=True, exist_ok=True)
+    temporal = ARCHIVO_TABLAS.with_suffix(".tmp")
+    temporal.write_text(json.dumps(tablas, ensure_ascii=False, indent=2, default=str), encoding="utf-8")
+    temporal.replace(ARCHIVO_TABLAS)
+
+
+def guardar_tabla(nombre, especificacion, hashes, resultado):
+    """
+    Guarda una tabla con nombre (reemplaza a otra con el mismo nombre) y su resultado.
+
+    Parámetros:
+        nombre (str): nombre de la tabla.
+        especificacion (dict): especificación de src/especificacion.py.
+        hashes (list): hash de cada archivo de la especificación.
+        resultado (pd.DataFrame): la tabla dinámica calculada.
+
+    Lanza:
+        ValueError: si el nombre está vacío o la especificación no es válida.
+    """
+    nombre = nombre.strip()
+    if not nombre:
+        raise ValueError("Indicá un nombre para la tabla.")
+    guardar_resultado(clave_resultado(especificacion, hashes), resultado)
+    with _lock:
+        tablas = tablas_guardadas()
+        tablas[nombre] = {
+            'especificacion': especificacion,
+            'hashes': list(hashes),
+            'guardada': datetime.now().isoformat(timespec="seconds"),
+        }
+        _escribir_tablas(tablas)
+
+
+def borrar_tabla(nombre):
+    """
+    Borra la definición de una tabla guardada (su resultado queda hasta que se descarte).
+    """
+    with _lock:
+        tablas = tablas_guardadas()
+        tablas.pop(nombre, None)
+        _escribir_tablas(tablas)
@@ -0,0 +1,192 @@
+import numpy as np
+import pandas as pd
+
+# -------------------------------------------------------------------------------
+# UNIÓN DE ARCHIVOS
+# -------------------------------------------------------------------------------
+# La unión se hace en dos pasos:
+#   1. planificar_union: perfila las columnas clave de cada archivo (valores distintos,
+#      cardinalidad, nulos), codifica las claves como enteros y estima la cantidad de
+#      filas del resultado, sin unir nada todavía.
+#   2. unir_archivos: ejecuta el plan, uniendo primero los archivos más chicos y usando
+#      las claves codificadas, y vuelve a poner los valores originales al final.
+
+
+def columnas_comunes(dfs):
+    """
+    Devuelve las columnas presentes en todos los DataFrames, en el orden del primero.
+    """
+    comunes = set.intersection(*(set(df.columns) for df in dfs))
+    return [col for col in dfs[0].columns if col in comunes]
+
+
+def agregar_id_base(df):
+    """
+    Devuelve el DataFrame con índice limpio y la columna id_base (ID único por fila,
+    empezando en 1) como primera columna. No modifica el DataFrame recibido: con
+    Copy-on-Write el resultado comparte las columnas con él, sin copiarlas.
+    """
+    df = df.reset_index(drop=True)
+    df.insert(0, 'id_base', np.arange(1, len(df) + 1))
+    return df
+
+
+def _codificar_columna(columnas):
+    """
+    Codifica como enteros los valores de una columna clave de todos los archivos a la vez,
+    así el mismo valor tiene el mismo código en todos. Los nulos reciben su propio código
+    (pandas también une nulo con nulo).
+
+    Los códigos respetan el orden de los valores, para que el resultado quede ordenado igual
+    que con las claves originales. Si los valores no se pueden ordenar (tipos mezclados),
+    se devuelve unicos = None y la columna no se reemplaza al unir.
+
+    Retorna:
+        tuple: (lista de arrays de códigos, uno por archivo, valores únicos o None)
+    """
+    valores = pd.concat(columnas, ignore_index=True)
+    try:
+        codigos, unicos = pd.factorize(valores, sort=True, use_na_sentinel=False)
+    except TypeError:
+        codigos, unicos = pd.factorize(valores, use_na_sentinel=False)
+        unicos = None
+
+    cortes = np.cumsum([len(col) for col in columnas])[:-1]
+    return np.split(codigos, cortes), unicos
+
+
+def _clave_compuesta(codigos_columnas):
+    """
+    Combina los códigos de varias columnas clave (de todos los archivos concatenados) en un
+    único código por fila.
+    """
+    compuesto = codigos_columnas[0].astype(np.int64)
+    for codigos in codigos_columnas[1:]:
+        compuesto = pd.factorize(compuesto * (int(codigos.max(initial=0)) + 1) + codigos)[0]
+    return compuesto
+
+
+def planificar_union(dfs):
+    """
+    Prepara la unión de los DataFrames por sus columnas comunes sin ejecutarla.
+
+    Para cada archivo perfila la clave (filas, valores distintos, si es única, cardinalidad
+    y porcentaje de filas con algún nulo en la clave). Con las cantidades por valor de
+    clave calcula la cantidad de filas que va a tener el resultado de los outer joins,
+    que no depende del orden en que se unan los archivos.
+
+    Parámetros:
+        dfs (list): DataFrames a unir (al menos dos).
+
+    Retorna:
+        dict: {
+            'columnas': columnas comunes,
+            'perfiles': pd.DataFrame con una fila por archivo,
+            'orden': posiciones de los archivos en el orden de unión,
+            'filas_estimadas': filas del resultado,
+            'muchos_a_muchos': True si alguna clave se repite en más de un archivo,
+            'codigos': por columna, la lista de códigos de cada archivo,
+            'unicos': por columna, los valores únicos (None si no se pudo codificar)
+        }
+
+    Lanza:
+        ValueError: si los DataFrames no tienen columnas en común.
+    """
+    common_cols = columnas_comunes(dfs)
+    if not common_cols:
+        raise ValueError("No hay columnas comunes entre los archivos.")
+
+    codigos, unicos = {}, {}
+    for col in common_cols:
+        codigos[col], unicos[col] = _codificar_columna([df[col] for df in dfs])
+
+    # Filas por valor de clave en cada archivo
+    cortes = np.cumsum([len(df) for df in dfs])[:-1]
+    compuesto = _clave_compuesta([np.concatenate(codigos[col]) for col in common_cols])
+    cantidad_claves = int(compuesto.max(initial=-1)) + 1
+    conteos = [np.bincount(parte, minlength=cantidad_claves) for parte in np.split(compuesto, cortes)]
+
+    perfiles = []
+    for i, df in enumerate(dfs):
+        distintos = int(np.count_nonzero(conteos[i]))
+        nulos = df[common_cols].isna().any(axis=1).mean() if len(df) else 0.0
+        perfiles.append({
+            'archivo': i + 1,
+            'filas': len(df),
+            'claves_distintas': distintos,
+            'clave_unica': distintos == len(df),
+            'cardinalidad': round(distintos / len(df), 4) if len(df) else 0.0,
+            'porcentaje_nulos': round(float(nulos) * 100, 2)
+        })
+
+    # Outer join sobre las mismas claves: si la clave está de los dos lados se multiplican
+    # las filas, si no se suman
+    acumulado = conteos[0]
+    muchos_a_muchos = False
+    for conteo in conteos[1:]:
+        ambos = (acumulado > 0) & (conteo > 0)
+        muchos_a_muchos |= bool(np.any(ambos & (acumulado > 1) & (conteo > 1)))
+        acumulado = np.where(ambos, acumulado * conteo, acumulado + conteo)
+
+    # El orden sólo se cambia si no hay otras columnas repetidas entre archivos, porque en
+    # ese caso los sufijos _x/_y dependen del orden
+    no_claves = [set(df.columns) - set(common_cols) for df in dfs]
+    repetidas = sum(len(cols) for cols in no_claves) != len(set().union(*no_claves))
+    orden = list(range(len(dfs))) if repetidas else sorted(range(len(dfs)), key=lambda i: len(dfs[i]))
+
+    return {
+        'columnas': common_cols,
+        'perfiles': pd.DataFrame(perfiles),
+        'orden': orden,
+        'filas_estimadas': int(acumulado.sum()),
+        'muchos_a_muchos': muchos_a_muchos,
+        'codigos': codigos,
+        'unicos': unicos
+    }
+
+
+def unir_archivos(dfs, plan=None):
+    """
+    Une los DataFrames leídos por sus columnas comunes (outer join) y agrega la columna id_base.
+
+    Se unen primero los archivos más chicos y sobre las claves codificadas como enteros.
+    El resultado tiene las mismas filas y columnas, en el mismo orden de columnas, que unir
+    los archivos de izquierda a derecha.
+
+    Parámetros:
+        dfs (list): DataFrames a unir. No se modifican.
+        plan (dict): resultado de planificar_union. Si no se indica, se calcula.
+
+    Retorna:
+        tuple: (DataFrame unido, lista de columnas comunes). Con un único DataFrame la
+        lista de columnas comunes es vacía.
+
+    Lanza:
+        ValueError: si hay más de un DataFrame y no tienen columnas en común.
+    """
+    if len(dfs) == 1:
+        return agregar_id_base(dfs[0]), []
+
+    if plan is None:
+        plan = planificar_union(dfs)
+    common_cols = plan['columnas']
+    codificadas = [col for col in common_cols if plan['unicos'][col] is not None]
+
+    # Las claves se reemplazan por sus códigos enteros en copias livianas de cada archivo
+    partes = [df.assign(**{col: plan['codigos'][col][i] for col in codificadas}) for i, df in enumerate(dfs)]
+
+    merged_df = partes[plan['orden'][0]]
+    for i in plan['orden'][1:]:
+        merged_df = pd.merge(merged_df, partes[i], on=common_cols, how="outer")
+
+    for col in codificadas:
+        merged_df[col] = plan['unicos'][col].take(merged_df[col].to_numpy())
+
+    if plan['orden'] != sorted(plan['orden']):
+        # Mismo orden de columnas que la unión de izquierda a derecha
+        columnas = list(dfs[0].columns)
+        for df in dfs[1:]:
+            columnas += [col for col in df.columns if col not in common_cols]
+        merged_df = merged_df[columnas]
+
+    return agregar_id_base(merged_df), common_cols
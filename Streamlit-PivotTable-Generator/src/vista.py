@@ -0,0 +1,97 @@
+import tempfile
+
+import numpy as np
+
+from src import cache
+
+# -------------------------------------------------------------------------------
+# PREVISUALIZACIÓN PAGINADA Y DESCARGAS BAJO DEMANDA
+# -------------------------------------------------------------------------------
+# La previsualización sólo serializa la página visible, y los CSV de descarga se generan
+# recién cuando el usuario hace clic, en bloques de filas, y quedan en la caché. Las filas
+# filtradas se indican con un arreglo de posiciones (o un range si no hay filtro): nunca
+# se arma una copia filtrada del DataFrame completo.
+
+TAMANIOS_PAGINA = [50, 100, 500, 1000]
+FILAS_POR_BLOQUE = 100_000
+
+
+def cantidad_paginas(filas, tamanio_pagina):
+    """
+    Cantidad de páginas necesarias para mostrar las filas (al menos una).
+    """
+    return max(1, -(-filas // tamanio_pagina))
+
+
+def filas_seleccionadas(df, mascara=None):
+    """
+    Posiciones de las filas que pasan el filtro. Sin máscara devuelve un range, que no
+    ocupa memoria.
+    """
+    return range(len(df)) if mascara is None else np.flatnonzero(mascara)
+
+
+def pagina(df, posiciones, columnas, numero, tamanio_pagina):
+    """
+    Devuelve sólo las filas de una página.
+
+    Parámetros:
+        df (pd.DataFrame): datos completos. No se modifica.
+        posiciones (np.ndarray | range): posiciones de las filas seleccionadas.
+        columnas (list): columnas a mostrar.
+        numero (int): número de página, empezando en 1.
+        tamanio_pagina (int): filas por página.
+
+    Retorna:
+        pd.DataFrame: las filas de la página.
+    """
+    desde = (numero - 1) * tamanio_pagina
+    return df.iloc[posiciones[desde:desde + tamanio_pagina]][columnas]
+
+
+def csv_en_bloques(df, posiciones=None, columnas=None, filas_por_bloque=FILAS_POR_BLOQUE):
+    """
+    Genera el CSV del DataFrame (UTF-8, sin índice) de a bloques de filas. Sólo se copia
+    un bloque de filas a la vez.
+
+    Parámetros:
+        df (pd.DataFrame): datos completos. No se modifica.
+        posiciones (np.ndarray | range): filas a incluir, o None para todas.
+        columnas (list): columnas a incluir, o None para todas.
+
+    Retorna:
+        generator: bytes de cada bloque; el encabezado va sólo en el primero.
+    """
+    posiciones = range(len(df)) if posiciones is None else posiciones
+    columnas = list(df.columns) if columnas is None else list(columnas)
+    for desde in range(0, max(len(posiciones), 1), filas_por_bloque):
+        bloque = df.iloc[posiciones[desde:desde + filas_por_bloque]][columnas]
+        yield bloque.to_csv(index=False, header=desde == 0).encode("utf-8")
+
+
+def _generar_csv(obtener_df, posiciones, columnas):
+    """
+    Escribe el CSV por bloques en un archivo temporal y lo lee de una sola vez: en memoria
+    hay a lo sumo un bloque más el resultado final (un buffer en memoria tendría el CSV dos
+    veces al convertirlo a bytes).
+    """
+    with tempfile.TemporaryFile() as archivo:
+        for bloque in csv_en_bloques(obtener_df(), posiciones, columnas):
+            archivo.write(bloque)
+        archivo.seek(0)
+        return archivo.read()
+
+
+def descarga_csv(clave, obtener_df, posiciones=None, columnas=None):
+    """
+    Devuelve una función sin argumentos para el parámetro data de st.download_button.
+    El CSV se genera recién al hacer clic y se guarda en la caché con la clave indicada,
+    que debe identificar la versión de los datos y la selección (columnas, filtro, etc.).
+
+    Parámetros:
+        clave (tuple): clave de caché de la descarga.
+        obtener_df (callable): función sin argumentos que devuelve el DataFrame a descargar.
+        posiciones (np.ndarray | range): filas a descargar, o None para todas.
+        columnas (list): columnas a descargar, o None para todas.
+    """
+    return lambda: cache.cacheado(("descarga", *clave), _generar_csv, obtener_df, posiciones, columnas)
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.compactacion import compactar
+from src.pivot import tabla_dinamica
+
+
+@pytest.fixture
+def datos():
+    rng = np.random.default_rng(0)
+    filas = 20_000
+    importe = rng.integers(0, 10_000_000, filas).astype(np.float64)
+    importe[rng.random(filas) < 0.05] = np.nan
+    return pd.DataFrame({
+        'region': rng.choice(['Norte', 'Sur', 'Este', 'Oeste'], filas),
+        'anio': rng.integers(2015, 2025, filas),
+        # Decimales con valores enteros que float32 representa exactamente
+        'importe': importe,
+        'precio': rng.random(filas) * 1_000,
+        'cantidad': rng.integers(0, 100, filas),
+    })
+
+
+def test_compactar_conserva_decimales_en_float64(datos):
+    compactado, _ = compactar(datos)
+    assert compactado['importe'].dtype == np.float64
+    assert compactado['precio'].dtype == np.float64
+
+
+@pytest.mark.parametrize("funcion", ["sum", "mean", "count", "max", "min"])
+def test_tabla_dinamica_igual_con_datos_compactados(datos, funcion):
+    compactado, _ = compactar(datos)
+    filas = ['region', 'anio']
+    valores = {'importe': funcion, 'precio': funcion, 'cantidad': funcion}
+
+    original = tabla_dinamica(datos, filas, valores, ("test", "original"))
+    reducida = tabla_dinamica(compactado, filas, valores, ("test", "compactado"))
+
+    for col in valores:
+        np.testing.assert_array_equal(reducida[col].to_numpy(dtype=np.float64),
+                                      original[col].to_numpy(dtype=np.float64))
+
+
+def test_pivot_table_igual_con_datos_compactados(datos):
+    compactado, _ = compactar(datos)
+    argumentos = dict(index=['region', 'anio'], values=['importe', 'precio'], aggfunc='sum', observed=True)
+
+    original = pd.pivot_table(datos, **argumentos)
+    reducida = pd.pivot_table(compactado, **argumentos)
+
+    np.testing.assert_array_equal(reducida.to_numpy(), original.to_numpy())
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.disco import tabla_dinamica_disco
+from src.filtros import compilar_filtro, evaluar_filtro
+from src.pivot import tabla_dinamica
+
+
+@pytest.fixture
+def archivo(tmp_path):
+    rng = np.random.default_rng(0)
+    filas = 50_000
+    w = rng.integers(0, 6, filas).astype(np.float64)
+    w[rng.random(filas) < 0.2] = np.nan
+    texto = rng.choice(np.array(['xa', 'ab', 'bx', 'cc'], dtype=object), filas)
+    texto[rng.random(filas) < 0.2] = None
+    df = pd.DataFrame({
+        'grupo': rng.choice(['A', 'B', 'C'], filas),
+        'b': rng.integers(0, 20, filas),
+        'w': w,
+        't': texto,
+        'importe': rng.random(filas) * 1_000,
+    })
+    ruta = tmp_path / "datos.parquet"
+    df.to_parquet(ruta, index=False)
+    return ruta
+
+
+@pytest.mark.parametrize("expresion", [
+    "[b] > 10 AND NOT [w] >= 3",
+    "NOT [t] CONTAINS 'x'",
+    "NOT ([w] > 2 OR [b] < 5)",
+    "NOT [w] IN (1, 2) AND NOT [t] = 'cc'",
+    "NOT NOT [w] BETWEEN 1 AND 3",
+])
+def test_disco_igual_que_en_memoria_con_not_sobre_nulos(archivo, expresion):
+    df = pd.read_parquet(archivo)
+    valores = {'importe': 'sum', 'w': 'count', 'b': 'max'}
+    arbol = compilar_filtro(expresion)
+    clave_datos = ("test_disco", expresion)
+
+    en_memoria = tabla_dinamica(df, ['grupo'], valores, clave_datos, evaluar_filtro(df, arbol, clave_datos), arbol)
+    en_disco = tabla_dinamica_disco(archivo, ['grupo'], valores, arbol)
+
+    columnas = ['grupo'] + sorted(valores)
+    pd.testing.assert_frame_equal(en_disco[columnas].sort_values('grupo', ignore_index=True),
+                                  en_memoria[columnas].sort_values('grupo', ignore_index=True),
+                                  check_dtype=False)